@@ -0,0 +1,212 @@
+"""Benchmark de backup/restauração do VaultEngine em árvores Steam sintéticas.
+
+Gera as árvores em pastas temporárias, mede run_backup (completo e
+incremental sem mudanças) e run_restore (em Steam vazia e diferencial sem
+mudanças) para cada formato e contagem de threads, e grava JSON para
+comparar execuções:
+
+    python benchmarks/bench.py --shapes small,mixed --workers 2x1,6x2 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from src.core.vault import VaultEngine, DLLS
+
+KB = 1024
+MB = 1024 * KB
+
+# Formatos de árvore: contas x apps x arquivos em userdata, profundidade,
+# manifestos de depot e seus tamanhos
+SHAPES = {
+    "small": {"accounts": 3, "apps": 40, "files": 50, "file_size": (512, 8 * KB),
+              "depth": 1, "depots": 4, "depot_size": (64 * KB, 256 * KB)},
+    "large": {"accounts": 1, "apps": 4, "files": 5, "file_size": (1 * KB, 4 * KB),
+              "depth": 1, "depots": 8, "depot_size": (24 * MB, 40 * MB)},
+    "deep": {"accounts": 2, "apps": 10, "files": 40, "file_size": (1 * KB, 16 * KB),
+             "depth": 12, "depots": 4, "depot_size": (64 * KB, 256 * KB)},
+    "mixed": {"accounts": 2, "apps": 30, "files": 40, "file_size": (512, 32 * KB),
+              "depth": 4, "depots": 30, "depot_size": (256 * KB, 8 * MB)},
+}
+
+
+class Silent:
+    """Logger que descarta as mensagens e conta erros."""
+
+    def __init__(self):
+        self.errors = 0
+
+    def __call__(self, text):
+        if "[ERRO" in text:
+            self.errors += 1
+
+
+def _write(path, size, rng):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        # Bloco aleatório repetido: conteúdo não trivial sem pagar os.urandom por byte
+        block = rng.randbytes(min(size, 64 * KB))
+        remaining = size
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+
+
+def make_tree(root, shape, scale=1.0, seed=1):
+    """Cria uma árvore Steam sintética; retorna (arquivos, bytes)."""
+    rng = random.Random(seed)
+    files = total = 0
+
+    def add(path, size_range):
+        nonlocal files, total
+        size = rng.randint(*size_range)
+        _write(path, size, rng)
+        files += 1
+        total += size
+
+    n_files = max(1, int(shape["files"] * scale))
+    for account in range(shape["accounts"]):
+        account_dir = os.path.join(root, "userdata", str(100000 + account))
+        add(os.path.join(account_dir, "config", "localconfig.vdf"), (4 * KB, 64 * KB))
+        for app in range(shape["apps"]):
+            app_dir = os.path.join(account_dir, str(10 + app), "remote")
+            for i in range(n_files):
+                nest = [f"d{(i + level) % 3}" for level in range(shape["depth"] - 1)]
+                add(os.path.join(app_dir, *nest, f"f{i}.sav"), shape["file_size"])
+    for depot in range(max(1, int(shape["depots"] * scale))):
+        app = 10 + depot % shape["apps"]
+        add(os.path.join(root, "config", "depotcache", f"{app}{depot:03d}_{rng.getrandbits(60)}.manifest"),
+            shape["depot_size"])
+        lua = os.path.join(root, "config", "stplug-in", f"{app}.lua")
+        os.makedirs(os.path.dirname(lua), exist_ok=True)
+        with open(lua, 'a', encoding='utf-8') as f:
+            f.write(f"addappid({app}{depot:03d})\n")
+    for app in range(shape["apps"]):
+        add(os.path.join(root, "appcache", "stats", f"UserGameStats_100000_{10 + app}.bin"), (1 * KB, 8 * KB))
+    for dll in DLLS:
+        add(os.path.join(root, dll), (100 * KB, 300 * KB))
+    return files, total
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _parse_workers(value):
+    """"auto" -> None; "6x2" -> (6, 2)."""
+    if value == "auto":
+        return None
+    small, _, large = value.partition("x")
+    return int(small), int(large or 1)
+
+
+def bench_case(base, shape_name, workers, scale, repeat):
+    shape = SHAPES[shape_name]
+    steam = os.path.join(base, "steam")
+    backup = os.path.join(base, "backup")
+    target = os.path.join(base, "target")
+    shutil.rmtree(steam, ignore_errors=True)
+    files, size = make_tree(steam, shape, scale)
+
+    timings = {"backup": [], "backup_incremental": [], "restore": [], "restore_unchanged": []}
+    errors = 0
+    for _ in range(repeat):
+        for path in (backup, target):
+            shutil.rmtree(path, ignore_errors=True)
+        logger = Silent()
+        engine = VaultEngine(logger)
+        engine.workers = workers
+        timings["backup"].append(_timed(lambda: engine.run_backup(steam, backup)))
+        timings["backup_incremental"].append(_timed(lambda: engine.run_backup(steam, backup, incremental=True)))
+        timings["restore"].append(_timed(lambda: engine.run_restore(target, backup)))
+        timings["restore_unchanged"].append(_timed(lambda: engine.run_restore(target, backup)))
+        errors += logger.errors
+
+    result = {"shape": shape_name, "workers": "auto" if workers is None else f"{workers[0]}x{workers[1]}",
+              "files": files, "bytes": size, "errors": errors, "phases": {}}
+    for phase, samples in timings.items():
+        best = min(samples)
+        result["phases"][phase] = {
+            "seconds": [round(s, 4) for s in samples],
+            "best": round(best, 4),
+            "median": round(statistics.median(samples), 4),
+            "mb_per_sec": round(size / MB / best, 1) if best > 0 else None,
+            "files_per_sec": round(files / best, 1) if best > 0 else None,
+        }
+    return result
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do VaultEngine em árvores Steam sintéticas")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help=f"Formatos ({', '.join(SHAPES)})")
+    parser.add_argument("--workers", default="auto,2x1,6x2,12x4",
+                        help='Threads "pequenos x grandes" ou "auto" (perfil do destino), separadas por vírgula')
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplica a quantidade de arquivos")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetições por caso")
+    parser.add_argument("--tmp", default=None, help="Pasta base dos temporários (padrão: a do sistema)")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    shapes = [s.strip() for s in args.shapes.split(",") if s.strip()]
+    unknown = [s for s in shapes if s not in SHAPES]
+    if unknown:
+        parser.error(f"formato desconhecido: {', '.join(unknown)}")
+    worker_sets = [_parse_workers(w.strip()) for w in args.workers.split(",") if w.strip()]
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "results": [],
+    }
+    base = tempfile.mkdtemp(prefix="steamvault-bench-", dir=args.tmp)
+    try:
+        for shape in shapes:
+            for workers in worker_sets:
+                result = bench_case(base, shape, workers, args.scale, args.repeat)
+                report["results"].append(result)
+                phases = result["phases"]
+                print(f"[INFO] {shape:<6} {result['workers']:<5} {result['files']:>6} arq. "
+                      f"backup {phases['backup']['best']:.2f}s · incr. {phases['backup_incremental']['best']:.2f}s · "
+                      f"restore {phases['restore']['best']:.2f}s · diff {phases['restore_unchanged']['best']:.2f}s",
+                      file=sys.stderr)
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(data + "\n")
+        print(f"[SUCESSO] Resultados em {args.output}", file=sys.stderr)
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Tempo de inicialização da CLI, medido com `python -X importtime`.
+
+Importa src.main num processo novo, soma o tempo cumulativo informado pelo
+interpretador e falha (código 1) se passar do orçamento ou se algum módulo
+do Qt for carregado no caminho da CLI:
+
+    python benchmarks/startup.py --budget-ms 150 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Orçamento do import de src.main (cumulativo, -X importtime) no caminho da CLI
+STARTUP_BUDGET_MS = 150
+FORBIDDEN = ("PyQt6", "src.gui")  # só a GUI pode carregar estes
+TOP_MODULES = 10
+
+
+def _parse_importtime(stderr):
+    """{módulo: (próprio µs, cumulativo µs)} das linhas "import time: a | b | nome"."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # cabeçalho
+        modules[parts[2].strip()] = (int(parts[0]), int(parts[1]))
+    return modules
+
+
+def measure_imports(target="src.main"):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target}"], cwd=ROOT,
+                         capture_output=True, text=True, timeout=60)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "falha no import")
+    return _parse_importtime(out.stderr)
+
+
+def measure_wall(args):
+    """Segundos de relógio de `python -m src.main <args>` (interpretador incluso)."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "src.main", *args], cwd=ROOT, capture_output=True, timeout=60)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de inicialização da CLI (-X importtime)")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Orçamento do import de src.main em ms (padrão: {STARTUP_BUDGET_MS})")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetições (vale a melhor)")
+    parser.add_argument("--output", default=None, help="Arquivo JSON de saída (padrão: stdout)")
+    args = parser.parse_args()
+
+    runs = [measure_imports() for _ in range(args.repeat)]
+    totals = [run.get("src.main", (0, 0))[1] / 1000 for run in runs]
+    best = runs[totals.index(min(totals))]
+    forbidden = sorted(name for name in best if name.startswith(FORBIDDEN))
+    heaviest = sorted(best.items(), key=lambda item: -item[1][0])[:TOP_MODULES]
+    wall = [measure_wall(["--help"]) for _ in range(args.repeat)]
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "budget_ms": args.budget_ms,
+        "import_ms": {"best": round(min(totals), 1), "median": round(statistics.median(totals), 1)},
+        "help_wall_ms": {"best": round(min(wall) * 1000, 1), "median": round(statistics.median(wall) * 1000, 1)},
+        "modules": len(best),
+        "forbidden": forbidden,
+        "heaviest": [{"module": name, "self_ms": round(own / 1000, 1), "cumulative_ms": round(cum / 1000, 1)}
+                     for name, (own, cum) in heaviest],
+    }
+    ok = min(totals) <= args.budget_ms and not forbidden
+    print(f"[INFO] import src.main: {min(totals):.1f} ms (orçamento {args.budget_ms:.0f} ms) · "
+          f"--help: {min(wall) * 1000:.0f} ms · {len(best)} módulos", file=sys.stderr)
+    if forbidden:
+        print(f"[ERRO] Módulos da GUI no caminho da CLI: {', '.join(forbidden[:5])}", file=sys.stderr)
+    elif not ok:
+        print("[ERRO] Inicialização acima do orçamento.", file=sys.stderr)
+
+    data = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(data + "\n")
+        print(f"[SUCESSO] Resultados em {args.output}", file=sys.stderr)
+    else:
+        print(data)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -46,16 +46,29 @@ if not exist ".venv" (
     )
 )
 
-:: 3. Install Dependencies
-echo [INFO] Verificando dependencias...
+:: 3. Install Dependencies (so quando o requirements.txt muda: carimbo com o hash dentro da .venv)
 call .venv\Scripts\activate.bat
+set "STAMP=.venv\.requirements.sha256"
+set "REQ_HASH="
+set "OLD_HASH="
+for /f "delims=" %%h in ('certutil -hashfile requirements.txt SHA256 ^| findstr /v ":"') do set "REQ_HASH=%%h"
+if exist "%STAMP%" set /p OLD_HASH=<"%STAMP%"
+if defined REQ_HASH if "%REQ_HASH%"=="%OLD_HASH%" (
+    echo [OK] Dependencias prontas ^(requirements.txt inalterado^).
+    goto launch
+)
+echo [INFO] Verificando dependencias...
 pip install -r requirements.txt >nul 2>&1
 if %errorlevel% neq 0 (
     echo [AVISO] Falha na verificacao silenciosa. Instalando com log detalhado...
     pip install -r requirements.txt
+    if errorlevel 1 goto launch
 ) else (
     echo [OK] Dependencias prontas.
 )
+if defined REQ_HASH >"%STAMP%" echo %REQ_HASH%
+
+:launch
 
 :: 4. Launch Application
 echo.
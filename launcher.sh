@@ -26,15 +26,26 @@ if [ ! -d ".venv" ]; then
     fi
 fi
 
-# 3. Install Dependencies
-echo "[INFO] Verificando dependencias..."
+# 3. Install Dependencies (so quando o requirements.txt muda: carimbo com o hash dentro da .venv)
 source .venv/bin/activate
-pip install -r requirements.txt &> /dev/null
-if [ $? -ne 0 ]; then
-    echo "[AVISO] Falha na verificacao silenciosa. Instalando com log detalhado..."
-    pip install -r requirements.txt
+STAMP=".venv/.requirements.sha256"
+if command -v sha256sum &> /dev/null; then
+    REQ_HASH=$(sha256sum requirements.txt | cut -d' ' -f1)
 else
-    echo "[OK] Dependencias prontas."
+    REQ_HASH=$(python -c "import hashlib; print(hashlib.sha256(open('requirements.txt', 'rb').read()).hexdigest())")
+fi
+if [ -f "$STAMP" ] && [ "$(cat "$STAMP")" = "$REQ_HASH" ]; then
+    echo "[OK] Dependencias prontas (requirements.txt inalterado)."
+else
+    echo "[INFO] Verificando dependencias..."
+    pip install -r requirements.txt &> /dev/null
+    if [ $? -ne 0 ]; then
+        echo "[AVISO] Falha na verificacao silenciosa. Instalando com log detalhado..."
+        pip install -r requirements.txt && echo "$REQ_HASH" > "$STAMP"
+    else
+        echo "$REQ_HASH" > "$STAMP"
+        echo "[OK] Dependencias prontas."
+    fi
 fi
 
 # 4. Launch Application
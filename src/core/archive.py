@@ -0,0 +1,137 @@
+import gzip
+import hashlib
+import os
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# tar.gz e não tar.zst/zip: zstd não está na biblioteca padrão, e gzip permite
+# membros independentes comprimidos em paralelo (ParallelGzipWriter)
+ARCHIVE_SUFFIX = ".tar.gz"
+MANIFEST_SUFFIX = ".manifest.json"  # manifesto ao lado do arquivo compactado
+BLOCK_SIZE = 1024 * 1024
+COMPRESS_LEVEL = 6
+COMPRESS_WORKERS = max(2, min(8, os.cpu_count() or 2))
+
+
+class ParallelGzipWriter:
+    """Arquivo gzip escrito por um único escritor sequencial.
+
+    Os dados são cortados em blocos de BLOCK_SIZE e cada bloco vira um membro
+    gzip independente, comprimido em threads (zlib libera o GIL). Os membros
+    são gravados na ordem original; a concatenação é um .gz válido que
+    qualquer leitor gzip descomprime em sequência.
+    """
+
+    def __init__(self, path, level=COMPRESS_LEVEL, workers=COMPRESS_WORKERS):
+        self.file = open(path, 'wb')
+        self.level = level
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = deque()
+        self.max_pending = workers * 2  # limita a memória em blocos na fila
+        self.buffer = bytearray()
+        self.raw_bytes = 0
+        self.closed = False
+
+    def write(self, data):
+        self.buffer += data
+        self.raw_bytes += len(data)
+        while len(self.buffer) >= BLOCK_SIZE:
+            self._submit(bytes(self.buffer[:BLOCK_SIZE]))
+            del self.buffer[:BLOCK_SIZE]
+        return len(data)
+
+    def _submit(self, block):
+        self.pending.append(self.executor.submit(gzip.compress, block, self.level, mtime=0))
+        while len(self.pending) > self.max_pending:
+            self.file.write(self.pending.popleft().result())
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if self.buffer:
+                self._submit(bytes(self.buffer))
+                self.buffer.clear()
+            while self.pending:
+                self.file.write(self.pending.popleft().result())
+        finally:
+            self.executor.shutdown(wait=True)
+            self.file.close()
+
+
+class _HashingReader:
+    """Envolve o arquivo de origem calculando o hash enquanto o tar lê."""
+
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.blake2b(digest_size=16)
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.hash.update(data)
+        return data
+
+
+class ArchiveWriter:
+    """Empacota arquivos num .tar.gz em fluxo (sem pasta temporária)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.tmp = path + ".part"
+        self.stream = ParallelGzipWriter(self.tmp)
+        self.tar = tarfile.open(fileobj=self.stream, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def add_file(self, src, arcname):
+        """Adiciona um arquivo; retorna (size, mtime, hash).
+
+        Retorna None se a origem não puder ser aberta (nada é escrito). Erros
+        depois do cabeçalho deixam o tar inconsistente e são propagados.
+        """
+        try:
+            f = open(src, 'rb')
+        except OSError:
+            return None
+        with f:
+            st = os.fstat(f.fileno())
+            info = tarfile.TarInfo(arcname.replace(os.sep, "/"))
+            info.size = st.st_size
+            info.mtime = st.st_mtime
+            info.mode = st.st_mode & 0o777
+            reader = _HashingReader(f)
+            self.tar.addfile(info, reader)
+        return (st.st_size, st.st_mtime, reader.hash.hexdigest())
+
+    def add_member(self, info, fileobj):
+        """Copia um membro (TarInfo + conteúdo) de outro arquivo, em fluxo."""
+        self.tar.addfile(info, fileobj)
+
+    def close(self, commit=True):
+        """Finaliza o arquivo; com commit=False descarta o parcial."""
+        try:
+            self.tar.close()
+        finally:
+            self.stream.close()
+        if commit:
+            os.replace(self.tmp, self.path)
+        else:
+            try: os.remove(self.tmp)
+            except OSError: pass
+
+
+def safe_member_path(root, name):
+    """Resolve o destino de um membro impedindo saída da pasta raiz."""
+    target = os.path.normpath(os.path.join(root, name))
+    if os.path.isabs(name) or not target.startswith(os.path.normpath(root) + os.sep):
+        return None
+    return target
+
+
+def iter_archive(path):
+    """Itera (TarInfo, fileobj) lendo o .tar.gz em fluxo contínuo."""
+    # GzipFile lê membros concatenados; o modo "r|gz" do tarfile só lê o primeiro
+    with gzip.open(path, 'rb') as stream, tarfile.open(fileobj=stream, mode="r|") as tar:
+        for member in tar:
+            if member.isfile():
+                yield member, tar.extractfile(member)
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from src.core.vault import VaultEngine
+from src.core.throttle import IoLimits
+from src.core.scheduler import plan_workers
+
+INSTALLS_DIR = "SteamVault_Installs"  # um cofre por instalação sob a pasta de backup
+# Backups simultâneos por disco de destino, pelo tipo detectado (src/core/scheduler.py):
+# o HDD fica com um (vários disputariam o braço), SSD e rede aguentam vários
+PER_DISK = {"ssd": 4, "hdd": 1, "network": 2, "unknown": 2}
+LOG_TAIL = 20  # últimas linhas de log de cada instalação guardadas no relatório
+
+
+def install_name(steam):
+    """Nome de pasta estável para uma instalação: fim do caminho + hash curto."""
+    path = os.path.normcase(os.path.realpath(steam))
+    tail = "_".join(part for part in path.replace("\\", "/").split("/")[-2:] if part)
+    slug = re.sub(r"[^A-Za-z0-9.]+", "_", tail).strip("_.") or "steam"
+    return f"{slug}-{hashlib.blake2b(path.encode('utf-8'), digest_size=4).hexdigest()}"
+
+
+def install_vault(backup_root, steam):
+    """Pasta de backup (backup_root do motor) de uma instalação no modo lote."""
+    return os.path.join(backup_root, INSTALLS_DIR, install_name(steam))
+
+
+def disk_of(path):
+    """Identificador do disco de `path` (st_dev da pasta existente mais próxima)."""
+    path = os.path.abspath(path)
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            parent = os.path.dirname(path)
+            if parent == path:
+                return None
+            path = parent
+
+
+def _backup_install(steam, backup_root, options):
+    """Roda num processo do pool: backup de uma instalação; retorna o relatório dela."""
+    lines = []
+    limits = IoLimits()
+    limits.update_from_config(options.get("limits") or {})
+    engine = VaultEngine(lines.append, limits=limits)
+    started = time.monotonic()
+    try:
+        engine.run_backup(steam, backup_root, incremental=options.get("incremental", False),
+                          checksum=options.get("checksum", False), verify=options.get("verify", False),
+                          selection=options.get("selection"), pack=options.get("pack", 0))
+        crashed = None
+    except Exception as e:
+        crashed = str(e)
+        lines.append(f"[ERRO CRÍTICO] {e}")
+    summary = engine.telemetry.summary()
+    try:
+        with open(os.path.join(backup_root, "SteamVault_batch.log"), 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+    except OSError:
+        pass
+    errors = sum(1 for line in lines if line.startswith("[ERRO"))
+    return {
+        "steam": steam,
+        "backup": backup_root,
+        "ok": crashed is None and errors == 0 and any(line.startswith("[SUCESSO]") for line in lines),
+        "errors": errors,
+        "files": summary["files_done"],
+        "bytes": summary["bytes_copied"],
+        "seconds": round(time.monotonic() - started, 2),
+        "modules": summary["modules"],
+        "log": lines[-LOG_TAIL:],
+    }
+
+
+def disk_limit(path, per_disk=None):
+    """(tipo, backups simultâneos) para o disco de `path`; `per_disk` fixa o limite."""
+    kind = plan_workers(path)[0]
+    return kind, per_disk or PER_DISK.get(kind, 1)
+
+
+def run_batch(installs, backup_root, options=None, jobs=None, per_disk=None, logger=print):
+    """Backup de várias instalações da Steam em paralelo, um processo por instalação.
+
+    `installs` é uma lista de caminhos Steam ou de pares (steam, backup);
+    sem backup próprio, cada uma ganha um cofre em
+    <backup_root>/SteamVault_Installs/<nome>. No máximo `jobs` backups
+    rodam ao mesmo tempo, e cada disco de destino recebe até o limite do
+    seu tipo (PER_DISK: vários em SSD, um em HDD) ou `per_disk`, se dado.
+    Retorna o relatório combinado (também gravado em JSON em backup_root).
+    """
+    options = options or {}
+    pending = []
+    limits = {}  # disco -> (tipo, backups simultâneos)
+    for item in installs:
+        steam, target = item if isinstance(item, (list, tuple)) else (item, None)
+        target = target or install_vault(backup_root, steam)
+        disk = disk_of(target)
+        if disk not in limits:
+            limits[disk] = disk_limit(target, per_disk)
+        pending.append((steam, target, disk))
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(pending) or 1))
+    disks = ", ".join(f"{kind.upper()} até {limit}" for kind, limit in limits.values())
+    logger(f"[INFO] Lote: {len(pending)} instalações, {jobs} processos; por disco de destino: {disks}")
+
+    started = time.monotonic()
+    results = []
+    busy = {}  # disco -> backups em andamento
+    running = {}  # future -> (steam, backup, disco)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        try:
+            while pending or running:
+                for entry in list(pending):
+                    if len(running) >= jobs:
+                        break
+                    steam, target, disk = entry
+                    if busy.get(disk, 0) >= limits[disk][1]:
+                        continue
+                    pending.remove(entry)
+                    busy[disk] = busy.get(disk, 0) + 1
+                    running[pool.submit(_backup_install, steam, target, options)] = entry
+                    logger(f"[INFO] >>> {steam} -> {target}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    steam, target, disk = running.pop(future)
+                    busy[disk] -= 1
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"steam": steam, "backup": target, "ok": False, "errors": 1, "files": 0,
+                                  "bytes": 0, "seconds": 0, "modules": {}, "log": [f"[ERRO CRÍTICO] {e}"]}
+                    results.append(result)
+                    status = "[SUCESSO]" if result["ok"] else "[AVISO]"
+                    logger(f"{status} {steam}: {result['files']} arquivos, "
+                           f"{result['bytes'] / (1024 * 1024):.1f} MB em {result['seconds']:.1f}s, "
+                           f"{result['errors']} erro(s)")
+        except KeyboardInterrupt:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seconds": round(time.monotonic() - started, 2),
+        "installs": len(results),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "files": sum(r["files"] for r in results),
+        "bytes": sum(r["bytes"] for r in results),
+        "results": results,
+    }
+    try:
+        os.makedirs(backup_root, exist_ok=True)
+        with open(os.path.join(backup_root, f"SteamVault_Batch_{time.strftime('%Y%m%d-%H%M%S')}.json"),
+                  'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        logger(f"[AVISO] Gravar relatório do lote: {e}")
+    return report
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import random
+import zlib
+from collections import Counter
+
+from src.core.scan import scan_tree
+
+# Blob comprimido: MAGIC + id do dicionário (8 bytes, zeros = sem dicionário) + deflate cru
+MAGIC = b"SVZ1"
+NO_DICT = b"\0" * 8
+HEADER_SIZE = len(MAGIC) + len(NO_DICT)
+COMPRESS_LEVEL = 6
+COMPRESS_SUFFIX = ".z"
+MIN_SAVING = 0.9  # grava cru se o primeiro bloco não encolher ao menos 10% (depots já comprimidos)
+UNPACK_BUFFER = 1024 * 1024
+
+# Treino do dicionário: o deflate só enxerga 32 KB para trás, então é o teto útil
+DICT_SIZE = 32 * 1024
+DICT_MAX_FILE = 64 * 1024  # só arquivos pequenos entram na amostra
+SAMPLE_FILES = 512
+SAMPLE_BYTES = 4096        # início de cada amostra (cabeçalhos KeyValues/stats)
+SEGMENT = 24
+SEGMENT_STEP = 4
+MIN_SAMPLES = 8
+
+
+def dictionary_id(zdict):
+    """Id de 8 bytes do conteúdo do dicionário."""
+    return hashlib.blake2b(zdict, digest_size=8).digest()
+
+
+def sample_files(roots, limit=SAMPLE_FILES, max_size=DICT_MAX_FILE, seed=0):
+    """Sorteia até `limit` arquivos pequenos sob `roots` (amostragem por reservatório)."""
+    rng = random.Random(seed)
+    picked = []
+    seen = 0
+    for root in roots:
+        for path, rel, st in scan_tree(root):
+            if not 0 < st.st_size <= max_size:
+                continue
+            seen += 1
+            if len(picked) < limit:
+                picked.append(path)
+            else:
+                i = rng.randrange(seen)
+                if i < limit:
+                    picked[i] = path
+    return picked
+
+
+def read_samples(paths, size=SAMPLE_BYTES):
+    samples = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                samples.append(f.read(size))
+        except OSError:
+            continue
+    return samples
+
+
+def train_dictionary(samples, size=DICT_SIZE):
+    """Monta um dicionário zlib (zdict) com os trechos comuns a várias amostras.
+
+    Conta em quantas amostras cada trecho de SEGMENT bytes aparece e
+    concatena os mais frequentes até `size`, sem repetir trechos já
+    contidos. Os mais frequentes ficam no fim, onde o deflate os alcança
+    com distâncias menores. Retorna b"" se não houver o que aprender.
+    """
+    if len(samples) < MIN_SAMPLES:
+        return b""
+    counts = Counter()
+    for data in samples:
+        counts.update({data[i:i + SEGMENT] for i in range(0, len(data) - SEGMENT + 1, SEGMENT_STEP)})
+    common = sorted(((n, segment) for segment, n in counts.items() if n > 1), reverse=True)
+    picked = bytearray()
+    chosen = []
+    for n, segment in common:
+        if len(picked) + SEGMENT > size:
+            break
+        if segment in picked:
+            continue
+        picked += segment
+        chosen.append(segment)
+    return b"".join(reversed(chosen))
+
+
+def packer(zdict=None, level=COMPRESS_LEVEL):
+    """(cabeçalho, compressobj) de um blob novo."""
+    if zdict:
+        return MAGIC + dictionary_id(zdict), zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    return MAGIC + NO_DICT, zlib.compressobj(level, zlib.DEFLATED, -15)
+
+
+def read_header(f):
+    """Id do dicionário do blob (None se não usa); ValueError se não for um blob comprimido."""
+    header = f.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE or not header.startswith(MAGIC):
+        raise ValueError("blob comprimido inválido")
+    dict_id = header[len(MAGIC):]
+    return None if dict_id == NO_DICT else dict_id
+
+
+def unpack(f, zdict=None, bufsize=UNPACK_BUFFER, on_read=None):
+    """Gera os blocos descomprimidos do deflate cru lido de `f` (após o cabeçalho).
+
+    A saída é limitada a `bufsize` por bloco mesmo em dados muito
+    repetitivos. `on_read(n)` recebe os bytes lidos do disco.
+    """
+    d = zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+    for chunk in iter(lambda: f.read(bufsize), b''):
+        if on_read is not None:
+            on_read(len(chunk))
+        data = d.decompress(chunk, bufsize)
+        while data:
+            yield data
+            data = d.decompress(d.unconsumed_tail, bufsize) if d.unconsumed_tail else b""
+    tail = d.flush()
+    if tail:
+        yield tail
+    if not d.eof:
+        raise ValueError("blob comprimido truncado")
+
+
+def load_dictionary(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def save_dictionary(folder, zdict):
+    """Grava o dicionário como <id>.zdict; retorna o id (hex)."""
+    os.makedirs(folder, exist_ok=True)
+    name = dictionary_id(zdict).hex()
+    path = os.path.join(folder, name + ".zdict")
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        f.write(zdict)
+    os.replace(tmp, path)
+    return name
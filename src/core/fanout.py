@@ -0,0 +1,232 @@
+import hashlib
+import os
+import queue
+import threading
+import time
+
+from src.core.fastcopy import CopyCancelled, TMP_SUFFIX, copy_metadata
+
+FANOUT_BUFFER = 64 * 1024 * 1024  # bytes em espera por destino antes de segurar a leitura
+FANOUT_CHUNK = 1024 * 1024
+
+
+def _always():
+    return True
+
+
+class ByteBudget:
+    """Semáforo em bytes: limita o que está em trânsito para um destino."""
+
+    def __init__(self, limit=FANOUT_BUFFER):
+        self.limit = limit
+        self.used = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, n, should_continue=_always):
+        """Reserva `n` bytes; False se cancelado durante a espera."""
+        with self._cond:
+            # Um bloco maior que o limite passa sozinho, com o buffer vazio
+            while self.used and self.used + n > self.limit:
+                if not should_continue():
+                    return False
+                self._cond.wait(0.1)
+            self.used += n
+            return True
+
+    def release(self, n):
+        with self._cond:
+            self.used -= n
+            self._cond.notify_all()
+
+
+class PendingFile:
+    """Arquivo em gravação num destino; os blocos podem chegar em qualquer ordem.
+
+    Cada bloco traz seu offset, então as threads do destino gravam sem
+    esperar umas pelas outras. Quem zerar os blocos pendentes depois da
+    leitura terminar (seal) fecha, aplica os metadados e renomeia.
+    """
+
+    def __init__(self, rel, module, dst):
+        self.rel = rel
+        self.module = module
+        self.dst = dst
+        self.tmp = dst + TMP_SUFFIX
+        self.lock = threading.Lock()
+        self.file = None
+        self.outstanding = 0
+        self.sealed = None  # (stat, meta) quando a leitura termina
+        self.error = None
+
+
+class Destination:
+    """Um destino do backup em leque: fila, threads e buffer próprios.
+
+    A leitura entrega cada bloco a todos os destinos; um destino lento só
+    segura a leitura quando seu buffer (FANOUT_BUFFER) enche, e até lá o
+    mais rápido segue gravando. O manifesto do destino é montado aqui,
+    pelas threads de gravação e pela leitura (arquivos inalterados).
+    """
+
+    def __init__(self, backup_root, vault_folder, prev, manifest, workers, should_continue=_always,
+                 buffer=FANOUT_BUFFER):
+        self.backup_root = backup_root
+        self.vault_folder = vault_folder
+        self.prev = prev
+        self.manifest = manifest
+        self.should_continue = should_continue
+        self.budget = ByteBudget(buffer)
+        self.queue = queue.Queue()  # limitada em bytes pelo budget
+        self._lock = threading.Lock()
+        self.files = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.errors = []
+        self.copied = []  # (rel, módulo, tamanho) para a verificação pós-backup
+        self.started = time.monotonic()
+        self.finished = None
+        self.threads = [threading.Thread(target=self._writer, daemon=True) for _ in range(max(1, workers))]
+        for t in self.threads:
+            t.start()
+
+    def path(self, rel):
+        return os.path.join(self.vault_folder, rel)
+
+    def keep(self, rel, meta, module):
+        """Arquivo inalterado neste destino: só entra no manifesto."""
+        with self._lock:
+            self.manifest.add(rel, meta[0], meta[1], meta[2], module)
+            self.skipped += 1
+
+    def begin(self, rel, module):
+        return PendingFile(rel, module, self.path(rel))
+
+    def put(self, pending, offset, data):
+        """Enfileira um bloco; bloqueia enquanto o buffer do destino estiver cheio."""
+        if not self.budget.acquire(len(data), self.should_continue):
+            raise CopyCancelled()
+        with pending.lock:
+            pending.outstanding += 1
+        self.queue.put((pending, offset, data))
+
+    def seal(self, pending, st, meta):
+        """Leitura concluída: `meta` = (size, mtime, hash) para o manifesto."""
+        with pending.lock:
+            pending.sealed = (st, meta)
+            ready = pending.outstanding == 0
+        if ready:
+            self._finish(pending)
+
+    def fail(self, pending, error):
+        """Leitura falhou ou foi cancelada: descarta o parcial."""
+        with pending.lock:
+            pending.error = pending.error or error
+            pending.sealed = (None, None)
+            ready = pending.outstanding == 0
+        if ready:
+            self._finish(pending)
+
+    def _writer(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            pending, offset, data = item
+            try:
+                if pending.error is None and self.should_continue():
+                    with pending.lock:
+                        if pending.file is None:
+                            os.makedirs(os.path.dirname(pending.dst), exist_ok=True)
+                            pending.file = open(pending.tmp, 'wb')
+                        pending.file.seek(offset)
+                        pending.file.write(data)
+            except OSError as e:
+                pending.error = pending.error or str(e)
+            finally:
+                self.budget.release(len(data))
+            with pending.lock:
+                pending.outstanding -= 1
+                ready = pending.outstanding == 0 and pending.sealed is not None
+            if ready:
+                self._finish(pending)
+
+    def _finish(self, pending):
+        st, meta = pending.sealed
+        if pending.error is None and not self.should_continue():
+            pending.error = "cancelado"
+        try:
+            if pending.error is None:
+                if pending.file is None:  # arquivo vazio
+                    os.makedirs(os.path.dirname(pending.dst), exist_ok=True)
+                    pending.file = open(pending.tmp, 'wb')
+                pending.file.close()
+                copy_metadata(st, pending.tmp)
+                os.replace(pending.tmp, pending.dst)
+        except OSError as e:
+            pending.error = str(e)
+        if pending.error is not None:
+            if pending.file is not None:
+                pending.file.close()
+            try: os.remove(pending.tmp)
+            except OSError: pass
+        with self._lock:
+            if pending.error is None:
+                self.files += 1
+                self.bytes += meta[0]
+                self.manifest.add(pending.rel, meta[0], meta[1], meta[2], pending.module)
+                self.copied.append((pending.rel, pending.module, meta[0]))
+            elif self.should_continue():
+                self.errors.append(f"{pending.rel}: {pending.error}")
+
+    def close(self):
+        """Espera a fila esvaziar e encerra as threads."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for t in self.threads:
+            t.join()
+        self.finished = time.monotonic()
+
+    def status(self):
+        """Estado do destino para GUI/CLI (dict serializável em JSON)."""
+        elapsed = (self.finished or time.monotonic()) - self.started
+        with self._lock:
+            return {"path": self.backup_root, "files": self.files, "bytes": self.bytes, "skipped": self.skipped,
+                    "errors": len(self.errors), "queued_bytes": self.budget.used,
+                    "bytes_per_sec": round(self.bytes / elapsed) if elapsed > 0 else 0}
+
+    def line(self):
+        status = self.status()
+        return (f"[INFO] Destino {self.backup_root}: {status['files']} copiados, {status['skipped']} inalterados, "
+                f"{status['bytes'] / (1024 * 1024):.1f} MB · {status['bytes_per_sec'] / (1024 * 1024):.1f} MB/s · "
+                f"{status['errors']} erro(s)")
+
+
+def fan_out(src, targets, want_hash=False, should_continue=_always, throttle=None, bufsize=FANOUT_CHUNK):
+    """Lê `src` uma única vez e entrega cada bloco a todos os [(Destination, PendingFile)].
+
+    Retorna (size, mtime, hash|None). Um erro de leitura (ou cancelamento)
+    descarta o arquivo em todos os destinos e é propagado.
+    """
+    digest = hashlib.blake2b(digest_size=16) if want_hash else None
+    try:
+        with open(src, 'rb') as f:
+            st = os.fstat(f.fileno())
+            offset = 0
+            for chunk in iter(lambda: f.read(bufsize), b''):
+                if not should_continue():
+                    raise CopyCancelled()
+                if digest is not None:
+                    digest.update(chunk)
+                for target, pending in targets:
+                    target.put(pending, offset, chunk)
+                offset += len(chunk)
+                if throttle is not None:
+                    throttle(len(chunk))
+    except BaseException as e:
+        for target, pending in targets:
+            target.fail(pending, str(e) or "cancelado")
+        raise
+    meta = (offset, st.st_mtime, digest.hexdigest() if digest else None)
+    for target, pending in targets:
+        target.seal(pending, st, meta)
+    return meta
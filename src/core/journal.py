@@ -0,0 +1,89 @@
+import json
+import os
+import time
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".journal"
+# fsync em lote: a cada N arquivos ou S segundos, o que vier antes
+SYNC_FILES = 256
+SYNC_SECONDS = 2.0
+
+
+def journal_path(backup_root, kind):
+    """Diário de uma execução ("backup" ou "restore") na pasta de backup."""
+    return os.path.join(backup_root, f"SteamVault_{kind}{JOURNAL_SUFFIX}")
+
+
+def load_journal(path):
+    """(cabeçalho, {rel: [size, mtime, hash, module]}) ou (None, {}).
+
+    Uma última linha truncada (queda no meio da escrita) é ignorada.
+    """
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except OSError:
+        return None, {}
+    header, done = None, {}
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if header is None:
+                if not isinstance(record, dict) or record.get("version") != JOURNAL_VERSION:
+                    return None, {}
+                header = record
+            elif isinstance(record, list) and len(record) == 5:
+                done[record[0]] = record[1:]
+    return header, done
+
+
+class Journal:
+    """Registro dos arquivos concluídos de um backup/restauração, uma linha JSON cada.
+
+    A primeira linha é o cabeçalho (tipo, origem, destino, início). As
+    linhas vão para o disco em lote (fsync a cada SYNC_FILES arquivos ou
+    SYNC_SECONDS), então uma queda perde no máximo o último lote, que é
+    refeito no --resume. Alimentado só na thread chamadora do pipeline.
+    """
+
+    def __init__(self, path, kind, source, target, resume=False):
+        self.path = path
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        if resume and os.path.exists(path):
+            self.file = open(path, 'a', encoding='utf-8')
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+            header = {"version": JOURNAL_VERSION, "kind": kind, "source": source, "target": target,
+                      "started": time.time()}
+            self.file.write(json.dumps(header) + "\n")
+            self.sync()
+
+    def record(self, rel, size, mtime, digest, module):
+        self.file.write(json.dumps([rel.replace(os.sep, "/"), size, mtime, digest, module]) + "\n")
+        self.pending += 1
+        if self.pending >= SYNC_FILES or time.monotonic() - self.last_sync >= SYNC_SECONDS:
+            self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.last_sync = time.monotonic()
+
+    def close(self):
+        """Grava o que falta e fecha; o diário fica para um --resume."""
+        if self.file.closed:
+            return
+        try:
+            self.sync()
+        finally:
+            self.file.close()
+
+    def discard(self):
+        """Execução concluída: o diário não é mais necessário."""
+        self.close()
+        try: os.remove(self.path)
+        except OSError: pass
@@ -0,0 +1,91 @@
+import json
+import os
+import time
+
+MANIFEST_NAME = "vault_manifest.json"
+MANIFEST_VERSION = 1
+
+# Índices de cada entrada: caminho relativo -> [size, mtime, hash, module]
+SIZE, MTIME, HASH, MODULE = range(4)
+
+
+class Manifest:
+    """Índice do conteúdo de um cofre, gravado ao final de cada backup.
+
+    Guarda, para cada arquivo, o caminho relativo à pasta do cofre, tamanho,
+    mtime, hash de conteúdo (None quando copiado por reflink/zero-copy sem
+    checksum) e o módulo de origem (USERDATA, STPLUG-IN, DEPOTCACHE, STATS
+    ou DLL). Permite restaurar e comparar sem varrer a
+    árvore do cofre com os.walk.
+    """
+
+    def __init__(self, files=None, created=None, source=""):
+        self.files = files if files is not None else {}
+        self.created = created or time.time()
+        self.source = source
+
+    @staticmethod
+    def path_for(vault_folder):
+        return os.path.join(vault_folder, MANIFEST_NAME)
+
+    @staticmethod
+    def exists(vault_folder):
+        return os.path.isfile(Manifest.path_for(vault_folder))
+
+    @classmethod
+    def load(cls, vault_folder):
+        """Lê o manifesto do cofre. Retorna None se ausente ou inválido."""
+        return cls.load_file(cls.path_for(vault_folder))
+
+    @classmethod
+    def load_file(cls, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(data.get("files", {}), data.get("created"), data.get("source", ""))
+
+    def save(self, vault_folder):
+        self.save_file(self.path_for(vault_folder))
+
+    def save_file(self, path):
+        """Grava de forma atômica (arquivo temporário + rename)."""
+        tmp = path + ".tmp"
+        data = {
+            "version": MANIFEST_VERSION,
+            "created": self.created,
+            "source": self.source,
+            "files": self.files,
+        }
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    def add(self, rel, size, mtime, digest, module):
+        self.files[rel.replace(os.sep, "/")] = [size, mtime, digest, module]
+
+    def get(self, rel):
+        return self.files.get(rel.replace(os.sep, "/"))
+
+    def entries(self, module=None):
+        """Itera (rel, entry), opcionalmente filtrando por módulo."""
+        for rel, entry in self.files.items():
+            if module is None or entry[MODULE] == module:
+                yield rel, entry
+
+    def has_module(self, module):
+        return any(True for _ in self.entries(module))
+
+    def total_size(self):
+        return sum(entry[SIZE] for entry in self.files.values())
+
+    def summary(self):
+        """Contagem e bytes por módulo: {module: (files, bytes)}."""
+        result = {}
+        for entry in self.files.values():
+            count, size = result.get(entry[MODULE], (0, 0))
+            result[entry[MODULE]] = (count + 1, size + entry[SIZE])
+        return result
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import mmap
+import os
+import threading
+
+from src.core.fastcopy import TMP_SUFFIX
+
+PACKS_DIR = "SteamVault_Packs"  # dentro da pasta do cofre
+INDEX_NAME = "pack_index.json"
+INDEX_VERSION = 1
+PACK_SUFFIX = ".svpk"
+PACK_LIMIT = 64 * 1024  # arquivos menores que isto vão para pacotes
+PACK_SIZE = 64 * 1024 * 1024  # um pacote é fechado ao passar deste tamanho
+COMPACT_RATIO = 0.5  # pacote antigo com menos dados vivos que isto é reescrito
+
+# Entradas do índice: caminho relativo -> [pacote, offset, tamanho, mtime]
+PACK, OFFSET, LENGTH, MTIME = range(4)
+
+
+def index_path(vault_folder):
+    return os.path.join(vault_folder, PACKS_DIR, INDEX_NAME)
+
+
+def has_packs(vault_folder):
+    """True se o cofre usa o layout com pacotes."""
+    return os.path.isfile(index_path(vault_folder))
+
+
+def load_index(vault_folder):
+    """(limite, {rel: entrada}) do índice; (None, {}) se ausente ou inválido."""
+    try:
+        with open(index_path(vault_folder), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None, {}
+    if data.get("version") != INDEX_VERSION:
+        return None, {}
+    return data.get("limit", PACK_LIMIT), data.get("files", {})
+
+
+class PackReader:
+    """Leitura de arquivos em pacote pelo offset do índice, via mmap.
+
+    Cada pacote é mapeado uma vez na primeira leitura; extrair um arquivo
+    só toca as páginas dele, sem ler o pacote inteiro.
+    """
+
+    def __init__(self, vault_folder, limit=None, files=None):
+        self.folder = os.path.join(vault_folder, PACKS_DIR)
+        self.limit = limit or PACK_LIMIT
+        self.files = files if files is not None else {}
+        self._maps = {}
+        self._map_lock = threading.Lock()
+
+    @classmethod
+    def open(cls, vault_folder):
+        """Leitor do cofre, ou None se ele não usa pacotes."""
+        limit, files = load_index(vault_folder)
+        if limit is None:
+            return None
+        return cls(vault_folder, limit, files)
+
+    def __contains__(self, rel):
+        return rel.replace(os.sep, "/") in self.files
+
+    def get(self, rel):
+        return self.files.get(rel.replace(os.sep, "/"))
+
+    def _map(self, name):
+        with self._map_lock:
+            view = self._maps.get(name)
+            if view is None:
+                with open(os.path.join(self.folder, name), 'rb') as f:
+                    view = self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return view
+
+    def read(self, rel):
+        """Conteúdo do arquivo `rel` (bytes)."""
+        entry = self.get(rel)
+        if entry is None:
+            raise FileNotFoundError(rel)
+        if not entry[LENGTH]:
+            return b""  # mmap não mapeia pacote vazio
+        view = self._map(entry[PACK])
+        if entry[OFFSET] + entry[LENGTH] > len(view):
+            raise ValueError(f"{rel}: pacote {entry[PACK]} truncado")
+        return view[entry[OFFSET]:entry[OFFSET] + entry[LENGTH]]
+
+    def hash(self, rel):
+        return hashlib.blake2b(self.read(rel), digest_size=16).hexdigest()
+
+    def extract(self, rel, dst):
+        """Grava `rel` em `dst` (temporário + rename, mtime do backup). Retorna (size, mtime)."""
+        entry = self.get(rel)
+        data = self.read(rel)
+        tmp = dst + TMP_SUFFIX
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.utime(tmp, (entry[MTIME], entry[MTIME]))
+            os.replace(tmp, dst)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+        return len(data), entry[MTIME]
+
+    def close(self):
+        with self._map_lock:
+            for view in self._maps.values():
+                view.close()
+            self._maps.clear()
+
+
+class PackWriter(PackReader):
+    """Grava arquivos pequenos anexando-os a pacotes (só acrescenta, nunca reescreve).
+
+    Parte do índice existente: arquivos inalterados continuam onde estão e
+    os novos/alterados vão para o fim do pacote atual. O índice só é gravado
+    em save() ou checkpoint(), de forma atômica; até lá o índice anterior
+    continua válido, então uma queda deixa apenas bytes órfãos, removidos na
+    próxima gravação junto com pacotes sem referências.
+    """
+
+    def __init__(self, vault_folder, limit=None):
+        stored, files = load_index(vault_folder)
+        super().__init__(vault_folder, limit or stored, files)
+        os.makedirs(self.folder, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = None
+        self._name = None
+        self._stale = []  # cópias soltas substituídas por entradas de pacote
+        numbers = [int(name[5:-len(PACK_SUFFIX)]) for name in os.listdir(self.folder)
+                   if name.startswith("pack-") and name.endswith(PACK_SUFFIX) and name[5:-len(PACK_SUFFIX)].isdigit()]
+        self._next = max(numbers, default=0) + 1
+
+    def _roll(self):
+        if self._file is not None:
+            self._file.close()
+        self._name = f"pack-{self._next:06d}{PACK_SUFFIX}"
+        self._next += 1
+        self._file = open(os.path.join(self.folder, self._name), 'ab')
+
+    def add(self, rel, data, mtime, loose=None):
+        """Anexa `data` como `rel`. `loose`: cópia solta antiga, removida em save()."""
+        key = rel.replace(os.sep, "/")
+        with self._lock:
+            if self._file is None or self._file.tell() >= PACK_SIZE:
+                self._roll()
+            offset = self._file.tell()
+            self._file.write(data)
+            previous = self.files.get(key)
+            self.files[key] = [self._name, offset, len(data), mtime]
+            if previous is None and loose is not None:
+                self._stale.append(loose)
+
+    def discard(self, rel):
+        """`rel` passou a ser gravado solto (ou saiu do cofre)."""
+        with self._lock:
+            self.files.pop(rel.replace(os.sep, "/"), None)
+
+    def _compact(self):
+        """Regrava no pacote atual os vivos de pacotes antigos quase vazios."""
+        live, sizes = {}, {}
+        for entry in self.files.values():
+            live[entry[PACK]] = live.get(entry[PACK], 0) + entry[LENGTH]
+        for name in live:
+            try:
+                sizes[name] = os.path.getsize(os.path.join(self.folder, name))
+            except OSError:
+                pass
+        sparse = {name for name, size in sizes.items()
+                  if name != self._name and size and live[name] < size * COMPACT_RATIO}
+        for rel, entry in list(self.files.items()):
+            if entry[PACK] in sparse:
+                self.add(rel, self.read(rel), entry[MTIME])
+        return len(sparse)
+
+    def _write_index(self):
+        """Fecha o pacote atual (dados no disco), grava o índice e remove as cópias soltas substituídas."""
+        self.close()
+        path = index_path(os.path.dirname(self.folder))
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "limit": self.limit, "files": self.files}, f,
+                      separators=(',', ':'))
+        os.replace(tmp, path)
+        for loose in self._stale:
+            try: os.remove(loose)
+            except OSError: pass
+        self._stale = []
+
+    def checkpoint(self):
+        """Grava o índice como está, sem podar nem compactar (execução interrompida).
+
+        Os arquivos já anexados passam a ser encontrados pela retomada.
+        """
+        self._write_index()
+
+    def save(self, keep):
+        """Grava o índice só com os `keep` (rel do manifesto) e apaga o que ficou órfão."""
+        self.files = {rel: entry for rel, entry in self.files.items() if rel in keep}
+        compacted = self._compact()
+        self._write_index()
+        used = {entry[PACK] for entry in self.files.values()}
+        for name in os.listdir(self.folder):
+            if name.endswith(PACK_SUFFIX) and name not in used:
+                try: os.remove(os.path.join(self.folder, name))
+                except OSError: pass
+        return compacted
+
+    def stats(self):
+        """(arquivos, pacotes, bytes) do índice."""
+        return (len(self.files), len({entry[PACK] for entry in self.files.values()}),
+                sum(entry[LENGTH] for entry in self.files.values()))
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
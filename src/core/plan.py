@@ -0,0 +1,59 @@
+ADDED = "added"
+CHANGED = "changed"
+UNCHANGED = "unchanged"
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class RestorePlan:
+    """Diferença entre o cofre e a Steam: o que a restauração vai gravar.
+
+    Guarda os jobs (origem, destino, rel, módulo, tamanho) novos e alterados;
+    os inalterados só entram na contagem.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.unchanged = 0
+        self.unchanged_bytes = 0
+
+    def add(self, status, job):
+        if status == ADDED:
+            self.added.append(job)
+        elif status == CHANGED:
+            self.changed.append(job)
+        else:
+            self.unchanged += 1
+            self.unchanged_bytes += job[4]
+
+    def jobs(self):
+        """Jobs que precisam ser gravados (novos + alterados)."""
+        return self.added + self.changed
+
+    @property
+    def pending(self):
+        return len(self.added) + len(self.changed)
+
+    @staticmethod
+    def _bytes(jobs):
+        return sum(job[4] for job in jobs)
+
+    def lines(self):
+        return [
+            f"[INFO] Plano: {len(self.added)} novos ({_mb(self._bytes(self.added))}), "
+            f"{len(self.changed)} alterados ({_mb(self._bytes(self.changed))}), "
+            f"{self.unchanged} inalterados ({_mb(self.unchanged_bytes)})",
+        ]
+
+    def to_dict(self):
+        return {
+            "added": len(self.added),
+            "added_bytes": self._bytes(self.added),
+            "changed": len(self.changed),
+            "changed_bytes": self._bytes(self.changed),
+            "unchanged": self.unchanged,
+            "unchanged_bytes": self.unchanged_bytes,
+        }
@@ -0,0 +1,147 @@
+import os
+import queue
+import threading
+
+from src.core.fastcopy import TMP_SUFFIX
+
+SCAN_WORKERS = 4   # threads da varredura paralela (uma subárvore por vez cada)
+SCAN_BATCH = 256   # entradas por lote entre as threads de varredura e o consumidor
+
+
+def _always():
+    return True
+
+
+def scan_tree(root, rel_base="", selection=None, running=_always):
+    """Gera (caminho, rel, stat) de cada arquivo sob `root` via os.scandir.
+
+    O stat vem do DirEntry (no Windows sem syscall extra; no Linux uma
+    única chamada, já guardada) e segue para as fases de comparação e
+    cópia, que não precisam consultar o arquivo de novo. `rel` é montado
+    por concatenação a partir de `rel_base`, sem relpath. Com `selection`,
+    pastas fora do filtro nem são abertas. Cópias incompletas (TMP_SUFFIX)
+    não entram.
+    """
+    stack = [(root, rel_base)]
+    while stack and running():
+        directory, rel_dir = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if not running(): break
+                try:
+                    rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if selection is None or selection.descend(rel):
+                            stack.append((entry.path, rel))
+                    elif entry.is_file() and not entry.name.endswith(TMP_SUFFIX):
+                        if selection is None or selection.match(rel):
+                            yield entry.path, rel, entry.stat()
+                except OSError:
+                    continue
+
+
+def scan_parallel(root, rel_base="", selection=None, running=_always, workers=SCAN_WORKERS):
+    """Como scan_tree, mas cada subpasta de primeiro nível numa thread.
+
+    Pensado para userdata/<conta>: contas grandes são varridas ao mesmo
+    tempo, o que compensa quando o custo é a latência de metadados (HDD,
+    rede, comparação incremental). A ordem de saída não é determinística.
+    """
+    subtrees = []
+    files = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    rel = os.path.join(rel_base, entry.name) if rel_base else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if selection is None or selection.descend(rel):
+                            subtrees.append((entry.path, rel))
+                    elif entry.is_file() and not entry.name.endswith(TMP_SUFFIX) \
+                            and (selection is None or selection.match(rel)):
+                        files.append((entry.path, rel, entry.stat()))
+                except OSError:
+                    continue
+    except OSError:
+        return
+    yield from files
+    if len(subtrees) <= 1 or workers <= 1:
+        for path, rel in subtrees:
+            yield from scan_tree(path, rel, selection, running)
+        return
+
+    pending = queue.Queue()
+    for subtree in subtrees:
+        pending.put(subtree)
+    out = queue.Queue(maxsize=workers * 4)
+    stop = threading.Event()
+    alive = lambda: running() and not stop.is_set()
+
+    def put(item):
+        # Consumidor pode ter desistido (gerador fechado): não bloqueia para sempre
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def worker():
+        try:
+            while alive():
+                try:
+                    path, rel = pending.get_nowait()
+                except queue.Empty:
+                    break
+                batch = []
+                for item in scan_tree(path, rel, selection, alive):
+                    batch.append(item)
+                    if len(batch) >= SCAN_BATCH:
+                        put(batch)
+                        batch = []
+                if batch:
+                    put(batch)
+        finally:
+            put(None)
+
+    n_threads = min(workers, len(subtrees))
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    try:
+        finished = 0
+        while finished < n_threads:
+            batch = out.get()
+            if batch is None:
+                finished += 1
+                continue
+            yield from batch
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+def count_files(root):
+    """Conta arquivos sob `root` recursivamente (0 se não existir), sem stat."""
+    count = 0
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        count += 1
+                except OSError:
+                    continue
+    return count
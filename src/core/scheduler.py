@@ -0,0 +1,116 @@
+import os
+import sys
+
+# Arquivos abaixo deste tamanho vão em lote para a fila de pequenos
+SMALL_FILE_LIMIT = 256 * 1024
+BATCH_FILES = 64
+BATCH_BYTES = 8 * 1024 * 1024
+# Arquivos grandes são copiados em blocos maiores
+LARGE_CHUNK = 8 * 1024 * 1024
+
+# Threads por fila (pequenos, grandes) conforme o tipo do destino
+WORKER_PROFILES = {
+    "ssd": (12, 4),
+    "hdd": (4, 1),       # limitado por seek: mais threads só disputam o braço
+    "network": (16, 4),  # limitado por latência: mais operações em voo
+    "unknown": (6, 2),
+}
+
+NETWORK_FS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "sshfs", "fuse.sshfs", "9p", "davfs", "afs"}
+
+
+def _existing_parent(path):
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    return path
+
+
+def _linux_storage(path):
+    """Tipo do armazenamento via /proc/mounts e /sys/dev/block (Linux)."""
+    best, fstype = "", ""
+    try:
+        with open("/proc/mounts", 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount = parts[1].replace("\\040", " ")
+                if (path == mount or path.startswith(mount.rstrip("/") + "/")) and len(mount) > len(best):
+                    best, fstype = mount, parts[2]
+    except OSError:
+        return "unknown"
+    if fstype in NETWORK_FS:
+        return "network"
+
+    try:
+        dev = os.stat(path).st_dev
+        block = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+    except OSError:
+        return "unknown"
+    # Partições não têm queue/; o disco é a pasta pai
+    for candidate in (block, os.path.dirname(block)):
+        try:
+            with open(os.path.join(candidate, "queue", "rotational"), 'r') as f:
+                return "hdd" if f.read().strip() == "1" else "ssd"
+        except OSError:
+            continue
+    return "unknown"
+
+
+def _windows_storage(path):
+    """Unidades de rede via GetDriveTypeW; SSD/HDD não é detectado."""
+    if path.startswith("\\\\"):
+        return "network"
+    try:
+        import ctypes
+        drive = os.path.splitdrive(path)[0] + "\\"
+        if ctypes.windll.kernel32.GetDriveTypeW(drive) == 4:  # DRIVE_REMOTE
+            return "network"
+    except Exception:
+        pass
+    return "unknown"
+
+
+def detect_storage(path):
+    """Classifica o destino como "ssd", "hdd", "network" ou "unknown"."""
+    if not path:
+        return "unknown"
+    path = _existing_parent(path)
+    if sys.platform == 'win32':
+        return _windows_storage(path)
+    if sys.platform.startswith("linux"):
+        return _linux_storage(path)
+    return "unknown"
+
+
+def plan_workers(path):
+    """(tipo, threads de pequenos, threads de grandes) para o destino."""
+    kind = detect_storage(path)
+    small, large = WORKER_PROFILES[kind]
+    return kind, small, large
+
+
+def batch_jobs(jobs, size_of):
+    """Separa jobs em lotes de arquivos pequenos e jobs isolados de grandes.
+
+    Gera ("small", [jobs...]) com até BATCH_FILES arquivos / BATCH_BYTES, e
+    ("large", [job]) para cada arquivo >= SMALL_FILE_LIMIT. Um lote pequeno
+    vira uma única task, reduzindo o custo por arquivo da fila.
+    """
+    batch, batch_bytes = [], 0
+    for job in jobs:
+        size = size_of(job)
+        if size >= SMALL_FILE_LIMIT:
+            yield "large", [job]
+            continue
+        batch.append(job)
+        batch_bytes += size
+        if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+            yield "small", batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield "small", batch
@@ -0,0 +1,129 @@
+import os
+import re
+
+# AppIDs referenciados por um .lua do SteamTools (o próprio app e seus depots)
+_LUA_IDS = re.compile(r'(?:addappid|setManifestid)\s*\(\s*(\d+)')
+
+
+def _split_ids(values):
+    """"730,440" ou ["730,440", "570"] -> {"730", "440", "570"}."""
+    if isinstance(values, str):
+        values = [values]
+    ids = set()
+    for value in values or ():
+        ids.update(v.strip() for v in str(value).split(",") if v.strip())
+    return ids
+
+
+def load_depot_map(root):
+    """depot -> AppID a partir dos .lua do SteamTools em config/stplug-in."""
+    depots = {}
+    try:
+        entries = os.scandir(os.path.join(root, "config", "stplug-in"))
+    except OSError:
+        return depots
+    with entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext != ".lua" or not stem.isdigit():
+                continue
+            try:
+                with open(entry.path, 'r', encoding='utf-8', errors='ignore') as f:
+                    for depot in _LUA_IDS.findall(f.read()):
+                        depots.setdefault(depot, stem)
+            except OSError:
+                continue
+    return depots
+
+
+def classify(rel, depots=None):
+    """(conta, AppID) de um caminho relativo do cofre; None onde não se aplica.
+
+    userdata/<conta>/<appid>/...               -> (conta, appid)
+    userdata/<conta>/config/...                -> (conta, None)
+    appcache/stats/UserGameStats_<c>_<a>.bin   -> (c, a)
+    appcache/stats/UserGameStatsSchema_<a>.bin -> (None, a)
+    config/stplug-in/<appid>.lua               -> (None, appid)
+    config/depotcache/<depot>_<id>.manifest    -> (None, appid do depot, se conhecido)
+    """
+    parts = rel.replace(os.sep, "/").split("/")
+    if parts[0] == "userdata" and len(parts) >= 3:
+        app = parts[2] if len(parts) >= 4 and parts[2].isdigit() else None
+        return parts[1], app
+    if len(parts) != 3:
+        return None, None
+    stem = os.path.splitext(parts[2])[0]
+    if parts[:2] == ["appcache", "stats"]:
+        fields = stem.split("_")
+        if fields[0] == "UserGameStats" and len(fields) == 3:
+            return fields[1], fields[2]
+        if fields[0] == "UserGameStatsSchema" and len(fields) == 2:
+            return None, fields[1]
+    elif parts[:2] == ["config", "stplug-in"]:
+        return None, stem if stem.isdigit() else None
+    elif parts[:2] == ["config", "depotcache"]:
+        return None, (depots or {}).get(stem.split("_")[0])
+    return None, None
+
+
+class Selection:
+    """Filtro de backup/restauração por conta e AppID.
+
+    Filtros de conta valem só para arquivos ligados a uma conta (userdata,
+    UserGameStats). Com `apps` definido, arquivos sem AppID (configs da
+    conta, DLLs, depots desconhecidos) ficam de fora.
+    """
+
+    def __init__(self, apps=None, accounts=None, exclude_apps=None, exclude_accounts=None):
+        self.apps = _split_ids(apps)
+        self.accounts = _split_ids(accounts)
+        self.exclude_apps = _split_ids(exclude_apps)
+        self.exclude_accounts = _split_ids(exclude_accounts)
+        self.depots = {}
+
+    @property
+    def active(self):
+        return bool(self.apps or self.accounts or self.exclude_apps or self.exclude_accounts)
+
+    def bind(self, root):
+        """Carrega o mapa depot -> AppID da árvore que será lida."""
+        if self.apps or self.exclude_apps:
+            self.depots = load_depot_map(root)
+        return self
+
+    def _account_ok(self, account):
+        return (not self.accounts or account in self.accounts) and account not in self.exclude_accounts
+
+    def _app_ok(self, app):
+        return (not self.apps or app in self.apps) and app not in self.exclude_apps
+
+    def allows(self, account, app):
+        if account is not None and not self._account_ok(account):
+            return False
+        if app is None:
+            return not self.apps
+        return self._app_ok(app)
+
+    def match(self, rel):
+        return self.allows(*classify(rel, self.depots))
+
+    def descend(self, rel_dir):
+        """False se nada sob a pasta pode ser selecionado (poda da varredura)."""
+        parts = rel_dir.replace(os.sep, "/").split("/")
+        if parts[0] != "userdata" or len(parts) < 2:
+            return True
+        if not self._account_ok(parts[1]):
+            return False
+        if len(parts) >= 3:
+            if parts[2].isdigit():
+                return self._app_ok(parts[2])
+            return not self.apps
+        return True
+
+    def describe(self):
+        parts = []
+        for label, ids in (("apps", self.apps), ("contas", self.accounts),
+                           ("exceto apps", self.exclude_apps), ("exceto contas", self.exclude_accounts)):
+            if ids:
+                parts.append(f"{label} {', '.join(sorted(ids))}")
+        return "; ".join(parts)
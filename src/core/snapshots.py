@@ -0,0 +1,259 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+
+from src.core import compress as zpack
+from src.core.manifest import Manifest, HASH, MTIME
+from src.core.fastcopy import copy_file, TMP_SUFFIX
+
+SNAPSHOT_ROOT = "SteamVault_Snapshots"
+HASH_BUFFER = 1024 * 1024
+
+
+class SnapshotStore:
+    """Armazém de snapshots com deduplicação por conteúdo.
+
+    Layout sob a raiz de backup:
+        SteamVault_Snapshots/objects/ab/abcdef...   blobs endereçados por hash
+        SteamVault_Snapshots/objects/ab/abcdef...z  o mesmo blob comprimido (compress=True)
+        SteamVault_Snapshots/snapshots/<id>.json    um manifesto por snapshot
+        SteamVault_Snapshots/dicts/<id>.zdict       dicionários de compressão
+
+    Cada snapshot novo só grava os blobs que ainda não existem no armazém.
+    Um blob comprimido registra o id do dicionário usado, então blobs de
+    dicionários antigos continuam legíveis.
+    """
+
+    def __init__(self, backup_root, throttle=None, compress=False):
+        self.root = os.path.join(backup_root, SNAPSHOT_ROOT)
+        self.throttle = throttle  # throttle(n) por bloco lido/gravado (limite de banda)
+        self.compress = compress
+        self.objects = os.path.join(self.root, "objects")
+        self.snapshots = os.path.join(self.root, "snapshots")
+        self.dicts = os.path.join(self.root, "dicts")
+        self._lock = threading.Lock()
+        self._zdicts = {}  # id -> dicionário, para descomprimir
+        self.zdict = None  # dicionário dos blobs novos
+        self.new_bytes = 0
+        self.new_objects = 0
+
+    @staticmethod
+    def exists(backup_root):
+        return os.path.isdir(os.path.join(backup_root, SNAPSHOT_ROOT, "snapshots"))
+
+    def ensure(self):
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.snapshots, exist_ok=True)
+
+    def object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest)
+
+    def packed_path(self, digest):
+        return self.object_path(digest) + zpack.COMPRESS_SUFFIX
+
+    def has_object(self, digest):
+        return os.path.exists(self.packed_path(digest)) or os.path.exists(self.object_path(digest))
+
+    def load_dictionary(self):
+        """Usa o dicionário atual do armazém (dicts/current); False se não houver."""
+        try:
+            with open(os.path.join(self.dicts, "current"), 'r', encoding='utf-8') as f:
+                name = f.read().strip()
+            self.zdict = zpack.load_dictionary(os.path.join(self.dicts, name + ".zdict"))
+        except OSError:
+            return False
+        return True
+
+    def save_dictionary(self, zdict):
+        """Grava `zdict` e o torna o dicionário atual; retorna o id (hex)."""
+        name = zpack.save_dictionary(self.dicts, zdict)
+        with open(os.path.join(self.dicts, "current"), 'w', encoding='utf-8') as f:
+            f.write(name)
+        self.zdict = zdict
+        return name
+
+    def _dictionary(self, dict_id):
+        if dict_id is None:
+            return None
+        with self._lock:
+            zdict = self._zdicts.get(dict_id)
+        if zdict is None:
+            zdict = zpack.load_dictionary(os.path.join(self.dicts, dict_id.hex() + ".zdict"))
+            with self._lock:
+                self._zdicts[dict_id] = zdict
+        return zdict
+
+    def put_file(self, src):
+        """Armazena o arquivo lendo-o uma única vez (hash + escrita temporária).
+
+        Com compress=True o blob é comprimido com o dicionário atual; se o
+        primeiro bloco não encolher (dados já comprimidos), segue cru. Se o
+        blob já existir, o temporário é descartado. Retorna
+        (ok, src|erro, (size, mtime, hash, bytes gravados)) como as tasks de
+        cópia do motor.
+        """
+        tmp = os.path.join(self.objects, f"tmp-{threading.get_ident()}-{time.monotonic_ns()}")
+        try:
+            h = hashlib.blake2b(digest_size=16)
+            with open(src, 'rb') as fsrc, open(tmp, 'wb') as fdst:
+                st = os.fstat(fsrc.fileno())
+                header, packer = zpack.packer(self.zdict) if self.compress else (None, None)
+                first = True
+                for chunk in iter(lambda: fsrc.read(HASH_BUFFER), b''):
+                    h.update(chunk)
+                    if packer is None:
+                        fdst.write(chunk)
+                    elif first:
+                        # Arquivos pequenos cabem num bloco só: decide pelo resultado completo
+                        data = packer.compress(chunk) + packer.flush(zlib.Z_SYNC_FLUSH)
+                        if len(data) + len(header) > len(chunk) * zpack.MIN_SAVING:
+                            packer = None
+                            fdst.write(chunk)
+                        else:
+                            fdst.write(header)
+                            fdst.write(data)
+                    else:
+                        fdst.write(packer.compress(chunk))
+                    first = False
+                    if self.throttle is not None:
+                        self.throttle(len(chunk))
+                if first:
+                    packer = None  # arquivo vazio: blob cru
+                elif packer is not None:
+                    fdst.write(packer.flush())
+                stored = fdst.tell()
+            digest = h.hexdigest()
+            target = self.object_path(digest) if packer is None else self.packed_path(digest)
+            if self.has_object(digest):
+                os.remove(tmp)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(tmp, target)
+                with self._lock:
+                    self.new_bytes += stored
+                    self.new_objects += 1
+            return (True, src, (st.st_size, st.st_mtime, digest, stored))
+        except Exception as e:
+            try: os.remove(tmp)
+            except OSError: pass
+            return (False, f"{src}: {e}", None)
+
+    def read_object(self, digest, on_read=None):
+        """Gera o conteúdo original do blob em blocos (descomprimindo se preciso)."""
+        packed = self.packed_path(digest)
+        if os.path.exists(packed):
+            with open(packed, 'rb') as f:
+                zdict = self._dictionary(zpack.read_header(f))
+                yield from zpack.unpack(f, zdict, on_read=on_read)
+            return
+        with open(self.object_path(digest), 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_BUFFER), b''):
+                if on_read is not None:
+                    on_read(len(chunk))
+                yield chunk
+
+    def hash_object(self, digest):
+        """Hash do conteúdo original do blob (None se ausente)."""
+        if not self.has_object(digest):
+            return None
+        h = hashlib.blake2b(digest_size=16)
+        for chunk in self.read_object(digest):
+            h.update(chunk)
+        return h.hexdigest()
+
+    def restore_file(self, digest, dst, mtime):
+        """Copia (ou descomprime) um blob para o destino e aplica o mtime registrado.
+
+        Retorna (método de cópia, tamanho, bytes comprimidos lidos | None).
+        """
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        packed = self.packed_path(digest)
+        if not os.path.exists(packed):
+            method, size, _, _ = copy_file(self.object_path(digest), dst, throttle=self.throttle)
+            os.utime(dst, (mtime, mtime))
+            return method, size, None
+        tmp = dst + TMP_SUFFIX
+        try:
+            with open(tmp, 'wb') as fdst:
+                for chunk in self.read_object(digest, self.throttle):
+                    fdst.write(chunk)
+                size = fdst.tell()
+            os.utime(tmp, (mtime, mtime))
+            os.replace(tmp, dst)
+        except BaseException:
+            try: os.remove(tmp)
+            except OSError: pass
+            raise
+        return "zlib", size, os.path.getsize(packed)
+
+    def new_id(self):
+        """Id ordenável pela data; sufixo evita colisão no mesmo segundo."""
+        base = time.strftime("%Y%m%d-%H%M%S")
+        snap_id, n = base, 1
+        while os.path.exists(os.path.join(self.snapshots, snap_id + ".json")):
+            n += 1
+            snap_id = f"{base}-{n}"
+        return snap_id
+
+    def list(self):
+        """Ids dos snapshots, do mais antigo ao mais recente."""
+        if not os.path.isdir(self.snapshots):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.snapshots) if name.endswith(".json"))
+
+    def load(self, snap_id):
+        if snap_id == "latest":
+            ids = self.list()
+            if not ids:
+                return None
+            snap_id = ids[-1]
+        return Manifest.load_file(os.path.join(self.snapshots, snap_id + ".json"))
+
+    def save(self, snap_id, manifest):
+        manifest.save_file(os.path.join(self.snapshots, snap_id + ".json"))
+
+    def prune(self, keep):
+        """Mantém os `keep` snapshots mais recentes e apaga blobs órfãos.
+
+        Retorna (snapshots removidos, blobs removidos).
+        """
+        ids = self.list()
+        dropped = ids[:-keep] if keep > 0 else []
+        for snap_id in dropped:
+            os.remove(os.path.join(self.snapshots, snap_id + ".json"))
+        if not dropped:
+            return 0, 0
+
+        referenced = set()
+        for snap_id in self.list():
+            manifest = self.load(snap_id)
+            if manifest is not None:
+                referenced.update(entry[HASH] for rel, entry in manifest.entries())
+        removed = 0
+        for prefix in os.listdir(self.objects):
+            folder = os.path.join(self.objects, prefix)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.removesuffix(zpack.COMPRESS_SUFFIX) not in referenced:
+                    os.remove(os.path.join(folder, name))
+                    removed += 1
+        return len(dropped), removed
+
+    def restore_task(self, manifest, stats=None):
+        """Task de cópia (src, dst, rel, st) para restaurar blobs deste snapshot.
+
+        O meta traz (size, mtime, hash, bytes comprimidos | None).
+        """
+        def task(digest, dst, rel, st=None):
+            try:
+                entry = manifest.get(rel)
+                method, size, stored = self.restore_file(digest, dst, entry[MTIME])
+                if stats is not None:
+                    stats.add(method, size)
+                return (True, dst, (size, entry[MTIME], digest, stored))
+            except Exception as e:
+                return (False, f"{rel}: {e}", None)
+        return task
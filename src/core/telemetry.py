@@ -0,0 +1,127 @@
+import heapq
+import time
+
+SLOWEST_KEPT = 5  # arquivos mais lentos listados no resumo
+
+
+def _mb(size):
+    return size / (1024 * 1024)
+
+
+class Telemetry:
+    """Progresso em bytes, vazão, ETA e estatísticas por módulo de uma execução.
+
+    Alimentada na thread chamadora do pipeline (um add() por arquivo); o
+    total é uma estimativa que cresce conforme a varredura encontra arquivos.
+    """
+
+    def __init__(self, estimate_files=0, estimate_bytes=0):
+        self.started = time.monotonic()
+        self.finished = None
+        self.files_done = 0
+        self.bytes_done = 0
+        self.files_copied = 0
+        self.bytes_copied = 0
+        self.files_total = estimate_files
+        self.bytes_total = estimate_bytes
+        self.modules = {}  # módulo -> [arquivos, bytes, segundos de cópia]
+        self.packed = {}  # módulo -> [bytes originais, bytes no armazém] (snapshots comprimidos)
+        self._slowest = []  # heap (segundos, rel, tamanho)
+
+    def set_total(self, files, size):
+        self.files_total = max(files, self.files_done)
+        self.bytes_total = max(size, self.bytes_done)
+
+    def add(self, module, rel, size, seconds, copied=True):
+        """Registra um arquivo concluído (copiado, ou só conferido se copied=False)."""
+        self.files_done += 1
+        self.bytes_done += size
+        if not copied:
+            return
+        self.files_copied += 1
+        self.bytes_copied += size
+        stats = self.modules.setdefault(module, [0, 0, 0.0])
+        stats[0] += 1
+        stats[1] += size
+        stats[2] += seconds
+        item = (seconds, rel, size)
+        if len(self._slowest) < SLOWEST_KEPT:
+            heapq.heappush(self._slowest, item)
+        elif item > self._slowest[0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def add_packed(self, module, size, stored):
+        """Registra o tamanho original e o armazenado de um blob (taxa de compressão)."""
+        packed = self.packed.setdefault(module, [0, 0])
+        packed[0] += size
+        packed[1] += stored
+
+    def compression(self):
+        """{módulo: taxa, bytes e vazão por thread} dos blobs comprimidos/descomprimidos."""
+        out = {}
+        for module, (size, stored) in self.packed.items():
+            seconds = self.modules.get(module, [0, 0, 0.0])[2]
+            out[module] = {"bytes": size, "stored": stored, "ratio": round(stored / size, 3) if size else None,
+                           "mb_per_sec": round(_mb(size) / seconds, 1) if seconds > 0 else None}
+        return out
+
+    def finish(self):
+        self.finished = time.monotonic()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    def slowest(self):
+        """[(rel, tamanho, segundos)] do mais lento ao mais rápido."""
+        return [(rel, size, seconds) for seconds, rel, size in sorted(self._slowest, reverse=True)]
+
+    def snapshot(self):
+        """Estado atual para GUI/CLI/plugin (dict serializável em JSON)."""
+        elapsed = self.elapsed
+        bytes_rate = self.bytes_done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if self.finished is None and bytes_rate > 0 and self.bytes_total:
+            eta = max(0.0, self.bytes_total - self.bytes_done) / bytes_rate
+        return {
+            "files_done": self.files_done,
+            "files_total": self.files_total,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "files_copied": self.files_copied,
+            "bytes_copied": self.bytes_copied,
+            "elapsed": round(elapsed, 2),
+            "bytes_per_sec": round(self.bytes_copied / elapsed) if elapsed > 0 else 0,
+            "files_per_sec": round(self.files_done / elapsed, 1) if elapsed > 0 else 0.0,
+            "eta": round(eta, 1) if eta is not None else None,
+            "compression": self.compression(),
+        }
+
+    def summary(self):
+        """Resumo final: por módulo e os arquivos mais lentos."""
+        return {
+            "modules": {module: {"files": files, "bytes": size, "seconds": round(seconds, 3)}
+                        for module, (files, size, seconds) in self.modules.items()},
+            "slowest": [{"file": rel, "bytes": size, "seconds": round(seconds, 3)}
+                        for rel, size, seconds in self.slowest()],
+            **self.snapshot(),
+        }
+
+    def lines(self):
+        """Linhas de log do resumo final."""
+        elapsed = self.elapsed
+        rate = _mb(self.bytes_copied) / elapsed if elapsed > 0 else 0.0
+        out = [f"[INFO] Tempo: {elapsed:.1f}s · {_mb(self.bytes_copied):.1f} MB copiados · {rate:.1f} MB/s · "
+               f"{self.files_done / elapsed if elapsed > 0 else 0:.0f} arq/s"]
+        for module, (files, size, seconds) in sorted(self.modules.items()):
+            out.append(f"[INFO]    {module:<11} {files:>7} arq. {_mb(size):>9.1f} MB {seconds:>8.1f}s de cópia")
+        for module, info in sorted(self.compression().items()):
+            ratio = f"{info['ratio'] * 100:.0f}%" if info["ratio"] is not None else "-"
+            rate = f"{info['mb_per_sec']:.1f} MB/s por thread" if info["mb_per_sec"] is not None else "-"
+            out.append(f"[INFO]    {module:<11} {_mb(info['bytes']):>9.1f} MB -> {_mb(info['stored']):>9.1f} MB "
+                       f"({ratio}) · {rate}")
+        slowest = self.slowest()
+        if slowest:
+            out.append("[INFO] Mais lentos:")
+            out.extend(f"[INFO]    {seconds:>7.2f}s {_mb(size):>9.1f} MB  {rel}" for rel, size, seconds in slowest)
+        return out
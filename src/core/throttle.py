@@ -0,0 +1,148 @@
+import ctypes
+import platform
+import sys
+import threading
+import time
+
+BURST_SECONDS = 0.5  # crédito máximo acumulado pelo balde, em segundos de taxa
+SLEEP_SLICE = 0.1    # espera em fatias para reagir a cancelamento e mudança de limite
+
+# ioprio_set(2): número da syscall por arquitetura (Linux)
+_IOPRIO_SYSCALL = {"x86_64": 251, "amd64": 251, "i386": 289, "i686": 289, "aarch64": 30, "arm64": 30,
+                   "armv7l": 314, "ppc64le": 273, "riscv64": 30}
+IOPRIO_WHO_PROCESS = 1  # com who=0: a thread chamadora
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASS_BE = 2
+IOPRIO_CLASS_IDLE = 3
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+THREAD_MODE_BACKGROUND_END = 0x00020000
+
+
+class TokenBucket:
+    """Balde de fichas compartilhado entre threads; rate <= 0 = sem limite.
+
+    consume() desconta já e, se o saldo ficar negativo (dívida), espera o
+    tempo de reposição. A taxa pode mudar a qualquer momento: quem está
+    esperando recalcula a espera na próxima fatia.
+    """
+
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.rate = rate
+        self.tokens = 0.0
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        if self.rate > 0:
+            self.tokens = min(self.tokens + (now - self.stamp) * self.rate, self.rate * BURST_SECONDS)
+        self.stamp = now
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+            if rate <= 0:
+                self.tokens = 0.0
+
+    def consume(self, amount, should_continue=None):
+        """Desconta `amount` e bloqueia até o saldo voltar a zero (ou cancelar)."""
+        with self._lock:
+            if self.rate <= 0:
+                return
+            self._refill(time.monotonic())
+            self.tokens -= amount
+        while True:
+            with self._lock:
+                if self.rate <= 0:
+                    self.tokens = 0.0
+                    return
+                self._refill(time.monotonic())
+                if self.tokens >= 0:
+                    return
+                wait = -self.tokens / self.rate
+            if should_continue is not None and not should_continue():
+                return
+            time.sleep(min(wait, SLEEP_SLICE))
+
+
+def _set_thread_io_priority(idle):
+    """Prioridade de E/S da thread atual: ociosa (idle) ou normal. True se aplicada."""
+    if sys.platform.startswith("linux"):
+        number = _IOPRIO_SYSCALL.get(platform.machine().lower())
+        if number is None:
+            return False
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            value = (IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT) if idle else (IOPRIO_CLASS_BE << IOPRIO_CLASS_SHIFT | 4)
+            return libc.syscall(number, IOPRIO_WHO_PROCESS, 0, value) == 0
+        except (OSError, AttributeError):
+            return False
+    if sys.platform == 'win32':
+        try:
+            kernel32 = ctypes.windll.kernel32
+            mode = THREAD_MODE_BACKGROUND_BEGIN if idle else THREAD_MODE_BACKGROUND_END
+            return bool(kernel32.SetThreadPriority(kernel32.GetCurrentThread(), mode))
+        except (OSError, AttributeError):
+            return False
+    return False
+
+
+class IoLimits:
+    """Limites de E/S do motor: bytes/s, operações (arquivos)/s e prioridade ociosa.
+
+    Compartilhado pelas threads de cópia e ajustável durante a execução
+    (GUI, CLI via vault_config.json, plugin); 0 desativa cada limite.
+    """
+
+    def __init__(self, bytes_per_sec=0, ops_per_sec=0, idle=False):
+        self.bytes = TokenBucket(bytes_per_sec)
+        self.ops = TokenBucket(ops_per_sec)
+        self.idle = idle
+        self._applied = threading.local()
+
+    @classmethod
+    def from_config(cls, config):
+        limits = cls()
+        limits.update_from_config(config)
+        return limits
+
+    def update_from_config(self, config):
+        self.configure(int(float(config.get("max_mb_per_sec") or 0) * 1024 * 1024),
+                       int(config.get("max_ops_per_sec") or 0), bool(config.get("idle_io", False)))
+
+    def configure(self, bytes_per_sec=None, ops_per_sec=None, idle=None):
+        """Altera os limites informados (None mantém o atual)."""
+        if bytes_per_sec is not None:
+            self.bytes.set_rate(max(0, bytes_per_sec))
+        if ops_per_sec is not None:
+            self.ops.set_rate(max(0, ops_per_sec))
+        if idle is not None:
+            self.idle = bool(idle)
+
+    @property
+    def active(self):
+        return self.bytes.rate > 0 or self.ops.rate > 0 or self.idle
+
+    def data(self, size, should_continue=None):
+        self.bytes.consume(size, should_continue)
+
+    def op(self, should_continue=None):
+        self.ops.consume(1, should_continue)
+
+    def apply_priority(self):
+        """Aplica a prioridade ociosa/normal na thread atual se mudou desde a última vez."""
+        current = getattr(self._applied, "idle", False)
+        if current != self.idle:
+            _set_thread_io_priority(self.idle)
+            self._applied.idle = self.idle
+
+    def to_dict(self):
+        return {"max_mb_per_sec": round(self.bytes.rate / (1024 * 1024), 2), "max_ops_per_sec": self.ops.rate,
+                "idle_io": self.idle}
+
+    def describe(self):
+        parts = [f"{self.bytes.rate / (1024 * 1024):.1f} MB/s" if self.bytes.rate > 0 else "MB/s livre",
+                 f"{self.ops.rate} arq/s" if self.ops.rate > 0 else "arq/s livre"]
+        if self.idle:
+            parts.append("prioridade ociosa")
+        return ", ".join(parts)
@@ -1,24 +1,138 @@
+import hashlib
 import os
+import queue
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import stat
+import tarfile
+import threading
+import time
+import zlib
+
+from src.core.manifest import Manifest, SIZE, MTIME, HASH, MODULE
+from src.core.snapshots import SnapshotStore
+from src.core.archive import (ArchiveWriter, ARCHIVE_SUFFIX, BLOCK_SIZE, MANIFEST_SUFFIX,
+                              iter_archive, safe_member_path)
+from src.core.scheduler import plan_workers, batch_jobs, SMALL_FILE_LIMIT, LARGE_CHUNK
+from src.core.fastcopy import copy_file, CopyStats, CopyCancelled, TMP_SUFFIX
+from src.core.journal import Journal, journal_path, load_journal
+from src.core.verify import VerifyReport, hash_file, OK, MISMATCH, MISSING, EXTRA
+from src.core.plan import RestorePlan, ADDED, CHANGED, UNCHANGED
+from src.core.selection import classify, load_depot_map
+from src.core.telemetry import Telemetry
+from src.core.scan import scan_tree, scan_parallel, count_files
+from src.core.throttle import IoLimits
+from src.core.compress import sample_files, read_samples, train_dictionary
+from src.core.fanout import Destination, fan_out
+from src.core.packs import PackReader, PackWriter, has_packs, LENGTH
 
 APP_NAME = "STEAM VAULT"
-MAX_WORKERS = 8  # Número de threads paralelas
+QUEUE_SIZE = 64  # Lotes em espera por fila entre a varredura e as threads de cópia
+COMPRESS_WORKERS = os.cpu_count() or 2  # mínimo de threads p/ pequenos com compressão
+MTIME_TOLERANCE = 2.0  # FAT/exFAT gravam mtime com resolução de 2s
+HASH_BUFFER = 1024 * 1024
+SKIPPED = "skipped"  # Resultado de task para arquivo inalterado
+
+VAULT_NAME = "SteamVault_Backup"
+LEGACY_VAULT_NAME = "SteamBackup"
+
+# (caminho relativo à Steam / ao cofre, nome do módulo)
+MODULES = [
+    ("userdata", "USERDATA"),
+    (os.path.join("config", "stplug-in"), "STPLUG-IN"),
+    (os.path.join("config", "depotcache"), "DEPOTCACHE"),
+    (os.path.join("appcache", "stats"), "STATS"),
+]
+DLLS = ["version.dll", "winmm.dll"]
+
+
+def resolve_vault(backup_root):
+    """Resolve a pasta do cofre a partir do caminho de backup configurado."""
+    if os.path.basename(backup_root) in [VAULT_NAME, LEGACY_VAULT_NAME]:
+        return backup_root
+    origin = os.path.join(backup_root, VAULT_NAME)
+    # Retrocompatibilidade
+    if not os.path.exists(origin) and os.path.exists(os.path.join(backup_root, LEGACY_VAULT_NAME)):
+        return os.path.join(backup_root, LEGACY_VAULT_NAME)
+    return origin
+
+
+def module_for(rel):
+    """Nome do módulo (USERDATA, STATS, ...) de um caminho relativo do cofre."""
+    rel = rel.replace("/", os.sep)
+    for rel_mod, title in MODULES:
+        if rel.startswith(rel_mod + os.sep):
+            return title
+    return "DLL"
+
+
+def _has_copy(path, size):
+    try:
+        return os.stat(path).st_size == size
+    except OSError:
+        return False
+
+
+def interrupted_run(backup_root, kind):
+    """True se há um backup/restauração ("backup"/"restore") interrompido para retomar."""
+    return load_journal(journal_path(backup_root, kind))[0] is not None
+
+
+def vault_exists(vault_folder):
+    """Verifica se há um cofre sem listar o conteúdo da pasta."""
+    return (Manifest.exists(vault_folder) or os.path.isdir(os.path.join(vault_folder, "userdata"))
+            or os.path.isfile(vault_folder + ARCHIVE_SUFFIX))
+
 
 class VaultEngine:
-    def __init__(self, logger_callback=print, progress_callback=None):
+    """Motor de backup/restauração usado pelo app (CLI/GUI) e pelo plugin Millennium.
+
+    Ganchos: `logger_callback(texto)`, `progress_callback(atual, total)`,
+    `stats_callback(dict)` com bytes, vazão e ETA (Telemetry.snapshot) e
+    `cancel_callback()`, consultado junto com stop(): retornando True, a
+    operação em andamento para no próximo arquivo.
+    """
+
+    def __init__(self, logger_callback=print, progress_callback=None, cancel_callback=None, stats_callback=None,
+                 limits=None):
         self.log = logger_callback
         self.progress = progress_callback  # Callback para progresso (current, total)
-        self.running = True
+        self.stats = stats_callback
+        self.cancelled = cancel_callback
+        self.telemetry = Telemetry()
+        self._stopped = False
+        self.hash_on_copy = False  # Força cópia com buffer para registrar o hash
+        self.workers = None  # (pequenos, grandes) fixos; None usa o perfil do destino
+        self.limits = limits or IoLimits()  # banda, arquivos/s e prioridade; ajustável durante a execução
+        self.copy_stats = CopyStats()
+        self.destinations = None  # destinos do backup em leque em andamento (status por destino)
+
+    @property
+    def running(self):
+        return not self._stopped and not (self.cancelled and self.cancelled())
 
     def stop(self):
-        self.running = False
+        self._stopped = True
+
+    def set_limits(self, bytes_per_sec=None, ops_per_sec=None, idle=None):
+        """Ajusta os limites de E/S, inclusive com uma execução em andamento."""
+        self.limits.configure(bytes_per_sec, ops_per_sec, idle)
+        self.log(f"[INFO] Limites de E/S: {self.limits.describe()}")
+
+    def _throttle(self, size):
+        self.limits.data(size, self._running)
 
     def _report_progress(self, current, total):
         """Reporta progresso se callback disponível."""
         if self.progress:
             self.progress(current, total)
 
+    def _report_stats(self, telemetry):
+        if self.stats:
+            stats = telemetry.snapshot()
+            if self.destinations:
+                stats["destinations"] = [target.status() for target in self.destinations]
+            self.stats(stats)
+
     def safe_create_dir(self, path):
         if not os.path.exists(path):
             try: os.makedirs(path)
@@ -32,174 +146,1454 @@ class VaultEngine:
             self.log(f"[ERRO] Falha: {os.path.basename(src)} - {e}")
         return False
 
-    def _copy_file_task(self, src, dst):
-        """Task para cópia paralela de arquivo."""
+    def _copy_file_task(self, src, dst, st=None):
+        """Task para cópia paralela de arquivo.
+
+        Usa o método mais barato disponível (reflink, copy_file_range,
+        sendfile ou buffer); com hash_on_copy, copia com buffer calculando o
+        hash. Retorna (ok, src|erro, (size, mtime, hash|None)). Arquivos
+        grandes são copiados em blocos de LARGE_CHUNK, verificando
+        cancelamento entre os blocos. `st` é o stat da varredura, se houver.
+        """
         try:
             os.makedirs(os.path.dirname(dst), exist_ok=True)
-            shutil.copy2(src, dst)
-            return (True, src)
+            size = st.st_size if st is not None else os.path.getsize(src)
+            bufsize = LARGE_CHUNK if size >= SMALL_FILE_LIMIT else HASH_BUFFER
+            method, size, mtime, digest = copy_file(src, dst, self.hash_on_copy, bufsize, self._running, self._throttle)
+            self.copy_stats.add(method, size)
+            return (True, src, (size, mtime, digest))
+        except CopyCancelled:
+            return (False, f"{src}: cancelado", None)
         except Exception as e:
-            return (False, f"{src}: {e}")
+            return (False, f"{src}: {e}", None)
 
-    def _count_files_in_folder(self, folder):
-        """Conta arquivos em uma pasta recursivamente."""
-        if not os.path.exists(folder):
+    def _pack_file_task(self, packs, src, dst, rel):
+        """Task para arquivo pequeno no layout com pacotes: anexa o conteúdo ao pacote atual.
+
+        Sem makedirs nem cópia de metadados por arquivo; o hash sai do
+        conteúdo já em memória. Retorna o mesmo que _copy_file_task.
+        """
+        try:
+            with open(src, 'rb') as f:
+                st = os.fstat(f.fileno())
+                data = f.read()
+            self._throttle(len(data))
+            packs.add(rel, data, st.st_mtime, loose=dst)
+            self.copy_stats.add("pack", len(data))
+            return (True, src, (len(data), st.st_mtime, hashlib.blake2b(data, digest_size=16).hexdigest()))
+        except Exception as e:
+            return (False, f"{src}: {e}", None)
+
+    def _layout_task(self, packs):
+        """Task de cópia para o cofre: abaixo do limite vai para pacote, o resto fica solto."""
+        def task(src, dst, rel, st=None):
+            size = st.st_size if st is not None else os.path.getsize(src)
+            if size < packs.limit:
+                return self._pack_file_task(packs, src, dst, rel)
+            packs.discard(rel)
+            return self._copy_file_task(src, dst, st)
+        return task
+
+    def _unpack_task(self, packs):
+        """Task de restauração: arquivos em pacote saem por offset (mmap); os soltos são copiados."""
+        def task(src, dst, rel, st=None):
+            if rel not in packs:
+                return self._copy_file_task(src, dst, st)
+            try:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                size, mtime = packs.extract(rel, dst)
+                self._throttle(size)
+                self.copy_stats.add("pack", size)
+                return (True, src, (size, mtime, None))
+            except Exception as e:
+                return (False, f"{rel}: {e}", None)
+        return task
+
+    def _open_packs(self, vault_folder, pack=0):
+        """PackWriter se o layout com pacotes foi pedido (`pack` = limite em bytes) ou já é o do cofre."""
+        if not pack and not has_packs(vault_folder):
+            return None
+        try:
+            packs = PackWriter(vault_folder, pack or None)
+        except OSError as e:
+            self.log(f"[ERRO] Pacotes indisponíveis ({e}); arquivos pequenos ficarão soltos.")
+            return None
+        self.log(f"[INFO] Layout com pacotes: arquivos < {packs.limit // 1024} KB em {len(packs.files)} entradas")
+        return packs
+
+    def _save_packs(self, packs, manifest):
+        """Grava o índice dos pacotes (antes do manifesto) e registra o resumo."""
+        try:
+            compacted = packs.save(manifest.files)
+        except OSError as e:
+            self.log(f"[ERRO] Gravar índice dos pacotes: {e}")
+            return False
+        files, count, size = packs.stats()
+        note = f", {compacted} compactado(s)" if compacted else ""
+        self.log(f"[INFO] Pacotes: {files} arquivos em {count} pacote(s), {size / (1024 * 1024):.1f} MB{note}")
+        return True
+
+    def _file_hash(self, path):
+        """Hash de conteúdo (BLAKE2b) lido em blocos grandes."""
+        h = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_BUFFER), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _needs_copy(self, src, dst, checksum=False, st=None):
+        """Compara tamanho/mtime (e opcionalmente hash) com a cópia do cofre."""
+        try:
+            s = st if st is not None else os.stat(src)
+            d = os.stat(dst)
+        except OSError:
+            return True
+        if s.st_size != d.st_size:
+            return True
+        if abs(s.st_mtime - d.st_mtime) > MTIME_TOLERANCE:
+            return True
+        if checksum:
+            try:
+                return self._file_hash(src) != self._file_hash(dst)
+            except OSError:
+                return True
+        return False
+
+    def _matches_entry(self, src, entry, checksum=False, st=None):
+        """Compara a origem com a entrada do manifesto anterior (sem tocar no cofre)."""
+        try:
+            s = st if st is not None else os.stat(src)
+        except OSError:
+            return False
+        if s.st_size != entry[SIZE] or abs(s.st_mtime - entry[MTIME]) > MTIME_TOLERANCE:
+            return False
+        if checksum:
+            try:
+                return entry[HASH] is not None and self._file_hash(src) == entry[HASH]
+            except OSError:
+                return False
+        return True
+
+    def _unchanged(self, prev, src, dst, rel, checksum=False, st=None):
+        """(size, mtime, hash) se a origem não mudou desde o backup em `dst`; senão None."""
+        entry = prev.get(rel) if prev else None
+        if entry is not None and checksum and entry[HASH] is None:
+            entry = None  # Cópia rápida não registrou hash: compara com o cofre
+        if entry is not None:
+            if not self._matches_entry(src, entry, checksum, st):
+                return None
+            return (entry[SIZE], entry[MTIME], entry[HASH])
+        if self._needs_copy(src, dst, checksum, st):
+            return None
+        # Cofre sem manifesto: como na cópia rápida, o hash só é lido com checksum
+        try:
+            s = st if st is not None else os.stat(src)
+            return (s.st_size, s.st_mtime, self._file_hash(src) if checksum else None)
+        except OSError:
+            return None
+
+    def _incremental_task(self, prev, checksum=False, packs=None):
+        """Task que pula arquivos inalterados e copia os novos/alterados.
+
+        Com `packs`, pequenos ainda soltos no cofre também são copiados, para
+        o pacote (conversão de um cofre existente para o layout com pacotes).
+        """
+        copy = self._layout_task(packs) if packs is not None else None
+
+        def task(src, dst, rel, st=None):
+            meta = self._unchanged(prev, src, dst, rel, checksum, st)
+            if meta is not None and (packs is None or meta[0] >= packs.limit or rel in packs):
+                return (True, SKIPPED, meta)
+            if copy is not None:
+                return copy(src, dst, rel, st)
+            return self._copy_file_task(src, dst, st)
+        return task
+
+    def _prune_removed(self, src, dst):
+        """Remove do cofre arquivos que não existem mais na origem."""
+        # Origem ausente (caminho Steam errado?) nunca deve esvaziar o cofre
+        if not os.path.exists(src) or not os.path.exists(dst):
             return 0
-        return sum([len(files) for r, d, files in os.walk(folder)])
-
-    def _collect_files(self, src, dst):
-        """Coleta pares de arquivos (origem, destino) para cópia."""
-        if not os.path.exists(src):
-            return []
-        
-        file_pairs = []
-        for root, dirs, files in os.walk(src):
+        removed = 0
+        for root, dirs, files in os.walk(dst, topdown=False):
             if not self.running: break
-            rel = os.path.relpath(root, src)
-            target_dir = os.path.join(dst, rel)
-            
+            rel = os.path.relpath(root, dst)
+            src_dir = os.path.normpath(os.path.join(src, rel))
             for file in files:
-                if not self.running: break
-                src_file = os.path.join(root, file)
-                dst_file = os.path.join(target_dir, file)
-                file_pairs.append((src_file, dst_file))
-        
-        return file_pairs
-
-    def run_backup(self, steam, backup_root):
-        vault_folder = os.path.join(backup_root, "SteamVault_Backup")
-        self.log(f"--- INICIANDO PROTOCOLO {APP_NAME} ---")
-        self.safe_create_dir(vault_folder)
-        
-        # Coletar todos os arquivos para progresso
-        modules = [
-            (os.path.join(steam, "userdata"), os.path.join(vault_folder, "userdata"), "USERDATA"),
-            (os.path.join(steam, "config", "stplug-in"), os.path.join(vault_folder, "config", "stplug-in"), "STPLUG-IN"),
-            (os.path.join(steam, "config", "depotcache"), os.path.join(vault_folder, "config", "depotcache"), "DEPOTCACHE"),
-            (os.path.join(steam, "appcache", "stats"), os.path.join(vault_folder, "appcache", "stats"), "STATS"),
-        ]
-        
-        # Coletar todos os arquivos
-        all_files = []
-        for src, dst, title in modules:
-            all_files.extend(self._collect_files(src, dst))
-        
+                if not os.path.exists(os.path.join(src_dir, file)):
+                    try:
+                        os.remove(os.path.join(root, file))
+                        removed += 1
+                    except OSError as e:
+                        self.log(f"[ERRO] Remover {file}: {e}")
+            if root != dst and not os.path.exists(src_dir):
+                try: os.rmdir(root)
+                except OSError: pass
+        return removed
+
+    def _prune_from_manifest(self, steam, vault_folder, prev, seen, selection=None, packs=None):
+        """Remove do cofre entradas do manifesto anterior que sumiram da origem.
+
+        Entradas em pacote saem do índice (`packs`); os bytes vão embora na
+        compactação.
+        """
+        removed = 0
+        present = {title for rel_mod, title in MODULES if os.path.exists(os.path.join(steam, rel_mod))}
+        for rel, entry in prev.entries():
+            if rel in seen or entry[MODULE] not in present:
+                continue
+            if selection is not None and not selection.match(rel):
+                continue
+            if packs is not None and rel in packs:
+                packs.discard(rel)
+                removed += 1
+                continue
+            try:
+                os.remove(os.path.join(vault_folder, rel))
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.log(f"[ERRO] Remover {rel}: {e}")
+        return removed
+
+    def _resume_entries(self, backup_root, kind, source, target):
+        """Arquivos concluídos no diário de uma execução interrompida compatível."""
+        header, done = load_journal(journal_path(backup_root, kind))
+        if header is None:
+            self.log("[AVISO] Nenhuma execução interrompida para retomar; iniciando do zero.")
+            return {}
+        if header.get("kind") != kind or header.get("source") != source or header.get("target") != target:
+            self.log("[AVISO] O diário é de outra origem/destino; iniciando do zero.")
+            return {}
+        self.log(f"[INFO] Retomando execução interrompida: {len(done)} arquivos já concluídos.")
+        return done
+
+    def _open_journal(self, backup_root, kind, source, target, resume=False):
+        """Journal da execução, ou None se não puder ser gravado (segue sem diário)."""
+        try:
+            return Journal(journal_path(backup_root, kind), kind, source, target, resume)
+        except OSError as e:
+            self.log(f"[AVISO] Diário indisponível ({e}); a execução não poderá ser retomada.")
+            return None
+
+    def _count_files_in_folder(self, folder):
+        """Conta arquivos em uma pasta recursivamente."""
+        return count_files(folder)
+
+    def _running(self):
+        return self.running
+
+    def _iter_modules(self, src_root, dst_root, selection=None, parallel=False):
+        """Gera (origem, destino, rel, módulo, tamanho, stat) de todos os módulos e DLLs.
+
+        O stat da varredura (src/core/scan.py) segue no job para as tasks de
+        comparação e cópia. Com `parallel`, userdata é varrido uma conta por
+        thread (modos incremental e diferencial, em que a varredura pesa).
+        """
+        for rel_mod, title in MODULES:
+            scan = scan_parallel if parallel and title == "USERDATA" else scan_tree
+            for src, rel, st in scan(os.path.join(src_root, rel_mod), rel_mod, selection, self._running):
+                yield (src, os.path.join(dst_root, rel), rel, title, st.st_size, st)
+
         # DLLs (Windows only)
-        dll_files = []
         if os.name == 'nt':
-            for dll in ["version.dll", "winmm.dll"]:
-                src = os.path.join(steam, dll)
-                if os.path.exists(src):
-                    dll_files.append((src, os.path.join(vault_folder, dll)))
-        
-        total_files = len(all_files) + len(dll_files)
-        self.log(f"[INFO] Total de arquivos: {total_files}")
-        
-        if total_files == 0:
+            for dll in DLLS:
+                src = os.path.join(src_root, dll)
+                if selection is not None and not selection.match(dll):
+                    continue
+                try:
+                    st = os.stat(src)
+                except OSError:
+                    continue
+                yield (src, os.path.join(dst_root, dll), dll, "DLL", st.st_size, st)
+
+    def _jobs_from_manifest(self, manifest, src_root, dst_root, selection=None):
+        """Gera os jobs de cópia a partir do manifesto, sem varrer a árvore."""
+        for rel, entry in manifest.entries():
+            if entry[MODULE] == "DLL" and os.name != 'nt':
+                continue
+            if selection is not None and not selection.match(rel):
+                continue
+            native = rel.replace("/", os.sep)
+            yield (os.path.join(src_root, native), os.path.join(dst_root, native), native, entry[MODULE], entry[SIZE])
+
+    def _run_pipeline(self, jobs, task=None, on_result=None, estimate=0, dst_root=None, estimate_bytes=0,
+                      copying=True, cpu_bound=False):
+        """Executa `task(src, dst, rel)` sobre `jobs` num pipeline produtor/consumidor.
+
+        Uma thread consome o iterável de jobs (a varredura) e alimenta filas
+        limitadas; as threads de cópia começam assim que o primeiro arquivo é
+        encontrado e a memória fica constante qualquer que seja a árvore. O
+        total reportado é uma estimativa (`estimate` ou o já encontrado) que
+        se torna exata quando a varredura termina.
+
+        O agendador separa duas filas: arquivos pequenos agrupados em lotes
+        (uma task por lote) e arquivos grandes isolados, cada uma com threads
+        próprias dimensionadas pelo tipo de `dst_root` (SSD, HDD ou rede).
+
+        `on_result(job, success, result, meta)` roda na thread chamadora.
+        Com copying=True a telemetria da execução fica em self.telemetry;
+        fases de comparação/verificação (copying=False) só reportam progresso.
+        Jobs da varredura trazem o stat como 6º item, repassado como
+        `task(src, dst, rel, st)`; os demais chamam a task com st=None.
+        Com cpu_bound=True (compressão) a fila de pequenos tem ao menos uma
+        thread por núcleo. Retorna (completed, errors).
+        """
+        if task is None:
+            task = lambda src, dst, rel, st=None: self._copy_file_task(src, dst, st)
+        kind, n_small, n_large = plan_workers(dst_root)
+        if cpu_bound:
+            n_small = max(n_small, COMPRESS_WORKERS)
+        if self.workers:
+            kind = "fixo"
+            n_small, n_large = self.workers
+        self.log(f"[INFO] Destino {kind.upper()}: {n_small} threads p/ pequenos, {n_large} p/ grandes")
+        lanes = {"small": queue.Queue(maxsize=QUEUE_SIZE), "large": queue.Queue(maxsize=QUEUE_SIZE)}
+        workers = [("small", n_small), ("large", n_large)]
+        n_workers = n_small + n_large
+        results = queue.Queue()
+        scan = {"found": 0, "bytes": 0, "walking": True}
+        telemetry = Telemetry(estimate, estimate_bytes)
+        if copying:
+            self.telemetry = telemetry
+
+        def producer():
+            self.limits.apply_priority()
+            try:
+                for lane, batch in batch_jobs(jobs, lambda job: job[4]):
+                    if not self.running: break
+                    lanes[lane].put(batch)
+                    scan["found"] += len(batch)
+                    scan["bytes"] += sum(job[4] for job in batch)
+            except Exception as e:
+                self.log(f"[ERRO] Varredura: {e}")
+            finally:
+                scan["walking"] = False
+                for lane, count in workers:
+                    for _ in range(count):
+                        lanes[lane].put(None)
+
+        def worker(lane):
+            while True:
+                batch = lanes[lane].get()
+                if batch is None:
+                    break
+                if not self.running:
+                    continue  # drena a fila para liberar o produtor
+                self.limits.apply_priority()
+                done = []
+                for job in batch:
+                    self.limits.op(self._running)
+                    started = time.perf_counter()
+                    try:
+                        result = task(job[0], job[1], job[2], job[5] if len(job) > 5 else None)
+                    except Exception as e:
+                        result = (False, f"{job[0]}: {e}", None)
+                    done.append((job, result, time.perf_counter() - started))
+                results.put(done)
+            results.put(None)
+
+        threads = [threading.Thread(target=producer, daemon=True)]
+        threads += [threading.Thread(target=worker, args=(lane,), daemon=True)
+                    for lane, count in workers for _ in range(count)]
+        for t in threads:
+            t.start()
+
+        completed = 0
+        errors = 0
+        finished = 0
+        while finished < n_workers:
+            done = results.get()
+            if done is None:
+                finished += 1
+                continue
+            for job, (success, result, meta), seconds in done:
+                completed += 1
+                if not success:
+                    errors += 1
+                telemetry.add(job[3], job[2], job[4], seconds, copying and success and result is not SKIPPED)
+                if on_result:
+                    on_result(job, success, result, meta)
+            if scan["walking"]:
+                telemetry.set_total(max(scan["found"], estimate), max(scan["bytes"], estimate_bytes))
+            else:
+                telemetry.set_total(scan["found"], scan["bytes"])
+            self._report_progress(completed, telemetry.files_total)
+            self._report_stats(telemetry)
+
+        for t in threads:
+            t.join()
+        telemetry.finish()
+        return completed, errors
+
+    def _bind_selection(self, selection, root):
+        """Selection ativa ligada à árvore `root`, ou None sem filtros."""
+        if selection is None or not selection.active:
+            return None
+        self.log(f"[INFO] Seleção: {selection.describe()}")
+        return selection.bind(root)
+
+    def _keep_unselected(self, manifest, prev, selection):
+        """Mantém no manifesto novo as entradas fora da seleção (não tocadas)."""
+        for rel, entry in prev.entries():
+            if rel not in manifest.files and not selection.match(rel):
+                manifest.add(rel, entry[SIZE], entry[MTIME], entry[HASH], entry[MODULE])
+
+    def build_index(self, root):
+        """Contas e AppIDs presentes em `root` (Steam ou cofre) com tamanhos.
+
+        Retorna {"accounts": {conta: {"size": n, "apps": {appid: n}}},
+        "apps": {appid: n}}, onde "apps" soma tudo do jogo (saves de todas as
+        contas, stats, .lua e depots).
+        """
+        depots = load_depot_map(root)
+        accounts, apps = {}, {}
+        for src, dst, rel, module, size, st in self._iter_modules(root, root):
+            account, app = classify(rel, depots)
+            if account is not None:
+                info = accounts.setdefault(account, {"size": 0, "apps": {}})
+                info["size"] += size
+                if app is not None:
+                    info["apps"][app] = info["apps"].get(app, 0) + size
+            if app is not None:
+                apps[app] = apps.get(app, 0) + size
+        return {"accounts": accounts, "apps": apps}
+
+    def run_backup(self, steam, backup_root, incremental=False, checksum=False, snapshot=False, keep=0,
+                   archive=False, verify=False, selection=None, resume=False, compress=False, pack=0):
+        """Copia os módulos para o cofre e grava o manifesto.
+
+        Em modo incremental, copia apenas arquivos novos ou alterados
+        (tamanho/mtime, ou hash com checksum=True) e remove do cofre o que
+        sumiu da origem. Com snapshot=True, cria um novo ponto de restauração
+        no armazém deduplicado (mantendo os `keep` mais recentes, se > 0);
+        compress=True implica snapshot e grava os blobs comprimidos.
+        Com archive=True, grava um único SteamVault_Backup.tar.gz em fluxo.
+        Com verify=True, o hash da origem é calculado durante a cópia e, ao
+        final, os arquivos copiados são relidos do cofre e comparados.
+        `selection` (Selection) limita o backup a contas/AppIDs; o restante
+        do cofre é mantido como estava.
+
+        Os arquivos concluídos vão para um diário (src/core/journal.py); com
+        resume=True, um backup interrompido continua sem copiar de novo o que
+        já terminou e ainda é igual na origem. Snapshots já retomam por
+        natureza (blobs gravados são reaproveitados); o .tar.gz recomeça.
+
+        `backup_root` pode ser uma lista de destinos: o backup do cofre é
+        feito em leque, lendo cada arquivo uma vez (_run_fanout_backup).
+
+        Com `pack` (limite em bytes), arquivos menores que o limite são
+        anexados a pacotes com índice (src/core/packs.py) em vez de gravados
+        um a um; os maiores ficam soltos. Um cofre com pacotes mantém o
+        layout nos backups seguintes.
+        """
+        if isinstance(backup_root, (list, tuple)):
+            roots = list(dict.fromkeys(backup_root))
+            packed = pack or any(has_packs(os.path.join(root, VAULT_NAME)) for root in roots)
+            if len(roots) > 1 and not (snapshot or compress or archive or packed):
+                if resume:
+                    self.log("[AVISO] --resume não se aplica a vários destinos; o backup será refeito.")
+                return self._run_fanout_backup(steam, roots, incremental, checksum, verify, selection)
+            if len(roots) > 1:
+                self.log("[AVISO] Snapshot/arquivo/pacotes não gravam em leque: um backup por destino.")
+            for root in roots:
+                self.run_backup(steam, root, incremental, checksum, snapshot, keep, archive, verify, selection,
+                                resume, compress, pack)
+            return
+        selection = self._bind_selection(selection, steam)
+        if snapshot or compress:
+            return self._run_snapshot_backup(steam, backup_root, checksum, keep, selection, compress)
+        if archive:
+            if resume:
+                self.log("[AVISO] --resume não se aplica a --archive; o arquivo será gravado do início.")
+            return self._run_archive_backup(steam, backup_root, selection)
+
+        vault_folder = os.path.join(backup_root, VAULT_NAME)
+        self.log(f"--- INICIANDO PROTOCOLO {APP_NAME} ---")
+        self.copy_stats = CopyStats()
+        self.hash_on_copy = checksum or verify
+        if incremental:
+            self.log("[INFO] Modo incremental" + (" (checksum)" if checksum else ""))
+        self.safe_create_dir(vault_folder)
+
+        prev = Manifest.load(vault_folder)
+        estimate = len(prev.files) if prev else 0
+        if estimate:
+            self.log(f"[INFO] Estimativa: ~{estimate} arquivos (último backup)")
+        manifest = Manifest(source=steam)
+        packs = self._open_packs(vault_folder, pack)
+        if incremental:
+            task = self._incremental_task(prev, checksum, packs)
+        else:
+            task = self._layout_task(packs) if packs is not None else None
+        source, target = os.path.abspath(steam), os.path.abspath(vault_folder)
+        done = self._resume_entries(backup_root, "backup", source, target) if resume else {}
+        # Só vale o que está no cofre com o tamanho registrado (o último lote pode não ter chegado ao disco);
+        # arquivos em pacote valem pelo índice
+        done = {rel: entry for rel, entry in done.items()
+                if _has_copy(os.path.join(vault_folder, rel), entry[SIZE])
+                or (packs is not None and rel in packs and packs.get(rel)[LENGTH] == entry[SIZE])}
+        if done:
+            known = Manifest(dict(prev.files) if prev else {})
+            known.files.update(done)
+            task = self._incremental_task(known, checksum, packs)
+        journal = self._open_journal(backup_root, "backup", source, target, bool(done))
+        counts = {"skipped": 0}
+        seen = set()
+        copied = []  # (rel, módulo, tamanho) para a verificação pós-backup
+
+        def on_result(job, success, result, meta):
+            src, dst, rel, module = job[:4]
+            seen.add(rel.replace(os.sep, "/"))
+            if not success:
+                return
+            manifest.add(rel, meta[0], meta[1], meta[2], module)
+            if journal is not None:
+                journal.record(rel, meta[0], meta[1], meta[2], module)
+            if result is SKIPPED:
+                counts["skipped"] += 1
+                return
+            if verify:
+                copied.append((rel, module, meta[0]))
+            if module == "DLL":
+                self.log(f"[DLL] {os.path.basename(src)} Protegida.")
+
+        # Varredura e cópia em paralelo
+        self.log(">>> COPIANDO ARQUIVOS...")
+        try:
+            completed, errors = self._run_pipeline(self._iter_modules(steam, vault_folder, selection,
+                                                                      incremental or bool(done)),
+                                                   task, on_result, estimate, dst_root=vault_folder,
+                                                   estimate_bytes=prev.total_size() if prev else 0)
+        finally:
+            if journal is not None:
+                journal.close()
+            if packs is not None:
+                packs.close()
+        telemetry = self.telemetry
+        self.log(f"[INFO] Total de arquivos: {completed}")
+
+        if completed == 0:
+            if journal is not None:
+                journal.discard()
             self.log("[AVISO] Nenhum arquivo encontrado para backup.")
             return
-        
-        # Copiar em paralelo
+
+        if selection is not None and prev:
+            self._keep_unselected(manifest, prev, selection)
+        removed = 0
+        if incremental and self.running:
+            if prev:
+                removed = self._prune_from_manifest(steam, vault_folder, prev, seen, selection, packs)
+            elif selection is None:
+                for rel_mod, title in MODULES:
+                    removed += self._prune_removed(os.path.join(steam, rel_mod), os.path.join(vault_folder, rel_mod))
+
+        if not self.running:
+            # Execução interrompida: manifesto antigo não descreve mais o cofre
+            try: os.remove(Manifest.path_for(vault_folder))
+            except OSError: pass
+            if packs is not None:
+                try:
+                    packs.checkpoint()  # o que já foi anexado é retomado, não anexado de novo
+                except OSError as e:
+                    self.log(f"[AVISO] Índice dos pacotes não gravado ({e}); a retomada regrava os pequenos.")
+            self.log(f"[AVISO] Backup interrompido após {completed} arquivos. Use --resume para continuar.")
+            return
+        if packs is not None and not self._save_packs(packs, manifest):
+            errors += 1
+        manifest.save(vault_folder)
+        if journal is not None:
+            journal.discard()
+        if self.copy_stats.by_method:
+            self.log(f"[INFO] Métodos de cópia: {self.copy_stats.summary()}")
+        for line in telemetry.lines():
+            self.log(line)
+        if verify and copied:
+            if not self._verify_copied(vault_folder, manifest, copied).ok:
+                errors += 1
+
+        if incremental:
+            skipped = counts["skipped"]
+            copied = completed - errors - skipped
+            if copied == 0 and errors == 0:
+                self.log(f"[SUCESSO] Cofre já atualizado. (0 copiados, {skipped} inalterados, {removed} removidos)")
+                return
+            self.log(f"[INFO] Incremental: {copied} copiados, {skipped} inalterados, {removed} removidos")
+
+        if errors == 0:
+            self.log(f"[SUCESSO] Backup concluído! ({completed} arquivos)")
+        else:
+            self.log(f"[AVISO] Backup concluído com {errors} erro(s).")
+
+    def _run_fanout_backup(self, steam, backup_roots, incremental=False, checksum=False, verify=False,
+                           selection=None):
+        """Backup do cofre em vários destinos lendo cada arquivo da Steam uma única vez.
+
+        Cada destino tem fila, threads (dimensionadas pelo seu tipo) e buffer
+        próprios (src/core/fanout.py). Manifesto, modo incremental e remoção
+        do que sumiu da origem valem por destino; um arquivo só é lido se
+        algum destino precisar dele.
+        """
+        selection = self._bind_selection(selection, steam)
+        self.log(f"--- INICIANDO PROTOCOLO {APP_NAME} ({len(backup_roots)} DESTINOS) ---")
+        self.copy_stats = CopyStats()
+        if incremental:
+            self.log("[INFO] Modo incremental" + (" (checksum)" if checksum else ""))
+        targets = []
+        for root in backup_roots:
+            vault_folder = os.path.join(root, VAULT_NAME)
+            self.safe_create_dir(vault_folder)
+            if not os.path.isdir(vault_folder):
+                continue
+            if self.workers:
+                n_small = self.workers[0]
+            else:
+                kind, n_small, n_large = plan_workers(vault_folder)
+                self.log(f"[INFO] Destino {root} ({kind.upper()}): {n_small} threads de gravação")
+            targets.append(Destination(root, vault_folder, Manifest.load(vault_folder), Manifest(source=steam),
+                                       n_small, self._running))
+        if not targets:
+            self.log("[ERRO CRÍTICO] Nenhum destino disponível.")
+            return
+        prev = targets[0].prev
+        estimate = max(len(t.prev.files) for t in targets if t.prev) if any(t.prev for t in targets) else 0
+        want_hash = checksum or verify
+        seen = set()
+
+        def task(src, dst, rel, st=None):
+            module = module_for(rel)
+            pending = []
+            for target in targets:
+                meta = self._unchanged(target.prev, src, target.path(rel), rel, checksum, st) if incremental else None
+                if meta is not None:
+                    target.keep(rel, meta, module)
+                else:
+                    pending.append((target, target.begin(rel, module)))
+            if not pending:
+                return (True, SKIPPED, None)
+            try:
+                return (True, src, fan_out(src, pending, want_hash, self._running, self._throttle))
+            except CopyCancelled:
+                return (False, f"{src}: cancelado", None)
+            except Exception as e:
+                return (False, f"{src}: {e}", None)
+
+        def on_result(job, success, result, meta):
+            seen.add(job[2].replace(os.sep, "/"))
+            if success and result is not SKIPPED and job[3] == "DLL":
+                self.log(f"[DLL] {os.path.basename(job[0])} Protegida.")
+
+        # Leitura única: as threads do pipeline leem, as de cada destino gravam
         self.log(">>> COPIANDO ARQUIVOS...")
+        self.destinations = targets
+        try:
+            completed, errors = self._run_pipeline(self._iter_modules(steam, targets[0].vault_folder, selection,
+                                                                      incremental),
+                                                   task, on_result, estimate, dst_root=steam,
+                                                   estimate_bytes=prev.total_size() if prev else 0)
+        finally:
+            for target in targets:
+                target.close()
+            self.destinations = None
+        self.log(f"[INFO] Total de arquivos: {completed}")
+        if completed == 0:
+            self.log("[AVISO] Nenhum arquivo encontrado para backup.")
+            return
+
+        for target in targets:
+            manifest = target.manifest
+            if selection is not None and target.prev:
+                self._keep_unselected(manifest, target.prev, selection)
+            removed = 0
+            if incremental and self.running:
+                if target.prev:
+                    removed = self._prune_from_manifest(steam, target.vault_folder, target.prev, seen, selection)
+                elif selection is None:
+                    for rel_mod, title in MODULES:
+                        removed += self._prune_removed(os.path.join(steam, rel_mod),
+                                                       os.path.join(target.vault_folder, rel_mod))
+            if not self.running:
+                try: os.remove(Manifest.path_for(target.vault_folder))
+                except OSError: pass
+                continue
+            manifest.save(target.vault_folder)
+            for error in target.errors:
+                self.log(f"[ERRO] {target.backup_root}: {error}")
+            if verify and target.copied and not self._verify_copied(target.vault_folder, manifest, target.copied).ok:
+                target.errors.append("verificação")
+            self.log(target.line() + (f", {removed} removidos" if removed else ""))
+            errors += len(target.errors)
+
+        if not self.running:
+            self.log(f"[AVISO] Backup interrompido após {completed} arquivos.")
+            return
+        for line in self.telemetry.lines():
+            self.log(line)
+        if errors == 0:
+            self.log(f"[SUCESSO] Backup concluído em {len(targets)} destinos! ({completed} arquivos)")
+        else:
+            self.log(f"[AVISO] Backup concluído com {errors} erro(s).")
+
+    def run_backup_paths(self, steam, backup_root, paths, checksum=False, selection=None):
+        """Backup só dos caminhos alterados, sem varrer os módulos (modo daemon).
+
+        `paths` são caminhos absolutos na Steam vindos do observador
+        (src/core/watch.py): arquivos ou pastas, existentes ou removidos.
+        Pastas novas são varridas, arquivos são comparados com o manifesto e
+        os removidos saem do cofre. Sem manifesto, faz um backup incremental
+        completo. Retorna (copiados, removidos), ou None nesse caso.
+        """
+        vault_folder = os.path.join(backup_root, VAULT_NAME)
+        manifest = Manifest.load(vault_folder)
+        if manifest is None:
+            self.log("[AVISO] Cofre sem manifesto: executando backup incremental completo.")
+            self.run_backup(steam, backup_root, incremental=True, checksum=checksum, selection=selection)
+            return None
+        if selection is not None and selection.active:
+            selection.bind(steam)
+        else:
+            selection = None
+        self.copy_stats = CopyStats()
+        self.hash_on_copy = checksum
+
+        prefixes = tuple(rel_mod + os.sep for rel_mod, title in MODULES)
+        jobs, gone = {}, []
+        for path in paths:
+            rel = os.path.relpath(path, steam)
+            if rel.endswith(TMP_SUFFIX) or not (rel.startswith(prefixes) or (os.name == 'nt' and rel in DLLS)):
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                gone.append(rel)
+                continue
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                if selection is None or selection.descend(rel):
+                    for src, sub_rel, sub_st in scan_tree(path, rel, selection, self._running):
+                        jobs[sub_rel] = (src, os.path.join(vault_folder, sub_rel), sub_rel, module_for(sub_rel),
+                                         sub_st.st_size, sub_st)
+            elif stat.S_ISREG(st.st_mode) and (selection is None or selection.match(rel)):
+                jobs[rel] = (path, os.path.join(vault_folder, rel), rel, module_for(rel), st.st_size, st)
+
+        # Removidos: só com o módulo presente na origem (Steam desmontada não esvazia o cofre)
+        packs = PackWriter(vault_folder) if has_packs(vault_folder) else None
+        removed = 0
+        present = {title for rel_mod, title in MODULES if os.path.isdir(os.path.join(steam, rel_mod))}
+        for rel in gone:
+            key = rel.replace(os.sep, "/")
+            for entry_rel in [r for r in manifest.files if r == key or r.startswith(key + "/")]:
+                if manifest.files[entry_rel][MODULE] not in present:
+                    continue
+                if selection is not None and not selection.match(entry_rel):
+                    continue
+                del manifest.files[entry_rel]
+                if packs is not None and entry_rel in packs:
+                    packs.discard(entry_rel)  # os bytes saem na próxima compactação
+                    removed += 1
+                    continue
+                try:
+                    os.remove(os.path.join(vault_folder, entry_rel))
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    self.log(f"[ERRO] Remover {entry_rel}: {e}")
+            folder = os.path.join(vault_folder, rel)
+            if os.path.isdir(folder):
+                shutil.rmtree(folder, ignore_errors=True)
+
+        counts = {"copied": 0, "skipped": 0}
+        errors = 0
+
+        def on_result(job, success, result, meta):
+            if success:
+                manifest.add(job[2], meta[0], meta[1], meta[2], job[3])
+                counts["skipped" if result is SKIPPED else "copied"] += 1
+
+        if jobs:
+            # A task lê uma cópia: on_result altera o manifesto enquanto as threads comparam
+            task = self._incremental_task(Manifest(dict(manifest.files)), checksum, packs)
+            try:
+                completed, errors = self._run_pipeline(jobs.values(), task, on_result, len(jobs),
+                                                       dst_root=vault_folder,
+                                                       estimate_bytes=sum(job[4] for job in jobs.values()))
+            finally:
+                if packs is not None:
+                    packs.close()
+        if not self.running:
+            self.log("[AVISO] Backup das alterações interrompido.")
+            return counts["copied"], removed
+        if jobs or removed:
+            manifest.created = time.time()
+            if packs is not None and not self._save_packs(packs, manifest):
+                errors += 1
+            manifest.save(vault_folder)
+        msg = f"{counts['copied']} copiados, {counts['skipped']} inalterados, {removed} removidos"
+        if errors:
+            self.log(f"[AVISO] Alterações: {msg}, {errors} erro(s).")
+        else:
+            self.log(f"[SUCESSO] Alterações salvas: {msg}")
+        return counts["copied"], removed
+
+    def _prepare_dictionary(self, store, steam):
+        """Carrega o dicionário do armazém ou treina um com amostras de userdata e stats."""
+        if store.load_dictionary():
+            self.log(f"[INFO] Compressão com dicionário ({len(store.zdict) // 1024} KB)")
+            return
+        self.log(">>> TREINANDO DICIONÁRIO DE COMPRESSÃO...")
+        roots = [os.path.join(steam, "userdata"), os.path.join(steam, "appcache", "stats")]
+        samples = read_samples(sample_files(roots))
+        zdict = train_dictionary(samples)
+        if not zdict:
+            self.log("[AVISO] Poucas amostras para o dicionário; compressão sem dicionário.")
+            return
+        try:
+            name = store.save_dictionary(zdict)
+        except OSError as e:
+            self.log(f"[AVISO] Gravar dicionário: {e}; compressão sem dicionário.")
+            return
+        self.log(f"[INFO] Dicionário {name}: {len(zdict) // 1024} KB de {len(samples)} amostras")
+
+    def _run_snapshot_backup(self, steam, backup_root, checksum=False, keep=0, selection=None, compress=False):
+        """Cria um snapshot: só blobs inéditos são gravados no armazém."""
+        store = SnapshotStore(backup_root, self._throttle, compress)
+        self.log(f"--- INICIANDO PROTOCOLO {APP_NAME} (SNAPSHOT{' COMPRIMIDO' if compress else ''}) ---")
+        try:
+            store.ensure()
+        except OSError as e:
+            self.log(f"[ERRO] Criar pasta {store.root}: {e}")
+            return
+        if compress:
+            self._prepare_dictionary(store, steam)
+
+        prev = store.load("latest")
+        manifest = Manifest(source=steam)
+        counts = {"reused": 0}
+
+        def task(src, dst, rel, st=None):
+            entry = prev.get(rel) if prev else None
+            if entry is not None and self._matches_entry(src, entry, checksum, st) and store.has_object(entry[HASH]):
+                return (True, SKIPPED, (entry[SIZE], entry[MTIME], entry[HASH]))
+            return store.put_file(src)
+
+        def on_result(job, success, result, meta):
+            if success:
+                manifest.add(job[2], meta[0], meta[1], meta[2], job[3])
+                if result is SKIPPED:
+                    counts["reused"] += 1
+                elif compress:
+                    self.telemetry.add_packed(job[3], meta[0], meta[3])
+
+        self.log(">>> ARMAZENANDO ARQUIVOS...")
+        completed, errors = self._run_pipeline(self._iter_modules(steam, store.root, selection, prev is not None),
+                                               task, on_result, len(prev.files) if prev else 0,
+                                               dst_root=store.root, estimate_bytes=prev.total_size() if prev else 0,
+                                               cpu_bound=compress)
+        if completed == 0:
+            self.log("[AVISO] Nenhum arquivo encontrado para backup.")
+            return
+        self.log(f"[INFO] Total de arquivos: {completed} ({counts['reused']} inalterados desde o último snapshot)")
+
+        if not self.running:
+            self.log("[AVISO] Snapshot interrompido; nenhum ponto de restauração criado.")
+            return
+
+        if selection is not None and prev:
+            self._keep_unselected(manifest, prev, selection)
+        snap_id = store.new_id()
+        store.save(snap_id, manifest)
+        self.log(f"[INFO] Snapshot {snap_id}: {store.new_objects} blobs novos ({store.new_bytes / (1024 * 1024):.1f} MB gravados)")
+
+        if keep > 0:
+            dropped, blobs = store.prune(keep)
+            if dropped:
+                self.log(f"[INFO] Retenção: {dropped} snapshot(s) antigos e {blobs} blobs removidos.")
+        for line in self.telemetry.lines():
+            self.log(line)
+
+        if errors == 0:
+            self.log(f"[SUCESSO] Snapshot {snap_id} concluído! ({len(manifest.files)} arquivos)")
+        else:
+            self.log(f"[AVISO] Snapshot {snap_id} concluído com {errors} erro(s).")
+
+    def _run_archive_backup(self, steam, backup_root, selection=None):
+        """Escreve todos os arquivos num único .tar.gz por um escritor sequencial.
+
+        Evita um makedirs/copy2 por arquivo no destino (caro em rede/USB); a
+        compressão roda em threads dentro do ParallelGzipWriter. Com
+        `selection`, os membros fora dela são copiados do arquivo anterior.
+        """
+        path = os.path.join(backup_root, VAULT_NAME + ARCHIVE_SUFFIX)
+        self.log(f"--- INICIANDO PROTOCOLO {APP_NAME} (ARQUIVO) ---")
+        self.safe_create_dir(backup_root)
+        prev = Manifest.load_file(path + MANIFEST_SUFFIX)
+        estimate = len(prev.files) if prev else 0
+
+        self.log(f">>> COMPACTANDO EM {os.path.basename(path)}...")
+        manifest = Manifest(source=steam)
+        telemetry = self.telemetry = Telemetry(estimate, prev.total_size() if prev else 0)
         errors = 0
         completed = 0
-        
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {executor.submit(self._copy_file_task, src, dst): (src, dst) 
-                      for src, dst in all_files + dll_files}
-            
-            for future in as_completed(futures):
+        try:
+            writer = ArchiveWriter(path)
+        except OSError as e:
+            self.log(f"[ERRO] Criar arquivo {path}: {e}")
+            return
+        try:
+            # Escritor único: a varredura alimenta o tar diretamente, em fluxo
+            self.limits.apply_priority()
+            for src, dst, rel, module, size, st in self._iter_modules(steam, backup_root, selection):
                 if not self.running:
-                    executor.shutdown(wait=False, cancel_futures=True)
                     break
-                success, result = future.result()
+                self.limits.op(self._running)
+                started = time.perf_counter()
+                meta = writer.add_file(src, rel)
+                self._throttle(size)
                 completed += 1
-                self._report_progress(completed, total_files)
-                if not success:
+                telemetry.add(module, rel, size, time.perf_counter() - started, meta is not None)
+                telemetry.set_total(max(completed, estimate), telemetry.bytes_total)
+                self._report_progress(completed, telemetry.files_total)
+                self._report_stats(telemetry)
+                if meta is None:
                     errors += 1
-        
-        # Log DLLs
-        if os.name == 'nt':
-            for src, dst in dll_files:
-                if os.path.exists(dst):
-                    self.log(f"[DLL] {os.path.basename(src)} Protegida.")
-        
+                    self.log(f"[ERRO] Falha: {os.path.basename(src)}")
+                else:
+                    manifest.add(rel, meta[0], meta[1], meta[2], module)
+            if selection is not None and self.running and os.path.isfile(path):
+                kept = self._keep_unselected_members(writer, path, manifest, prev, selection)
+                self.log(f"[INFO] Mantidos do arquivo anterior (fora da seleção): {kept} arquivos")
+        except Exception as e:
+            writer.close(commit=False)
+            self.log(f"[ERRO CRÍTICO] Arquivo compactado inconsistente, abortado: {e}")
+            return
+
+        if completed == 0:
+            writer.close(commit=False)
+            self.log("[AVISO] Nenhum arquivo encontrado para backup.")
+            return
+        writer.close(commit=self.running)
+        if not self.running:
+            self.log("[AVISO] Backup interrompido; arquivo parcial descartado.")
+            return
+        manifest.save_file(path + MANIFEST_SUFFIX)
+        telemetry.finish()
+        self.log(f"[INFO] Total de arquivos: {completed}")
+        for line in telemetry.lines():
+            self.log(line)
+
+        size = os.path.getsize(path)
+        self.log(f"[INFO] {os.path.basename(path)}: {size / (1024 * 1024):.1f} MB "
+                 f"({manifest.total_size() / (1024 * 1024):.1f} MB sem compressão)")
         if errors == 0:
             self.log(f"[SUCESSO] Backup concluído! ({completed} arquivos)")
         else:
             self.log(f"[AVISO] Backup concluído com {errors} erro(s).")
 
-    def run_restore(self, steam, backup_root):
-        vault_folder = os.path.join(backup_root, "SteamVault_Backup")
-        origin = vault_folder
-        
-        # Retrocompatibilidade
-        if not os.path.exists(origin):
-            if os.path.exists(os.path.join(backup_root, "SteamBackup")):
-                origin = os.path.join(backup_root, "SteamBackup")
-                self.log("[AVISO] Detectado formato de backup antigo (SteamBackup).")
-
-        if os.path.basename(backup_root) in ["SteamVault_Backup", "SteamBackup"]: 
-            origin = backup_root
-
-        self.log("--- INICIANDO RESTAURAÇÃO DO COFRE ---")
-        
-        if not os.path.exists(os.path.join(origin, "userdata")):
-            self.log("[ERRO CRÍTICO] O Cofre está vazio ou inválido (userdata missing).")
-            return
-
-        # Coletar todos os arquivos
-        modules = [
-            (os.path.join(origin, "userdata"), os.path.join(steam, "userdata"), "USERDATA"),
-            (os.path.join(origin, "config", "stplug-in"), os.path.join(steam, "config", "stplug-in"), "STPLUG-IN"),
-            (os.path.join(origin, "config", "depotcache"), os.path.join(steam, "config", "depotcache"), "DEPOTCACHE"),
-            (os.path.join(origin, "appcache", "stats"), os.path.join(steam, "appcache", "stats"), "STATS"),
-        ]
-        
-        all_files = []
-        for src, dst, title in modules:
-            all_files.extend(self._collect_files(src, dst))
-        
-        # DLLs (Windows only)
-        dll_files = []
-        if os.name == 'nt':
-            for dll in ["version.dll", "winmm.dll"]:
-                src = os.path.join(origin, dll)
-                if os.path.exists(src):
-                    dll_files.append((src, os.path.join(steam, dll)))
-        
-        total_files = len(all_files) + len(dll_files)
-        self.log(f"[INFO] Total de arquivos: {total_files}")
-        
-        if total_files == 0:
-            self.log("[AVISO] Nenhum arquivo encontrado para restaurar.")
-            return
-        
-        # Copiar em paralelo
+    def _keep_unselected_members(self, writer, path, manifest, prev, selection):
+        """Copia do .tar.gz anterior os membros fora da seleção (como _keep_unselected)."""
+        kept = 0
+        for member, fileobj in iter_archive(path):
+            if not self.running:
+                break
+            name = member.name
+            if name in manifest.files or selection.match(name):
+                continue
+            writer.add_member(member, fileobj)
+            entry = prev.get(name) if prev else None
+            if entry is not None:
+                manifest.add(name, entry[SIZE], entry[MTIME], entry[HASH], entry[MODULE])
+            else:
+                manifest.add(name, member.size, member.mtime, None, module_for(name))
+            kept += 1
+        return kept
+
+    def _run_archive_restore(self, steam, path, only=None, selection=None):
+        """Extrai o .tar.gz direto para a Steam, membro a membro, em fluxo.
+
+        `only` limita a extração a esses caminhos relativos (plano da
+        restauração); sem ele, membros iguais ao destino (tamanho/mtime do
+        cabeçalho) são pulados.
+        """
+        total_files = len(only) if only is not None else 0
+        manifest = Manifest.load_file(path + MANIFEST_SUFFIX)
+        if not total_files:
+            total_files = len(manifest.files) if manifest else 0
+        if only is not None and manifest is not None:
+            total_bytes = sum(manifest.get(rel)[SIZE] for rel in only if manifest.get(rel))
+        else:
+            total_bytes = manifest.total_size() if manifest else 0
+        telemetry = self.telemetry = Telemetry(total_files, total_bytes)
+        if total_files:
+            self.log(f"[INFO] Total de arquivos: {total_files}")
+
         self.log(">>> RESTAURANDO ARQUIVOS...")
         errors = 0
         completed = 0
-        
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {executor.submit(self._copy_file_task, src, dst): (src, dst) 
-                      for src, dst in all_files + dll_files}
-            
-            for future in as_completed(futures):
+        skipped = 0
+        try:
+            for member, fsrc in iter_archive(path):
                 if not self.running:
-                    executor.shutdown(wait=False, cancel_futures=True)
                     break
-                success, result = future.result()
+                is_dll = "/" not in member.name and member.name in DLLS
+                if is_dll and os.name != 'nt':
+                    continue
+                if only is not None and member.name not in only:
+                    continue
+                if selection is not None and not selection.match(member.name):
+                    continue
+                target = safe_member_path(steam, member.name)
+                if target is None:
+                    errors += 1
+                    self.log(f"[ERRO] Caminho inválido no arquivo: {member.name}")
+                    continue
+                if only is None and self._matches_entry(target, [member.size, member.mtime, None, None]):
+                    skipped += 1
+                    continue
+                self.limits.apply_priority()
+                self.limits.op(self._running)
+                self._throttle(member.size)
                 completed += 1
-                self._report_progress(completed, total_files)
-                if not success:
+                started = time.perf_counter()
+                try:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp = target + TMP_SUFFIX
+                    try:
+                        with open(tmp, 'wb') as fdst:
+                            shutil.copyfileobj(fsrc, fdst, BLOCK_SIZE)
+                        os.utime(tmp, (member.mtime, member.mtime))
+                        os.replace(tmp, target)
+                    except OSError:
+                        try: os.remove(tmp)
+                        except OSError: pass
+                        raise
+                    telemetry.add(module_for(member.name), member.name, member.size, time.perf_counter() - started)
+                    if is_dll:
+                        self.log(f"[DLL] {member.name} Restaurada.")
+                except OSError as e:
                     errors += 1
-        
-        # Log DLLs
-        if os.name == 'nt':
-            for src, dst in dll_files:
-                if os.path.exists(dst):
-                    self.log(f"[DLL] {os.path.basename(src)} Restaurada.")
-        
+                    telemetry.add(module_for(member.name), member.name, member.size, 0.0, copied=False)
+                    self.log(f"[ERRO] Falha: {member.name} - {e}")
+                telemetry.set_total(max(total_files, completed), telemetry.bytes_total)
+                self._report_progress(completed, telemetry.files_total)
+                self._report_stats(telemetry)
+        except (OSError, EOFError, tarfile.TarError) as e:
+            self.log(f"[ERRO CRÍTICO] Arquivo compactado ilegível: {e}")
+            return
+
+        telemetry.finish()
+        if skipped:
+            self.log(f"[INFO] {skipped} arquivos já iguais na Steam foram mantidos.")
+        if completed:
+            for line in telemetry.lines():
+                self.log(line)
+        if not self.running:
+            self.log(f"[AVISO] Restauração interrompida após {completed} arquivos.")
+        elif errors == 0:
+            self.log(f"[SUCESSO] Restauração concluída! ({completed} arquivos)")
+        else:
+            self.log(f"[AVISO] Restauração concluída com {errors} erro(s).")
+
+    def _vault_hash(self, packs, dst, rel):
+        """Hash da cópia no cofre (do pacote, se `rel` estiver em um); None se ausente."""
+        if packs is not None and rel in packs:
+            return packs.hash(rel)
+        if not os.path.exists(dst):
+            return None
+        return hash_file(dst)
+
+    def _verify_task(self, manifest, packs=None):
+        """Task de verificação: compara hash da origem e da cópia no cofre.
+
+        O hash da origem vem do manifesto quando ela não mudou desde o backup
+        (tamanho/mtime), evitando reler a Steam; o cofre é sempre relido.
+        """
+        def task(src, dst, rel, st=None):
+            try:
+                vault_hash = self._vault_hash(packs, dst, rel)
+            except (OSError, ValueError):
+                return (True, MISMATCH, None)
+            if vault_hash is None:
+                return (True, MISSING, None)
+            entry = manifest.get(rel) if manifest else None
+            if entry is not None and entry[HASH] and self._matches_entry(src, entry, st=st):
+                src_hash = entry[HASH]
+            else:
+                src_hash = hash_file(src)
+            return (True, OK if vault_hash == src_hash else MISMATCH, None)
+        return task
+
+    def _collect_report(self, report, seen=None):
+        def on_result(job, success, result, meta):
+            rel = job[2].replace(os.sep, "/")
+            if seen is not None:
+                seen.add(rel)
+            if success:
+                report.add(result, rel)
+            else:
+                report.errors.append(rel)
+        return on_result
+
+    def _verify_copied(self, vault_folder, manifest, copied):
+        """Relê do cofre os arquivos copiados e compara com o hash da cópia."""
+        self.log(">>> VERIFICANDO ARQUIVOS COPIADOS...")
+        report = VerifyReport()
+        packs = PackReader.open(vault_folder)
+
+        def task(src, dst, rel, st=None):
+            return (True, OK if self._vault_hash(packs, dst, rel) == manifest.get(rel)[HASH] else MISMATCH, None)
+
+        jobs = ((os.path.join(vault_folder, rel), os.path.join(vault_folder, rel), rel, module, size)
+                for rel, module, size in copied)
+        self._run_pipeline(jobs, task, self._collect_report(report), len(copied), dst_root=vault_folder,
+                           copying=False)
+        if packs is not None:
+            packs.close()
+        for line in report.lines():
+            self.log(line)
+        return report
+
+    def run_verify(self, steam, backup_root, snapshot=None):
+        """Verifica o cofre contra a Steam: divergentes, ausentes e extras.
+
+        Com `snapshot`, verifica a integridade dos blobs daquele snapshot;
+        um cofre só em .tar.gz é verificado pelo manifesto lateral.
+        Retorna um VerifyReport.
+        """
+        report = VerifyReport()
+        if snapshot:
+            return self._verify_snapshot(backup_root, snapshot, report)
+
+        vault = resolve_vault(backup_root)
+        archive_path = os.path.join(backup_root, VAULT_NAME + ARCHIVE_SUFFIX)
+        if not os.path.isdir(vault) and os.path.isfile(archive_path):
+            return self._verify_archive(steam, archive_path, report)
+        self.log("--- VERIFICANDO INTEGRIDADE DO COFRE ---")
+        if not vault_exists(vault) or not os.path.isdir(vault):
+            self.log("[ERRO CRÍTICO] Cofre não encontrado.")
+            report.errors.append(vault)
+            return report
+
+        manifest = Manifest.load(vault)
+        packs = PackReader.open(vault)
+        seen = set()
+        self.log(">>> CALCULANDO HASHES (ORIGEM E COFRE)...")
+        self._run_pipeline(self._iter_modules(steam, vault), self._verify_task(manifest, packs),
+                           self._collect_report(report, seen), len(manifest.files) if manifest else 0,
+                           dst_root=vault, copying=False)
+        if packs is not None:
+            packs.close()
+        if not self.running:
+            self.log("[AVISO] Verificação interrompida.")
+            return report
+
+        # Extras: no cofre mas não na origem (só módulos presentes na Steam)
+        present = {title for rel_mod, title in MODULES if os.path.exists(os.path.join(steam, rel_mod))}
+        for job in self._iter_modules(vault, steam):
+            rel = job[2].replace(os.sep, "/")
+            if rel not in seen and job[3] in present:
+                report.extra.append(rel)
+        if packs is not None:
+            report.extra += [rel for rel in packs.files if rel not in seen and module_for(rel) in present]
+
+        for line in report.lines():
+            self.log(line)
+        if report.ok:
+            self.log(f"[SUCESSO] Cofre íntegro! ({report.verified} arquivos)")
+        else:
+            self.log("[AVISO] O cofre difere da origem.")
+        return report
+
+    def _verify_archive(self, steam, path, report):
+        """Verifica o .tar.gz: cada membro contra o manifesto lateral e a Steam.
+
+        O arquivo é lido em ordem, em fluxo, pela thread de varredura do
+        pipeline, que só calcula o hash de cada membro; o hash da origem e a
+        comparação rodam nas threads de verificação, como em run_verify. Um
+        membro com hash diferente do registrado no backup é divergente
+        (arquivo corrompido). Ausentes e extras são listados como no cofre
+        em pasta.
+        """
+        self.log("--- VERIFICANDO INTEGRIDADE DO COFRE (ARQUIVO) ---")
+        manifest = Manifest.load_file(path + MANIFEST_SUFFIX)
+        if manifest is None:
+            self.log(f"[ERRO] Arquivo sem manifesto ({os.path.basename(path + MANIFEST_SUFFIX)}): "
+                     "verificação indisponível.")
+            report.errors.append(path + MANIFEST_SUFFIX)
+            return report
+        present = {title for rel_mod, title in MODULES if os.path.exists(os.path.join(steam, rel_mod))}
+        seen = set()
+        unreadable = []
+
+        def members():
+            # O "destino" de cada job é o hash do membro; a task compara com a origem
+            try:
+                for member, fileobj in iter_archive(path):
+                    if not self.running:
+                        break
+                    h = hashlib.blake2b(digest_size=16)
+                    for chunk in iter(lambda: fileobj.read(HASH_BUFFER), b''):
+                        h.update(chunk)
+                    rel = member.name
+                    yield (os.path.join(steam, rel.replace("/", os.sep)), h.hexdigest(), rel, module_for(rel),
+                           member.size)
+            except (OSError, EOFError, tarfile.TarError, zlib.error) as e:
+                self.log(f"[ERRO] Arquivo ilegível: {e}")
+                unreadable.append(path)
+
+        def task(src, archive_hash, rel, st=None):
+            entry = manifest.get(rel)
+            if entry is not None and entry[HASH] and entry[HASH] != archive_hash:
+                return (True, MISMATCH, None)
+            if not os.path.exists(src):
+                return (True, EXTRA if module_for(rel) in present else SKIPPED, None)
+            if entry is not None and entry[HASH] and self._matches_entry(src, entry):
+                src_hash = entry[HASH]
+            else:
+                src_hash = hash_file(src)
+            return (True, OK if src_hash == archive_hash else MISMATCH, None)
+
+        self.log(">>> CALCULANDO HASHES (ORIGEM E ARQUIVO)...")
+        self._run_pipeline(members(), task, self._collect_report(report, seen), len(manifest.files),
+                           dst_root=steam, copying=False)
+        report.errors += unreadable
+        if not self.running:
+            self.log("[AVISO] Verificação interrompida.")
+            return report
+        for job in self._iter_modules(steam, steam):
+            rel = job[2].replace(os.sep, "/")
+            if rel not in seen:
+                report.add(MISSING, rel)
+
+        for line in report.lines():
+            self.log(line)
+        if report.ok:
+            self.log(f"[SUCESSO] Arquivo íntegro! ({report.verified} arquivos)")
+        else:
+            self.log("[AVISO] O arquivo difere da origem.")
+        return report
+
+    def _verify_snapshot(self, backup_root, snapshot, report):
+        store = SnapshotStore(backup_root)
+        self.log(f"--- VERIFICANDO SNAPSHOT {snapshot} ---")
+        manifest = store.load(snapshot)
+        if manifest is None:
+            self.log(f"[ERRO CRÍTICO] Snapshot não encontrado: {snapshot}")
+            report.errors.append(snapshot)
+            return report
+
+        def task(digest, dst, rel, st=None):
+            try:
+                actual = store.hash_object(digest)
+            except (OSError, ValueError, zlib.error):
+                return (True, MISMATCH, None)
+            if actual is None:
+                return (True, MISSING, None)
+            return (True, OK if actual == digest else MISMATCH, None)
+
+        jobs = ((entry[HASH], None, rel, entry[MODULE], entry[SIZE]) for rel, entry in manifest.entries())
+        self._run_pipeline(jobs, task, self._collect_report(report), len(manifest.files), dst_root=store.root,
+                           copying=False)
+        for line in report.lines():
+            self.log(line)
+        if report.ok:
+            self.log(f"[SUCESSO] Snapshot íntegro! ({report.verified} arquivos)")
+        else:
+            self.log("[AVISO] Snapshot com blobs ausentes ou corrompidos.")
+        return report
+
+    def list_snapshots(self, backup_root):
+        """[(id, manifesto)] dos snapshots disponíveis, do mais antigo ao mais recente."""
+        store = SnapshotStore(backup_root)
+        return [(snap_id, store.load(snap_id)) for snap_id in store.list()]
+
+    def _restore_task(self, manifest, checksum=False):
+        """Task de planejamento: classifica o destino na Steam (novo/alterado/igual).
+
+        Com manifesto compara contra a entrada (tamanho/mtime e, com checksum,
+        o hash); sem manifesto compara com o arquivo do cofre.
+        """
+        def task(src, dst, rel, st=None):
+            if not os.path.exists(dst):
+                return (True, ADDED, None)
+            entry = manifest.get(rel) if manifest else None
+            if entry is not None and checksum and entry[HASH] is None and src is not None and os.path.exists(src):
+                entry = None  # Sem hash registrado: compara com o cofre
+            if entry is not None:
+                same = self._matches_entry(dst, entry, checksum)
+            else:
+                same = not self._needs_copy(src, dst, checksum, st)
+            return (True, UNCHANGED if same else CHANGED, None)
+        return task
+
+    def _plan_restore(self, jobs, steam, manifest, estimate=0, checksum=False, done=None):
+        """Classifica os jobs; os já restaurados (diário, `done`) nem são comparados."""
+        plan = RestorePlan()
+        task = self._restore_task(manifest, checksum)
+        if done:
+            compare = task
+
+            def task(src, dst, rel, st=None):
+                if rel.replace(os.sep, "/") in done:
+                    return (True, UNCHANGED, None)
+                return compare(src, dst, rel, st)
+
+        def on_result(job, success, result, meta):
+            plan.add(result if success else CHANGED, job)
+
+        self.log(">>> COMPARANDO COFRE E STEAM...")
+        self._run_pipeline(jobs, task, on_result, estimate, dst_root=steam, copying=False)
+        for line in plan.lines():
+            self.log(line)
+        return plan
+
+    def run_restore(self, steam, backup_root, snapshot=None, archive=False, dry_run=False, checksum=False,
+                    selection=None, resume=False):
+        """Restaura o cofre (ou o snapshot `snapshot`, id ou "latest") na Steam.
+
+        Só grava arquivos novos ou diferentes do que já está na Steam. Com
+        dry_run=True apenas calcula e registra o plano. Usa
+        SteamVault_Backup.tar.gz com archive=True ou quando só ele existe.
+        `selection` (Selection) restaura só as contas/AppIDs escolhidos.
+        Cada arquivo é gravado em temporário e renomeado; os concluídos vão
+        para o diário e, com resume=True, são pulados sem comparação.
+        Retorna o RestorePlan (None se não houver o que restaurar).
+        """
+        self.copy_stats = CopyStats()
+        self.hash_on_copy = False
+        task = None
+        archive_path = None
+        packs = None
+        if snapshot:
+            store = SnapshotStore(backup_root, self._throttle)
+            self.log(f"--- INICIANDO RESTAURAÇÃO DO SNAPSHOT {snapshot} ---")
+            manifest = store.load(snapshot)
+            if manifest is None:
+                self.log(f"[ERRO CRÍTICO] Snapshot não encontrado: {snapshot}")
+                return
+            # A "origem" de cada job é o hash do blob; a task resolve o caminho
+            selection = self._bind_selection(selection, steam)
+            jobs = ((manifest.get(rel)[HASH], dst, rel, module, size)
+                    for src, dst, rel, module, size in self._jobs_from_manifest(manifest, store.root, steam, selection))
+            task = store.restore_task(manifest, self.copy_stats)
+        else:
+            origin = resolve_vault(backup_root)
+            selection = self._bind_selection(selection, origin if os.path.isdir(origin) else steam)
+            candidate = os.path.join(backup_root, VAULT_NAME + ARCHIVE_SUFFIX)
+            if archive or (not os.path.exists(origin) and os.path.isfile(candidate)):
+                if not os.path.isfile(candidate):
+                    self.log(f"[ERRO CRÍTICO] Arquivo não encontrado: {candidate}")
+                    return
+                archive_path = candidate
+                self.log("--- INICIANDO RESTAURAÇÃO DO COFRE (ARQUIVO) ---")
+                manifest = Manifest.load_file(archive_path + MANIFEST_SUFFIX)
+                if manifest is None:
+                    # Sem manifesto lateral: compara pelo cabeçalho de cada membro
+                    if dry_run:
+                        self.log("[ERRO] Arquivo sem manifesto: simulação indisponível.")
+                        return
+                    return self._run_archive_restore(steam, archive_path, selection=selection)
+                jobs = self._jobs_from_manifest(manifest, origin, steam, selection)
+            else:
+                if origin.endswith(LEGACY_VAULT_NAME) and os.path.basename(backup_root) != LEGACY_VAULT_NAME:
+                    self.log("[AVISO] Detectado formato de backup antigo (SteamBackup).")
+
+                self.log("--- INICIANDO RESTAURAÇÃO DO COFRE ---")
+                manifest = Manifest.load(origin)
+                packs = PackReader.open(origin)
+                if packs is not None:
+                    self.log(f"[INFO] Cofre com pacotes: {len(packs.files)} arquivos extraídos por offset.")
+                    task = self._unpack_task(packs)
+                if manifest is not None and manifest.has_module("USERDATA"):
+                    self.log(f"[INFO] Manifesto do cofre: {len(manifest.files)} arquivos.")
+                    jobs = self._jobs_from_manifest(manifest, origin, steam, selection)
+                else:
+                    if not os.path.exists(os.path.join(origin, "userdata")) and not packs:
+                        self.log("[ERRO CRÍTICO] O Cofre está vazio ou inválido (userdata missing).")
+                        return
+                    # Cofre sem manifesto (versões antigas ou backup interrompido): varre a árvore
+                    manifest = None
+                    jobs = self._iter_modules(origin, steam, selection, parallel=True)
+                    if packs is not None:
+                        jobs = self._jobs_with_packs(jobs, packs, origin, steam, selection)
+
+        if dry_run:
+            self.log("[INFO] Simulação (--dry-run): nenhum arquivo será gravado.")
+        # Arquivo .tar.gz: sem diário, a retomada vem do plano diferencial
+        source = f"{os.path.abspath(backup_root)}#{snapshot or ''}@{manifest.created if manifest else ''}"
+        target = os.path.abspath(steam)
+        done = None
+        if resume and not archive_path:
+            done = self._resume_entries(backup_root, "restore", source, target)
+        plan = self._plan_restore(jobs, steam, manifest, len(manifest.files) if manifest else 0, checksum, done)
+        if not self.running:
+            self.log("[AVISO] Restauração interrompida.")
+            return plan
+        if dry_run:
+            return plan
+        if plan.pending == 0:
+            self.log("[SUCESSO] A Steam já está igual ao cofre. Nada a restaurar.")
+            return plan
+
+        if archive_path:
+            self._run_archive_restore(steam, archive_path, {job[2].replace(os.sep, "/") for job in plan.jobs()})
+        else:
+            journal = self._open_journal(backup_root, "restore", source, target, bool(done))
+            self._restore_jobs(plan.jobs(), steam, plan.pending, task, journal)
+        if packs is not None:
+            packs.close()
+        return plan
+
+    def _jobs_with_packs(self, jobs, packs, origin, steam, selection=None):
+        """Jobs da varredura do cofre mais os arquivos que só existem nos pacotes."""
+        for rel, entry in packs.files.items():
+            if selection is not None and not selection.match(rel):
+                continue
+            native = rel.replace("/", os.sep)
+            module = module_for(native)
+            if module == "DLL" and os.name != 'nt':
+                continue
+            yield (os.path.join(origin, native), os.path.join(steam, native), native, module, entry[LENGTH])
+        for job in jobs:
+            if job[2] not in packs:
+                yield job
+
+    def _restore_jobs(self, jobs, steam, estimate=0, task=None, journal=None):
+        def on_result(job, success, result, meta):
+            if not success:
+                return
+            if journal is not None:
+                journal.record(job[2], job[4], None, None, job[3])
+            if meta is not None and len(meta) > 3 and meta[3] is not None:
+                self.telemetry.add_packed(job[3], meta[0], meta[3])  # blob comprimido de snapshot
+            if job[3] == "DLL":
+                self.log(f"[DLL] {os.path.basename(job[1])} Restaurada.")
+
+        # Copiar em paralelo
+        self.log(">>> RESTAURANDO ARQUIVOS...")
+        try:
+            completed, errors = self._run_pipeline(jobs, task, on_result, estimate, dst_root=steam)
+        finally:
+            if journal is not None:
+                journal.close()
+        self.log(f"[INFO] Total de arquivos: {completed}")
+
+        if completed == 0:
+            self.log("[AVISO] Nenhum arquivo encontrado para restaurar.")
+            return
+        if not self.running:
+            self.log(f"[AVISO] Restauração interrompida após {completed} arquivos. Use --resume para continuar.")
+            return
+        if journal is not None and errors == 0:
+            journal.discard()
+        if self.copy_stats.by_method:
+            self.log(f"[INFO] Métodos de cópia: {self.copy_stats.summary()}")
+        for line in self.telemetry.lines():
+            self.log(line)
+
         if errors == 0:
             self.log(f"[SUCESSO] Restauração concluída! ({completed} arquivos)")
         else:
@@ -0,0 +1,74 @@
+import hashlib
+
+VERIFY_BUFFER = 4 * 1024 * 1024  # leituras grandes: menos syscalls por GB
+MAX_LISTED = 20  # itens listados por categoria no relatório
+
+OK = "ok"
+MISMATCH = "mismatch"
+MISSING = "missing"
+EXTRA = "extra"
+
+
+def hash_file(path, bufsize=VERIFY_BUFFER):
+    """BLAKE2b do arquivo com readinto num buffer reutilizado.
+
+    O hashlib libera o GIL para blocos grandes, então várias chamadas em
+    threads diferentes escalam com os núcleos/discos disponíveis.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    buf = bytearray(bufsize)
+    view = memoryview(buf)
+    with open(path, 'rb', buffering=0) as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    return h.hexdigest()
+
+
+class VerifyReport:
+    """Resultado de uma verificação: caminhos relativos por categoria."""
+
+    def __init__(self):
+        self.verified = 0
+        self.mismatched = []
+        self.missing = []
+        self.extra = []
+        self.errors = []
+
+    @property
+    def ok(self):
+        return not (self.mismatched or self.missing or self.extra or self.errors)
+
+    def add(self, status, rel):
+        if status == OK:
+            self.verified += 1
+        elif status == MISMATCH:
+            self.mismatched.append(rel)
+        elif status == MISSING:
+            self.missing.append(rel)
+        elif status == EXTRA:
+            self.extra.append(rel)
+
+    def lines(self):
+        """Linhas de log com o resumo e até MAX_LISTED itens de cada problema."""
+        out = [f"[INFO] Verificação: {self.verified} íntegros, {len(self.mismatched)} divergentes, "
+               f"{len(self.missing)} ausentes no cofre, {len(self.extra)} extras, {len(self.errors)} erros"]
+        for label, items in (("DIVERGENTE", self.mismatched), ("AUSENTE", self.missing),
+                             ("EXTRA", self.extra), ("ERRO", self.errors)):
+            for rel in sorted(items)[:MAX_LISTED]:
+                out.append(f"[{label}] {rel}")
+            if len(items) > MAX_LISTED:
+                out.append(f"[{label}] ... e mais {len(items) - MAX_LISTED}")
+        return out
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "verified": self.verified,
+            "mismatched": self.mismatched,
+            "missing": self.missing,
+            "extra": self.extra,
+            "errors": self.errors,
+        }
@@ -0,0 +1,199 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import subprocess
+import sys
+import time
+
+from src.core.scan import scan_tree
+
+POLL_INTERVAL = 5.0  # segundos entre varreduras no modo polling
+
+# linux/inotify.h
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (+ nome)
+
+
+class WatchUnavailable(Exception):
+    pass
+
+
+class InotifyWatcher:
+    """Observa árvores via inotify (Linux, por ctypes): custo zero sem alterações.
+
+    inotify não é recursivo: cada pasta recebe um watch, e pastas criadas
+    depois entram ao aparecer (e voltam inteiras no conjunto sujo, pois
+    arquivos podem ter sido gravados antes do watch existir).
+    """
+
+    kind = "inotify"
+
+    def __init__(self, roots):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise WatchUnavailable("inotify indisponível nesta plataforma")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise WatchUnavailable(os.strerror(ctypes.get_errno()))
+        self.paths = {}  # wd -> pasta
+        try:
+            for root in roots:
+                if os.path.isdir(root):
+                    self._add_tree(root)
+        except WatchUnavailable:
+            self.close()
+            raise
+
+    def _add(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise WatchUnavailable("limite de watches do inotify (fs.inotify.max_user_watches)")
+            return  # pasta sumiu entre a listagem e o watch
+        self.paths[wd] = path
+
+    def _add_tree(self, root):
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            self._add(path)
+            try:
+                with os.scandir(path) as entries:
+                    stack.extend(e.path for e in entries if e.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+
+    def poll(self, timeout):
+        """Caminhos alterados até `timeout` segundos; None se a fila estourou (revarrer tudo)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        overflow = False
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+                continue
+            folder = self.paths.get(wd)
+            if folder is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.paths[wd]
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                changed.add(folder)
+                continue
+            path = os.path.join(folder, os.fsdecode(name)) if name else folder
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    self._add_tree(path)
+                except WatchUnavailable:
+                    overflow = True
+        return None if overflow else changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Alternativa portátil: revarre as árvores a cada `interval` e compara tamanho/mtime."""
+
+    kind = "polling"
+
+    def __init__(self, roots, interval=POLL_INTERVAL):
+        self.roots = roots
+        self.interval = interval
+        self.state = self._scan()
+        self.next_scan = time.monotonic() + interval
+
+    def _scan(self):
+        state = {}
+        for root in self.roots:
+            for path, rel, st in scan_tree(root):
+                state[path] = (st.st_size, st.st_mtime_ns)
+        return state
+
+    def poll(self, timeout):
+        wait = self.next_scan - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        if wait > 0:
+            time.sleep(wait)
+        self.next_scan = time.monotonic() + self.interval
+        state = self._scan()
+        changed = {path for path, info in state.items() if self.state.get(path) != info}
+        changed.update(path for path in self.state if path not in state)
+        self.state = state
+        return changed
+
+    def close(self):
+        self.state = {}
+
+
+def create_watcher(roots, polling=False, interval=POLL_INTERVAL):
+    """InotifyWatcher no Linux; PollingWatcher se indisponível ou `polling`."""
+    if not polling:
+        try:
+            return InotifyWatcher(roots)
+        except (WatchUnavailable, OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, interval)
+
+
+def steam_running():
+    """True se há um processo da Steam em execução (Linux via /proc, Windows via tasklist)."""
+    if sys.platform.startswith("linux"):
+        try:
+            pids = [name for name in os.listdir("/proc") if name.isdigit()]
+        except OSError:
+            return False
+        for pid in pids:
+            try:
+                with open(f"/proc/{pid}/comm", 'r') as f:
+                    if f.read().strip() in ("steam", "steamwebhelper"):
+                        return True
+            except OSError:
+                continue
+        return False
+    if sys.platform == 'win32':
+        try:
+            out = subprocess.run(["tasklist", "/FI", "IMAGENAME eq steam.exe", "/NH"], capture_output=True,
+                                 text=True, timeout=10, creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0))
+            return "steam.exe" in out.stdout.lower()
+        except (OSError, subprocess.SubprocessError):
+            return False
+    return False
@@ -0,0 +1,48 @@
+import threading
+from collections import deque
+
+REFRESH_MS = 50         # 20 Hz: a GUI drena o buffer neste intervalo
+LINES_PER_TICK = 200    # linhas de log anexadas por atualização
+BUFFER_MAX = 5000       # linhas pendentes antes de descartar as mais antigas
+
+
+class UpdateBuffer:
+    """Junta o log e o progresso que o engine emite na thread de trabalho.
+
+    Os callbacks só gravam aqui (sem sinal Qt por arquivo); a GUI chama
+    drain() num QTimer e recebe o último progresso e um lote limitado de
+    linhas. Se o log enche mais rápido do que a GUI consome, as linhas mais
+    antigas são descartadas e contadas.
+    """
+
+    def __init__(self, max_lines=BUFFER_MAX):
+        self._lock = threading.Lock()
+        self._lines = deque()
+        self._max_lines = max_lines
+        self._dropped = 0
+        self._stats = None
+
+    def log(self, text):
+        with self._lock:
+            if len(self._lines) >= self._max_lines:
+                self._lines.popleft()
+                self._dropped += 1
+            self._lines.append(text)
+
+    def progress(self, stats):
+        with self._lock:
+            self._stats = stats
+
+    def drain(self, max_lines=LINES_PER_TICK):
+        """(linhas, descartadas, progresso ou None) acumulados desde a última chamada."""
+        with self._lock:
+            count = min(len(self._lines), max_lines) if max_lines else len(self._lines)
+            lines = [self._lines.popleft() for _ in range(count)]
+            dropped, self._dropped = self._dropped, 0
+            stats, self._stats = self._stats, None
+        return lines, dropped, stats
+
+    @property
+    def pending(self):
+        with self._lock:
+            return bool(self._lines) or self._stats is not None
@@ -2,12 +2,15 @@ import os
 import sys
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QLabel, QPushButton, QFileDialog, 
-                             QProgressBar, QFrame, QMessageBox, QTextEdit)
-from PyQt6.QtCore import Qt, QThread, pyqtSignal, QPoint
+                             QProgressBar, QFrame, QMessageBox, QTextEdit, QSpinBox, QCheckBox)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal, QPoint
 from PyQt6.QtGui import QCursor, QIcon
 
 from src.utils.config import ConfigManager
-from src.core.vault import VaultEngine, APP_NAME
+from src.utils.discovery import steam_info
+from src.core.vault import VaultEngine, APP_NAME, VAULT_NAME, vault_exists, interrupted_run
+from src.core.throttle import IoLimits
+from src.gui.updates import UpdateBuffer, REFRESH_MS
 
 # --- CONFIGURAÇÕES DE TEMA (MIDNIGHT PRO) ---
 THEME = {
@@ -23,29 +26,35 @@ THEME = {
     "close_hover": "#ef4444"
 }
 
+# QProgressBar usa int32: a barra vai em milésimos, não em bytes
+PROGRESS_SCALE = 1000
+# Linhas mantidas no console; as mais antigas saem em execuções longas
+CONSOLE_MAX_LINES = 2000
+
 class VaultWorkerGUI(QThread):
-    log = pyqtSignal(str)
-    progress = pyqtSignal(int, int)  # current, total
     finished = pyqtSignal()
 
-    def __init__(self, mode, steam, backup):
+    def __init__(self, mode, steam, backup, incremental=False, resume=False, limits=None, mirrors=None):
         super().__init__()
         self.mode = mode
         self.steam = steam
         self.backup = backup
-        self.engine = VaultEngine(self.emit_log, self.emit_progress)
-
-    def emit_log(self, text):
-        self.log.emit(text)
-
-    def emit_progress(self, current, total):
-        self.progress.emit(current, total)
+        self.mirrors = mirrors or []  # destinos extras do backup (gravados em leque)
+        self.incremental = incremental
+        self.resume = resume  # continua a execução interrompida registrada no diário
+        self.plan = None  # RestorePlan da prévia
+        # Log e progresso (Telemetry.snapshot()) ficam no buffer; a janela drena a 20 Hz
+        self.updates = UpdateBuffer()
+        self.engine = VaultEngine(self.updates.log, stats_callback=self.updates.progress, limits=limits)
 
     def run(self):
         if self.mode == "backup":
-            self.engine.run_backup(self.steam, self.backup)
+            targets = [self.backup] + self.mirrors if self.mirrors else self.backup
+            self.engine.run_backup(self.steam, targets, incremental=self.incremental, resume=self.resume)
+        elif self.mode == "preview":
+            self.plan = self.engine.run_restore(self.steam, self.backup, dry_run=True, resume=self.resume)
         else:
-            self.engine.run_restore(self.steam, self.backup)
+            self.engine.run_restore(self.steam, self.backup, resume=self.resume)
         self.finished.emit()
 
 class SteamVaultGUI(QMainWindow):
@@ -56,8 +65,13 @@ class SteamVaultGUI(QMainWindow):
         self.setWindowFlags(Qt.WindowType.FramelessWindowHint)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
         self.old_pos = None
+        self.worker = None
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.flush_updates)
         self.init_ui()
         self.apply_styles()
+        self.show_discovery()
 
     def init_ui(self):
         self.main_frame = QFrame()
@@ -90,6 +104,7 @@ class SteamVaultGUI(QMainWindow):
         left = QVBoxLayout(); left.setSpacing(15)
         self.create_path(left, "DIRETÓRIO STEAM:", self.config['steam_path'], self.sel_steam, "lbl_steam")
         self.create_path(left, "LOCAL DO COFRE (BACKUP):", self.config['backup_path'], self.sel_backup, "lbl_backup")
+        self.create_limits(left)
         left.addStretch()
         
         actions = QHBoxLayout(); actions.setSpacing(10)
@@ -103,6 +118,7 @@ class SteamVaultGUI(QMainWindow):
         right = QVBoxLayout(); right.setSpacing(5)
         right.addWidget(QLabel("REGISTRO DE OPERAÇÕES", styleSheet=f"color:{THEME['text_dim']}; font-weight:bold; font-size:10px;"))
         self.console = QTextEdit(); self.console.setReadOnly(True); self.console.setObjectName("Terminal")
+        self.console.document().setMaximumBlockCount(CONSOLE_MAX_LINES)
         self.console.append(f"<span style='color:{THEME['text_dim']}'>Steam Vault Inicializado.</span>")
         right.addWidget(self.console)
         content.addLayout(right, stretch=6)
@@ -114,10 +130,10 @@ class SteamVaultGUI(QMainWindow):
         self.progress_label = QLabel("Aguardando..."); self.progress_label.setObjectName("ProgressLabel")
         self.progress_bar = QProgressBar(); self.progress_bar.setObjectName("ProgressBar")
         self.progress_bar.setMinimum(0)
-        self.progress_bar.setMaximum(100)
+        self.progress_bar.setMaximum(PROGRESS_SCALE)
         self.progress_bar.setValue(0)
         self.progress_bar.setTextVisible(True)
-        self.progress_bar.setFormat("%v/%m (%p%)")
+        self.progress_bar.setFormat("%p%")
         
         progress_layout.addWidget(self.progress_label)
         progress_layout.addWidget(self.progress_bar)
@@ -134,27 +150,116 @@ class SteamVaultGUI(QMainWindow):
         line = QFrame(); line.setFrameShape(QFrame.Shape.HLine); line.setStyleSheet(f"background:{THEME['btn_border']}; max-height:1px;")
         layout.addWidget(line)
 
+    def create_limits(self, layout):
+        """Limites de E/S (vault_config.json); valem também para a operação em andamento."""
+        layout.addWidget(QLabel("LIMITES DE E/S (0 = LIVRE):", styleSheet=f"color:{THEME['accent']}; font-size:10px; font-weight:bold;"))
+        row = QHBoxLayout()
+        self.spin_mbps = QSpinBox(); self.spin_mbps.setRange(0, 10000); self.spin_mbps.setSuffix(" MB/s")
+        self.spin_mbps.setValue(int(float(self.config.get('max_mb_per_sec') or 0)))
+        self.spin_iops = QSpinBox(); self.spin_iops.setRange(0, 100000); self.spin_iops.setSuffix(" arq/s")
+        self.spin_iops.setValue(int(self.config.get('max_ops_per_sec') or 0))
+        self.chk_idle = QCheckBox("Segundo plano"); self.chk_idle.setChecked(bool(self.config.get('idle_io')))
+        self.chk_idle.setToolTip("Prioridade de E/S ociosa: o jogo tem preferência no disco")
+        for widget in (self.spin_mbps, self.spin_iops):
+            widget.valueChanged.connect(self.update_limits)
+        self.chk_idle.toggled.connect(self.update_limits)
+        row.addWidget(self.spin_mbps); row.addWidget(self.spin_iops); row.addWidget(self.chk_idle)
+        layout.addLayout(row)
+
+    def update_limits(self, *args):
+        self.config['max_mb_per_sec'] = self.spin_mbps.value()
+        self.config['max_ops_per_sec'] = self.spin_iops.value()
+        self.config['idle_io'] = self.chk_idle.isChecked()
+        ConfigManager.save(self.config)
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.engine.limits.update_from_config(self.config)
+            self.update_term(f"[INFO] Limites de E/S: {self.worker.engine.limits.describe()}")
+
+    def show_discovery(self):
+        """Contas e bibliotecas da Steam selecionada (libraryfolders/loginusers em cache)."""
+        steam = self.config.get('steam_path')
+        if not steam or not os.path.isdir(steam):
+            return
+        found = steam_info(steam)
+        for account, user in sorted(found["accounts"].items()):
+            recent = " (recente)" if user["most_recent"] else ""
+            self.update_term(f"[INFO] Conta {account}: {user['persona'] or user['name']}{recent}")
+        for library in found["libraries"]:
+            self.update_term(f"[INFO] Biblioteca {library['path']}: {len(library['apps'])} apps")
+
     def update_term(self, text):
-        col = THEME['text_main']
-        if "[SUCESSO]" in text: col = THEME['success']
-        elif "[ERRO]" in text: col = THEME['error']
-        elif ">>>" in text: col = THEME['accent']
-        self.console.append(f"<span style='color:{col}'>{text}</span>")
+        self.append_lines([text])
+
+    def append_lines(self, lines, dropped=0):
+        """Anexa um lote de linhas com um único repaint e rolagem."""
+        self.console.setUpdatesEnabled(False)
+        if dropped:
+            self.console.append(f"<span style='color:{THEME['text_dim']}'>... {dropped} linhas omitidas</span>")
+        for text in lines:
+            col = THEME['text_main']
+            if "[SUCESSO]" in text: col = THEME['success']
+            elif "[ERRO]" in text: col = THEME['error']
+            elif ">>>" in text: col = THEME['accent']
+            self.console.append(f"<span style='color:{col}'>{text}</span>")
+        self.console.setUpdatesEnabled(True)
         self.console.verticalScrollBar().setValue(self.console.verticalScrollBar().maximum())
 
-    def update_progress(self, current, total):
-        """Atualiza a barra de progresso."""
-        self.progress_bar.setMaximum(total)
-        self.progress_bar.setValue(current)
-        percent = int((current / total) * 100) if total > 0 else 0
-        self.progress_label.setText(f"Processando: {current}/{total} ({percent}%)")
+    def flush_updates(self, everything=False):
+        """Tick do QTimer: aplica o último progresso e um lote do log."""
+        if self.worker is None:
+            return
+        updates = self.worker.updates
+        lines, dropped, stats = updates.drain(0) if everything else updates.drain()
+        if lines or dropped:
+            self.append_lines(lines, dropped)
+        if stats is not None:
+            self.update_progress(stats)
+
+    def update_progress(self, stats):
+        """Atualiza a barra pelo volume (bytes) e o texto com vazão e ETA."""
+        total = stats["bytes_total"]
+        fraction = stats["bytes_done"] / total if total > 0 else 0
+        self.progress_bar.setValue(int(min(fraction, 1) * PROGRESS_SCALE))
+        eta = stats["eta"]
+        eta_text = f"{int(eta) // 60}m{int(eta) % 60:02d}s" if eta is not None else "--"
+        self.progress_label.setText(
+            f"Processando: {stats['files_done']}/{stats['files_total']} arquivos · "
+            f"{stats['bytes_done'] / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f} MB · "
+            f"{stats['bytes_per_sec'] / (1024 * 1024):.1f} MB/s · ETA {eta_text}")
 
     def on_finished(self):
         """Chamado quando a operação termina."""
+        self.refresh_timer.stop()
+        self.flush_updates(everything=True)
         self.progress_bar.setValue(self.progress_bar.maximum())
         self.progress_label.setText("Concluído!")
         self.btn_bkp.setEnabled(True)
         self.btn_res.setEnabled(True)
+        if self.worker.mode == "preview":
+            self.confirm_restore(self.worker.plan)
+
+    def confirm_restore(self, plan):
+        """Mostra a prévia da restauração e pede confirmação."""
+        if plan is None or plan.pending == 0:
+            return
+        info = plan.to_dict()
+        mb = lambda size: f"{size / (1024 * 1024):.1f} MB"
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Prévia da Restauração")
+        msg.setText(f"Novos: {info['added']} ({mb(info['added_bytes'])})\n"
+                    f"Alterados: {info['changed']} ({mb(info['changed_bytes'])})\n"
+                    f"Inalterados: {info['unchanged']} ({mb(info['unchanged_bytes'])})\n\n"
+                    "Gravar apenas os arquivos novos e alterados na Steam?")
+        msg.setIcon(QMessageBox.Icon.Question)
+        btn_sim = msg.addButton("Restaurar", QMessageBox.ButtonRole.YesRole)
+        msg.addButton("Cancelar", QMessageBox.ButtonRole.NoRole)
+        msg.setStyleSheet(f"background-color: {THEME['bg_panel']}; color: {THEME['text_main']};")
+        msg.exec()
+
+        if msg.clickedButton() == btn_sim:
+            self.start_worker("restore", resume=self.worker.resume)
+        else:
+            self.update_term("Operação cancelada pelo usuário.")
 
     def apply_styles(self):
         self.setStyleSheet(f"""
@@ -171,6 +276,8 @@ class SteamVaultGUI(QMainWindow):
             QPushButton#BtnPrimary {{ background: {THEME['accent']}; color: white; border: none; font-weight: bold; padding: 12px; }}
             QPushButton#BtnPrimary:hover {{ background: #2563eb; }}
             QPushButton#BtnSecondary {{ border: 1px solid {THEME['accent']}; color: {THEME['accent']}; font-weight: bold; padding: 12px; }}
+            QSpinBox {{ background: {THEME['btn_bg']}; color: {THEME['text_main']}; border: 1px solid {THEME['btn_border']}; border-radius: 4px; padding: 3px; }}
+            QCheckBox {{ color: {THEME['text_main']}; }}
             QTextEdit#Terminal {{ background: {THEME['bg_panel']}; border: 1px solid {THEME['btn_border']}; color: {THEME['text_main']}; font-family: 'Consolas'; font-size: 11px; padding: 10px; }}
             QProgressBar#ProgressBar {{ 
                 background: {THEME['bg_panel']}; 
@@ -190,7 +297,7 @@ class SteamVaultGUI(QMainWindow):
 
     def sel_steam(self):
         p = QFileDialog.getExistingDirectory(self, "Pasta Steam"); 
-        if p: self.config['steam_path'] = p; self.lbl_steam.setText(p); ConfigManager.save(self.config)
+        if p: self.config['steam_path'] = p; self.lbl_steam.setText(p); ConfigManager.save(self.config); self.show_discovery()
     def sel_backup(self):
         p = QFileDialog.getExistingDirectory(self, "Pasta para o Cofre"); 
         if p: self.config['backup_path'] = p; self.lbl_backup.setText(p); ConfigManager.save(self.config)
@@ -198,35 +305,63 @@ class SteamVaultGUI(QMainWindow):
     def run_p(self, mode):
         if not self.config['steam_path'] or not self.config['backup_path']: self.update_term("[ERRO] Defina os diretórios."); return
         
+        # Execução anterior interrompida: oferece retomar de onde parou
+        resume = False
+        if interrupted_run(self.config['backup_path'], mode):
+            msg = QMessageBox(self)
+            msg.setWindowTitle("Execução Interrompida")
+            msg.setText("O último " + ("backup" if mode == "backup" else "restauração") +
+                        " não terminou.\nRetomar de onde parou ou começar de novo?")
+            msg.setIcon(QMessageBox.Icon.Question)
+            btn_ret = msg.addButton("Retomar", QMessageBox.ButtonRole.AcceptRole)
+            btn_new = msg.addButton("Recomeçar", QMessageBox.ButtonRole.YesRole)
+            msg.addButton("Cancelar", QMessageBox.ButtonRole.NoRole)
+            msg.setStyleSheet(f"background-color: {THEME['bg_panel']}; color: {THEME['text_main']};")
+            msg.exec()
+
+            if msg.clickedButton() == btn_ret:
+                resume = True
+            elif msg.clickedButton() != btn_new:
+                self.update_term("Operação cancelada pelo usuário.")
+                return
+
         # Check Segurança (Overwrite) com Botoes Customizados
-        if mode == "backup":
-            vault_folder = os.path.join(self.config['backup_path'], "SteamVault_Backup")
-            if os.path.exists(vault_folder) and os.listdir(vault_folder):
+        incremental = False
+        if mode == "backup" and not resume:
+            vault_folder = os.path.join(self.config['backup_path'], VAULT_NAME)
+            if vault_exists(vault_folder):
                 msg = QMessageBox(self)
                 msg.setWindowTitle("Cofre Ocupado")
-                msg.setText("Já existe um backup anterior.\nDeseja sobrescrever o cofre?")
+                msg.setText("Já existe um backup anterior.\nAtualizar apenas o que mudou ou sobrescrever o cofre?")
                 msg.setIcon(QMessageBox.Icon.Question)
                 
-                btn_sim = msg.addButton("Sim", QMessageBox.ButtonRole.YesRole)
+                btn_inc = msg.addButton("Atualizar", QMessageBox.ButtonRole.AcceptRole)
+                btn_sim = msg.addButton("Sobrescrever", QMessageBox.ButtonRole.YesRole)
                 btn_nao = msg.addButton("Não", QMessageBox.ButtonRole.NoRole)
                 
                 msg.setStyleSheet(f"background-color: {THEME['bg_panel']}; color: {THEME['text_main']};")
                 msg.exec()
                 
-                if msg.clickedButton() != btn_sim:
+                if msg.clickedButton() == btn_inc:
+                    incremental = True
+                elif msg.clickedButton() != btn_sim:
                     self.update_term("Operação cancelada pelo usuário.")
                     return
 
+        # Restauração começa por uma prévia (dry-run) do que será gravado
+        self.start_worker("preview" if mode == "restore" else mode, incremental, resume)
+
+    def start_worker(self, mode, incremental=False, resume=False):
         # Desabilitar botões durante operação
         self.btn_bkp.setEnabled(False)
         self.btn_res.setEnabled(False)
         self.progress_bar.setValue(0)
         self.progress_label.setText("Iniciando...")
 
-        self.worker = VaultWorkerGUI(mode, self.config['steam_path'], self.config['backup_path'])
-        self.worker.log.connect(self.update_term)
-        self.worker.progress.connect(self.update_progress)
+        self.worker = VaultWorkerGUI(mode, self.config['steam_path'], self.config['backup_path'], incremental, resume,
+                                     IoLimits.from_config(self.config), self.config.get('mirror_paths'))
         self.worker.finished.connect(self.on_finished)
+        self.refresh_timer.start()
         self.worker.start()
 
     def mousePressEvent(self, e): self.old_pos = e.globalPosition().toPoint() if e.button() == Qt.MouseButton.LeftButton else None
@@ -1,10 +1,185 @@
+import os
 import sys
+import json
+import time
 import argparse
-from PyQt6.QtWidgets import QApplication
 
-from src.utils.config import ConfigManager
-from src.core.vault import VaultEngine, APP_NAME
-from src.gui.window import SteamVaultGUI
+from src.utils.config import ConfigManager, CONFIG_FILE
+from src.utils.discovery import steam_info, app_libraries
+from src.core.vault import VaultEngine, APP_NAME, MODULES, resolve_vault
+from src.core.manifest import Manifest
+from src.core.selection import Selection
+from src.core.throttle import IoLimits
+from src.core.packs import PACK_LIMIT
+
+def print_vault_info(backup):
+    """Resumo do cofre lido do manifesto (sem varrer a pasta)."""
+    vault = resolve_vault(backup)
+    manifest = Manifest.load(vault)
+    if manifest is None:
+        print(f"[AVISO] Nenhum manifesto em {vault}.")
+        return None
+    print(f"[INFO] Cofre: {vault}")
+    print(f"[INFO] Criado em: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(manifest.created))}")
+    for module, (count, size) in sorted(manifest.summary().items()):
+        print(f"   {module:<12} {count:>7} arquivos  {size / (1024 * 1024):>10.1f} MB")
+    print(f"   {'TOTAL':<12} {len(manifest.files):>7} arquivos  {manifest.total_size() / (1024 * 1024):>10.1f} MB")
+    return manifest
+
+def print_snapshots(engine, backup):
+    snapshots = engine.list_snapshots(backup)
+    if not snapshots:
+        print("[AVISO] Nenhum snapshot encontrado.")
+        return
+    for snap_id, manifest in snapshots:
+        if manifest is None:
+            print(f"   {snap_id:<20} (manifesto inválido)")
+            continue
+        print(f"   {snap_id:<20} {len(manifest.files):>7} arquivos  {manifest.total_size() / (1024 * 1024):>10.1f} MB")
+
+def print_index(engine, steam):
+    """Contas e AppIDs encontrados na Steam, com tamanhos, nomes e bibliotecas."""
+    index = engine.build_index(steam)
+    found = steam_info(steam)
+    libraries = app_libraries(found)
+    mb = lambda size: f"{size / (1024 * 1024):>10.1f} MB"
+    for account, info in sorted(index["accounts"].items()):
+        user = found["accounts"].get(account)
+        name = f" ({user['persona'] or user['name']})" if user else ""
+        print(f"   Conta {account:<14} {mb(info['size'])}{name}")
+        for app, size in sorted(info["apps"].items(), key=lambda item: -item[1]):
+            print(f"      App {app:<12} {mb(size)}")
+    print(f"   {'AppIDs (total por jogo)':<20}")
+    for app, size in sorted(index["apps"].items(), key=lambda item: -item[1]):
+        place = f"  {libraries[app]}" if app in libraries else ""
+        print(f"      App {app:<12} {mb(size)}{place}")
+    if found["libraries"]:
+        print(f"   {'Bibliotecas':<20}")
+        for library in found["libraries"]:
+            print(f"      {library['path']}  ({len(library['apps'])} apps)")
+
+class CliProgress:
+    """Imprime o progresso (bytes, vazão, ETA) no máximo uma vez por intervalo."""
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.last = 0.0
+
+    def __call__(self, stats):
+        now = time.monotonic()
+        if now - self.last < self.interval:
+            return
+        self.last = now
+        total = stats["bytes_total"]
+        percent = stats["bytes_done"] * 100 / total if total else 0
+        eta = f"{stats['eta']:.0f}s" if stats["eta"] is not None else "--"
+        print(f"[PROGRESSO] {percent:5.1f}% · {stats['files_done']}/{stats['files_total']} arquivos · "
+              f"{stats['bytes_per_sec'] / (1024 * 1024):.1f} MB/s · {stats['files_per_sec']:.0f} arq/s · ETA {eta}")
+        for target in stats.get("destinations") or []:
+            print(f"   [DESTINO] {target['path']}: {target['files']} arq. · {target['bytes_per_sec'] / (1024 * 1024):.1f} MB/s"
+                  f" · fila {target['queued_bytes'] / (1024 * 1024):.0f} MB · {target['errors']} erro(s)")
+
+class LimitsReloader:
+    """Reaplica os limites de E/S quando o vault_config.json muda durante a execução."""
+
+    def __init__(self, engine, path=CONFIG_FILE, interval=1.0):
+        self.engine = engine
+        self.path = path
+        self.interval = interval
+        self.last = 0.0
+        self.mtime = self._mtime()
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def __call__(self, stats=None):
+        now = time.monotonic()
+        if now - self.last < self.interval:
+            return
+        self.last = now
+        mtime = self._mtime()
+        if mtime is None or mtime == self.mtime:
+            return
+        self.mtime = mtime
+        try:
+            with open(self.path, 'r') as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.engine.limits.update_from_config(config)
+        print(f"[INFO] Limites de E/S atualizados: {self.engine.limits.describe()}")
+
+def run_daemon(engine, steam, backup, args, selection, reload_limits):
+    """Backup contínuo: observa os módulos e copia só os caminhos alterados.
+
+    Alterações entram num conjunto sujo; o backup roda quando a árvore fica
+    `--debounce` segundos sem mudanças, no máximo a cada `--interval`
+    segundos e, com --when-idle, só com a Steam fechada.
+    """
+    from src.core.watch import create_watcher, steam_running
+    print("[INFO] Modo daemon: sincronizando o cofre antes de observar...")
+    engine.run_backup(steam, backup, incremental=True, checksum=args.checksum, selection=selection)
+    watcher = create_watcher([os.path.join(steam, rel_mod) for rel_mod, title in MODULES], polling=args.poll)
+    print(f"[INFO] Observando alterações ({watcher.kind}). Ctrl+C encerra.")
+    dirty = set()
+    rescan = False  # fila do inotify estourou: backup incremental completo
+    last_change = next_run = 0.0
+    try:
+        while True:
+            changes = watcher.poll(1.0)
+            reload_limits()
+            now = time.monotonic()
+            if changes is None:
+                rescan, last_change = True, now
+            elif changes:
+                dirty |= changes
+                last_change = now
+            if not (dirty or rescan) or now - last_change < args.debounce or now < next_run:
+                continue
+            if args.when_idle and steam_running():
+                continue
+            print(f"\n[INFO] {time.strftime('%H:%M:%S')} " +
+                  ("Revarredura completa." if rescan else f"{len(dirty)} caminho(s) alterado(s)."))
+            if rescan:
+                engine.run_backup(steam, backup, incremental=True, checksum=args.checksum, selection=selection)
+            else:
+                engine.run_backup_paths(steam, backup, dirty, checksum=args.checksum, selection=selection)
+            dirty, rescan = set(), False
+            next_run = time.monotonic() + args.interval
+    except KeyboardInterrupt:
+        print("\n[INFO] Daemon encerrado.")
+    finally:
+        watcher.close()
+
+def run_batch_cli(config, backup, args, limits, selection):
+    """Backup em lote: --install (PATH ou PATH=DESTINO), steam_paths do config ou as detectadas."""
+    from src.core.batch import run_batch
+    installs = []
+    for value in args.install or []:
+        steam, sep, target = value.partition("=")
+        installs.append((steam, target) if sep else steam)
+    if not installs:
+        installs = config.get('steam_paths') or ConfigManager.detect_steam_paths()
+    if not installs:
+        print("[ERRO] Nenhuma instalação da Steam encontrada. Use --install PATH.")
+        return False
+    options = {"incremental": args.incremental, "checksum": args.checksum, "verify": args.verify,
+               "limits": limits.to_dict(), "selection": selection, "pack": args.pack * 1024}
+    report = run_batch(installs, backup, options, args.jobs, args.per_disk)
+    print(f"\n[INFO] Lote: {report['installs']} instalações, {report['files']} arquivos, "
+          f"{report['bytes'] / (1024 * 1024):.1f} MB em {report['seconds']:.1f}s")
+    for result in report["results"]:
+        status = "OK  " if result["ok"] else "FALHA"
+        print(f"   {status} {result['steam']:<45} {result['files']:>7} arq. {result['bytes'] / (1024 * 1024):>9.1f} MB "
+              f"{result['seconds']:>7.1f}s  -> {result['backup']}")
+    if report["failed"]:
+        print(f"[AVISO] {report['failed']} instalação(ões) com erro; veja SteamVault_batch.log em cada cofre.")
+        return False
+    print("[SUCESSO] Lote concluído!")
+    return True
 
 def run_cli(args):
     config = ConfigManager.load()
@@ -15,30 +190,99 @@ def run_cli(args):
     print(f"   {APP_NAME} CLI")
     print(f"{'-'*40}")
 
-    if not steam or not backup:
+    if not backup or (not steam and args.action != "batch"):
         print("[ERRO] Caminhos inválidos.")
         return
 
-    engine = VaultEngine(print)
+    # Limites: vault_config.json, sobrescritos pelas flags; editar o arquivo ajusta a execução em andamento
+    limits = IoLimits.from_config(config)
+    limits.configure(None if args.max_mbps is None else int(args.max_mbps * 1024 * 1024), args.max_iops,
+                     True if args.idle_io else None)
+    engine = VaultEngine(print, limits=limits)
+    progress, reload_limits = CliProgress(), LimitsReloader(engine)
+    engine.stats = lambda stats: (reload_limits(), progress(stats))
+    if limits.active:
+        print(f"[INFO] Limites de E/S: {limits.describe()}")
+    selection = Selection(args.app, args.account, args.exclude_app, args.exclude_account)
 
     if args.action == "backup":
         # Note: CLI force logic handled here lightly, but ideally should be in engine or interactive
         # For now, mirroring original behavior
-        engine.run_backup(steam, backup)
+        # Destinos extras do config acompanham o backup_path do config; --mirror vale sempre
+        mirrors = (args.mirror or []) + ([] if args.backup_path else config.get('mirror_paths') or [])
+        engine.run_backup(steam, [backup] + mirrors if mirrors else backup, incremental=args.incremental, checksum=args.checksum,
+                          snapshot=bool(args.snapshot), keep=args.keep, archive=args.archive, verify=args.verify,
+                          selection=selection, resume=args.resume, compress=args.compress, pack=args.pack * 1024)
     elif args.action == "restore":
-        engine.run_restore(steam, backup)
+        if args.snapshot:
+            engine.run_restore(steam, backup, snapshot=args.snapshot, dry_run=args.dry_run, checksum=args.checksum,
+                               selection=selection, resume=args.resume)
+        else:
+            print_vault_info(backup)
+            engine.run_restore(steam, backup, archive=args.archive, dry_run=args.dry_run, checksum=args.checksum,
+                               selection=selection, resume=args.resume)
+    elif args.action == "snapshots":
+        print_snapshots(engine, backup)
+    elif args.action == "verify":
+        report = engine.run_verify(steam, backup, snapshot=args.snapshot)
+        if not report.ok:
+            sys.exit(1)
+    elif args.action == "info":
+        print_vault_info(backup)
+    elif args.action == "index":
+        print_index(engine, steam)
+    elif args.action == "daemon":
+        run_daemon(engine, steam, backup, args, selection, reload_limits)
+    elif args.action == "batch":
+        if not run_batch_cli(config, backup, args, limits, selection):
+            sys.exit(1)
 
 def main():
     parser = argparse.ArgumentParser(description=f"{APP_NAME} Tool")
-    parser.add_argument("action", nargs="?", choices=["backup", "restore"])
+    parser.add_argument("action", nargs="?",
+                        choices=["backup", "restore", "info", "snapshots", "verify", "index", "daemon", "batch"])
     parser.add_argument("--steam", help="Caminho Steam")
     parser.add_argument("--backup-path", help="Caminho Backup")
     parser.add_argument("--force", action="store_true")
+    parser.add_argument("--incremental", action="store_true", help="Copia apenas arquivos novos/alterados")
+    parser.add_argument("--checksum", action="store_true", help="Incremental/restore compara também o hash do conteúdo")
+    parser.add_argument("--snapshot", nargs="?", const="latest", metavar="ID",
+                        help="Backup: cria um snapshot deduplicado. Restore: restaura o snapshot ID (padrão: latest)")
+    parser.add_argument("--verify", action="store_true", help="Backup: relê e confere os arquivos copiados")
+    parser.add_argument("--archive", action="store_true", help="Usa um único SteamVault_Backup.tar.gz")
+    parser.add_argument("--dry-run", action="store_true", help="Restore: mostra o plano sem gravar nada")
+    parser.add_argument("--resume", action="store_true", help="Continua um backup/restore interrompido")
+    parser.add_argument("--app", action="append", metavar="APPID", help="Só estes AppIDs (repetível ou 730,440)")
+    parser.add_argument("--account", action="append", metavar="ID", help="Só estas contas (pastas de userdata)")
+    parser.add_argument("--exclude-app", action="append", metavar="APPID", help="Ignora estes AppIDs")
+    parser.add_argument("--exclude-account", action="append", metavar="ID", help="Ignora estas contas")
+    parser.add_argument("--mirror", action="append", metavar="PATH",
+                        help="Backup: destino extra (repetível), gravado em leque com o principal")
+    parser.add_argument("--compress", action="store_true",
+                        help="Backup: snapshot com blobs comprimidos (dicionário treinado nos arquivos pequenos)")
+    parser.add_argument("--pack", nargs="?", type=int, const=PACK_LIMIT // 1024, default=0, metavar="KB",
+                        help=f"Backup: arquivos menores que KB (padrão: {PACK_LIMIT // 1024}) vão para pacotes com índice")
+    parser.add_argument("--keep", type=int, default=0, help="Snapshots a manter (0 = todos)")
+    parser.add_argument("--max-mbps", type=float, help="Limite de banda em MB/s (0 = sem limite)")
+    parser.add_argument("--max-iops", type=int, help="Limite de arquivos por segundo (0 = sem limite)")
+    parser.add_argument("--idle-io", action="store_true", help="Prioridade de E/S ociosa (ioprio no Linux)")
+    parser.add_argument("--install", action="append", metavar="PATH[=DESTINO]",
+                        help="Batch: instalação da Steam (repetível); padrão: steam_paths do config ou detectadas")
+    parser.add_argument("--jobs", type=int, default=None, help="Batch: processos em paralelo (padrão: núcleos)")
+    parser.add_argument("--per-disk", type=int, default=None, help="Batch: backups simultâneos por disco de destino (padrão: pelo tipo do disco, "
+                             "4 em SSD, 1 em HDD, 2 em rede ou tipo desconhecido)")
+    parser.add_argument("--debounce", type=float, default=10.0, help="Daemon: segundos sem alterações antes do backup")
+    parser.add_argument("--interval", type=float, default=0.0, help="Daemon: intervalo mínimo entre backups (s)")
+    parser.add_argument("--when-idle", action="store_true", help="Daemon: só faz backup com a Steam fechada")
+    parser.add_argument("--poll", action="store_true", help="Daemon: usa varredura periódica em vez de inotify")
     args = parser.parse_args()
 
     if args.action:
         run_cli(args)
     else:
+        # Qt só é importado para a GUI: a CLI (cron, agendador) não paga o custo
+        from PyQt6.QtWidgets import QApplication
+        from src.gui.window import SteamVaultGUI
         app = QApplication(sys.argv)
         w = SteamVaultGUI()
         w.show()
@@ -2,18 +2,31 @@ import json
 import os
 import sys
 
+from src.utils.discovery import SteamDiscovery
+
 # Importar winreg apenas no Windows
 if sys.platform == 'win32':
     import winreg
 
 CONFIG_FILE = "vault_config.json"
-DEFAULT_CONFIG = {"steam_path": "", "backup_path": ""}
+# Limites de E/S (0 = sem limite): ver src/core/throttle.py
+# mirror_paths: destinos extras do backup, gravados junto com backup_path (src/core/fanout.py)
+# steam_paths: instalações do backup em lote (vazio = detectar)
+DEFAULT_CONFIG = {"steam_path": "", "backup_path": "", "mirror_paths": [], "steam_paths": [], "max_mb_per_sec": 0,
+                  "max_ops_per_sec": 0, "idle_io": False}
 
 class ConfigManager:
     @staticmethod
     def detect_steam_path():
         """Tenta detectar o caminho da Steam via Registro (Win) ou caminhos padrao (Win/Linux)."""
-        
+        paths = ConfigManager.detect_steam_paths()
+        return paths[0] if paths else ""
+
+    @staticmethod
+    def detect_steam_paths():
+        """Todas as instalações da Steam encontradas (Registro e caminhos padrão), sem repetir."""
+        found = []
+
         # 1. Tentar Registro do Windows (Apenas Windows)
         if sys.platform == 'win32':
             try:
@@ -21,7 +34,7 @@ class ConfigManager:
                 path, _ = winreg.QueryValueEx(key, "SteamPath")
                 path = os.path.normpath(path)
                 if os.path.exists(path):
-                    return path
+                    found.append(path)
             except Exception:
                 pass
             
@@ -43,37 +56,35 @@ class ConfigManager:
                 os.path.join(home, ".var", "app", "com.valvesoftware.Steam", ".steam", "steam") # Flatpak
             ]
 
+        # ~/.steam/steam costuma ser link para ~/.local/share/Steam: mesma instalação
+        seen = {os.path.normcase(os.path.realpath(p)) for p in found}
         for p in common_paths:
-            if os.path.exists(p):
-                return p
-        
-        return ""
+            real = os.path.normcase(os.path.realpath(p))
+            if os.path.exists(p) and real not in seen:
+                seen.add(real)
+                found.append(p)
+
+        return found
 
     @staticmethod
     def load():
         config = DEFAULT_CONFIG.copy()
-        
-        # Detectar path se nao tiver salvo
-        detected_steam = ConfigManager.detect_steam_path()
-        if detected_steam:
-            config["steam_path"] = detected_steam
 
         if os.path.exists(CONFIG_FILE):
             with open(CONFIG_FILE, 'r') as f:
                 try:
                     loaded = json.load(f)
-                    # Merge: usa o salvo, senao usa o detectado (se o salvo estiver vazio)
-                    saved_path = loaded.get("steam_path", "")
-                    if saved_path:
-                        config["steam_path"] = saved_path
-                    
-                    # Carregar outros campos
+                    config["steam_path"] = loaded.get("steam_path", "")
                     config["backup_path"] = loaded.get("backup_path", config["backup_path"])
-                    
-                    return config
+                    for key in ("mirror_paths", "steam_paths", "max_mb_per_sec", "max_ops_per_sec", "idle_io"):
+                        config[key] = loaded.get(key, config[key])
                 except json.JSONDecodeError:
-                    return config
-        
+                    pass
+
+        # Detectar path so se nao tiver salvo (raiz em cache evita sondar Registro/candidatos)
+        if not config["steam_path"]:
+            config["steam_path"] = SteamDiscovery().steam_root(ConfigManager.detect_steam_path)
+
         return config
 
     @staticmethod
@@ -0,0 +1,134 @@
+import json
+import os
+
+from src.utils import vdf
+
+CACHE_FILE = "steam_discovery.json"
+CACHE_VERSION = 1
+STEAMID64_BASE = 76561197960265728  # SteamID64 - base = id da conta (pasta em userdata)
+
+# Arquivos lidos por instalação; o cache vale enquanto os mtimes não mudarem
+LIBRARY_FILES = (os.path.join("steamapps", "libraryfolders.vdf"), os.path.join("config", "libraryfolders.vdf"))
+LOGIN_FILE = os.path.join("config", "loginusers.vdf")
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _load_vdf(path):
+    try:
+        return vdf.load(path)
+    except (OSError, ValueError):
+        return None
+
+
+def library_folders(steam):
+    """[{"path", "apps": {appid: bytes}}] de libraryfolders.vdf (formato novo e antigo)."""
+    for rel in LIBRARY_FILES:
+        data = _load_vdf(os.path.join(steam, rel))
+        if data is None:
+            continue
+        folders = vdf.get(data, "libraryfolders")
+        if not isinstance(folders, dict):
+            continue
+        libraries = []
+        for key, value in folders.items():
+            if not key.isdigit():
+                continue
+            if isinstance(value, dict):
+                apps = vdf.get(value, "apps")
+                apps = {app: int(size) if size.isdigit() else 0
+                        for app, size in apps.items() if isinstance(size, str)} if isinstance(apps, dict) else {}
+                libraries.append({"path": vdf.get(value, "path", ""), "apps": apps})
+            else:
+                libraries.append({"path": value, "apps": {}})  # formato antigo: "1" "D:\\SteamLibrary"
+        return libraries
+    return []
+
+
+def login_users(steam):
+    """{conta: {"steamid", "name", "persona", "most_recent"}} de loginusers.vdf."""
+    data = _load_vdf(os.path.join(steam, LOGIN_FILE))
+    users = vdf.get(data, "users") if data else None
+    accounts = {}
+    if not isinstance(users, dict):
+        return accounts
+    for steamid, info in users.items():
+        if not steamid.isdigit() or not isinstance(info, dict):
+            continue
+        account = str(int(steamid) - STEAMID64_BASE) if int(steamid) > STEAMID64_BASE else steamid
+        accounts[account] = {"steamid": steamid, "name": vdf.get(info, "AccountName", ""),
+                             "persona": vdf.get(info, "PersonaName", ""),
+                             "most_recent": vdf.get(info, "MostRecent", "0") == "1"}
+    return accounts
+
+
+class SteamDiscovery:
+    """Raiz da Steam, bibliotecas e contas com cache em disco (steam_discovery.json).
+
+    A raiz detectada é reaproveitada enquanto a pasta existir, sem sondar
+    Registro e caminhos candidatos; bibliotecas e contas são relidas só
+    quando o mtime de libraryfolders.vdf/loginusers.vdf muda.
+    """
+
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.data = {"version": CACHE_VERSION, "steam_path": "", "installs": {}}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self.data = data
+        except (OSError, ValueError, AttributeError):
+            pass
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError:
+            pass  # sem cache: a próxima execução detecta de novo
+
+    def steam_root(self, detect):
+        """Raiz em cache se ainda existir; senão `detect()` e guarda o resultado."""
+        cached = self.data.get("steam_path")
+        if cached and os.path.isdir(cached):
+            return cached
+        path = detect()
+        if path != cached:
+            self.data["steam_path"] = path
+            self.dirty = True
+            self.save()
+        return path
+
+    def info(self, steam):
+        """{"libraries": [...], "accounts": {...}} da instalação, relendo só o que mudou."""
+        files = {rel: _mtime(os.path.join(steam, rel)) for rel in LIBRARY_FILES + (LOGIN_FILE,)}
+        key = os.path.normcase(os.path.abspath(steam))
+        entry = self.data["installs"].get(key)
+        if entry is None or entry.get("files") != files:
+            entry = {"files": files, "libraries": library_folders(steam), "accounts": login_users(steam)}
+            self.data["installs"][key] = entry
+            self.dirty = True
+            self.save()
+        return {"libraries": entry["libraries"], "accounts": entry["accounts"]}
+
+
+def steam_info(steam, cache=CACHE_FILE):
+    """Bibliotecas e contas da instalação `steam` (via cache)."""
+    return SteamDiscovery(cache).info(steam)
+
+
+def app_libraries(info):
+    """{appid: pasta da biblioteca} a partir de info["libraries"]."""
+    return {app: library["path"] for library in info["libraries"] for app in library["apps"]}
@@ -0,0 +1,67 @@
+import re
+
+# KeyValues em texto (VDF): "chave" "valor", "chave" { ... }, comentários // e
+# condicionais [$WIN32], que são ignorados. Um único regex faz a tokenização.
+_TOKEN = re.compile(r'"((?:[^"\\]|\\.)*)"|([{}])|(//[^\n]*|\[[^\]\n]*\])|([^\s{}"]+)')
+_ESCAPE = re.compile(r'\\(.)')
+_ESCAPES = {"n": "\n", "t": "\t", "\\": "\\", '"': '"'}
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(0)), text)
+
+
+def loads(text):
+    """Converte o texto VDF em dicts aninhados (valores sempre str).
+
+    Chaves repetidas: blocos são mesclados e valores simples ficam com o
+    último. ValueError se as chaves não fecharem.
+    """
+    root = {}
+    stack = [root]
+    key = None
+    for quoted, brace, skip, bare in _TOKEN.findall(text):
+        if skip:
+            continue
+        if brace == "{":
+            if key is None:
+                raise ValueError("VDF: bloco sem chave")
+            child = stack[-1].get(key)
+            if not isinstance(child, dict):
+                child = stack[-1][key] = {}
+            stack.append(child)
+            key = None
+        elif brace == "}":
+            if len(stack) == 1:
+                raise ValueError("VDF: '}' sem '{'")
+            stack.pop()
+            key = None
+        else:
+            token = bare or _unescape(quoted)
+            if key is None:
+                key = token
+            else:
+                stack[-1][key] = token
+                key = None
+    if len(stack) != 1:
+        raise ValueError("VDF: bloco não fechado")
+    return root
+
+
+def load(path):
+    """Lê e converte um arquivo .vdf (UTF-8, bytes inválidos substituídos)."""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return loads(f.read())
+
+
+def get(data, key, default=None):
+    """Busca sem diferenciar maiúsculas (a Steam grava "LibraryFolders" e "libraryfolders")."""
+    if key in data:
+        return data[key]
+    lowered = key.lower()
+    for name, value in data.items():
+        if name.lower() == lowered:
+            return value
+    return default
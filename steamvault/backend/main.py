@@ -1,18 +1,23 @@
 """
 Steam Vault - Backend para Millennium
 Expõe funções de backup e restore para o frontend.
+
+A cópia é feita pelo mesmo VaultEngine do app (src/core), empacotado em
+lib/steamvault_engine por tools/package_plugin.py.
 """
 import json
 import os
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import Millennium  # type: ignore
 
 print("[SteamVault] Backend module loading...")
 
-MAX_WORKERS = 8
-
 
 def get_plugin_dir() -> str:
     """Retorna o diretório do plugin (pasta raiz, não backend)."""
@@ -28,6 +33,28 @@ def public_path(filename: str) -> str:
     return os.path.join(get_plugin_dir(), "public", filename)
 
 
+# O interpretador é compartilhado com outros plugins: o engine entra no sys.path
+# com nome próprio (steamvault_engine), nunca como um pacote genérico "src".
+ENGINE_LIB = os.path.join(get_plugin_dir(), "lib")
+ENGINE_ERROR = None
+try:
+    if ENGINE_LIB not in sys.path:
+        sys.path.insert(0, ENGINE_LIB)
+    from steamvault_engine.core.vault import VaultEngine  # type: ignore
+    from steamvault_engine.core.selection import Selection  # type: ignore
+    from steamvault_engine.core.throttle import IoLimits  # type: ignore
+    from steamvault_engine.utils.discovery import CACHE_FILE, steam_info, app_libraries  # type: ignore
+except ImportError as e:
+    ENGINE_ERROR = (f"Engine do Steam Vault não encontrado em {ENGINE_LIB} ({e}). "
+                    "Reinstale a release ou rode: python tools/package_plugin.py")
+    print(f"[SteamVault ERROR] {ENGINE_ERROR}")
+
+
+def _engine_missing() -> str:
+    """Resposta dos endpoints que dependem do engine quando ele não carregou."""
+    return json.dumps({"success": False, "error": ENGINE_ERROR})
+
+
 class Logger:
     @staticmethod
     def log(message: str) -> str:
@@ -40,30 +67,29 @@ class Logger:
         return json.dumps({"success": True})
 
 
-def _copy_file_task(src: str, dst: str) -> tuple:
-    try:
-        os.makedirs(os.path.dirname(dst), exist_ok=True)
-        shutil.copy2(src, dst)
-        return (True, src)
-    except Exception as e:
-        return (False, f"{src}: {e}")
+class EngineLog:
+    """Logger do VaultEngine: repassa ao console e guarda fase, erros e desfecho."""
 
+    def __init__(self):
+        self.phase = ""
+        self.errors = []
+        self.warning = None
+        self.success = False
 
-def _collect_files(src: str, dst: str) -> list:
-    if not os.path.exists(src):
-        return []
-    
-    file_pairs = []
-    for root, dirs, files in os.walk(src):
-        rel = os.path.relpath(root, src)
-        target_dir = os.path.join(dst, rel)
-        
-        for file in files:
-            src_file = os.path.join(root, file)
-            dst_file = os.path.join(target_dir, file)
-            file_pairs.append((src_file, dst_file))
-    
-    return file_pairs
+    def __call__(self, text: str) -> None:
+        print(f"[SteamVault] {text}")
+        if text.startswith("[ERRO"):
+            self.errors.append(text)
+        elif text.startswith("[AVISO]"):
+            self.warning = text
+        elif text.startswith("[SUCESSO]"):
+            self.success = True
+        elif text.startswith(">>>"):
+            self.phase = text.strip("> .")
+
+    def error_message(self) -> str:
+        text = self.errors[-1] if self.errors else self.warning or "Falha desconhecida"
+        return text.split("] ", 1)[-1]
 
 
 def GetSteamPath() -> str:
@@ -77,116 +103,197 @@ def GetDefaultBackupPath() -> str:
     return json.dumps({"success": True, "path": os.path.join(home, "Documents", "SteamVault")})
 
 
-def RunBackup(backupPath: str) -> str:
-    """Executa backup."""
-    print(f"[SteamVault] RunBackup called with path: {backupPath}")
+def GetIndex() -> str:
+    """Contas e AppIDs da Steam com tamanhos (bytes), nomes das contas e bibliotecas, para a seleção."""
+    if ENGINE_ERROR:
+        return _engine_missing()
     steam = Millennium.steam_path()
-    vault_folder = os.path.join(backupPath, "SteamVault_Backup")
-    
-    try:
-        os.makedirs(vault_folder, exist_ok=True)
-    except Exception as e:
-        return json.dumps({"success": False, "error": f"Falha ao criar pasta: {e}"})
-    
-    modules = [
-        (os.path.join(steam, "userdata"), os.path.join(vault_folder, "userdata")),
-        (os.path.join(steam, "config", "stplug-in"), os.path.join(vault_folder, "config", "stplug-in")),
-        (os.path.join(steam, "config", "depotcache"), os.path.join(vault_folder, "config", "depotcache")),
-        (os.path.join(steam, "appcache", "stats"), os.path.join(vault_folder, "appcache", "stats")),
-    ]
-    
-    all_files = []
-    for src, dst in modules:
-        all_files.extend(_collect_files(src, dst))
-    
-    # DLLs (Windows)
-    if os.name == 'nt':
-        for dll in ["version.dll", "winmm.dll"]:
-            src = os.path.join(steam, dll)
-            if os.path.exists(src):
-                all_files.append((src, os.path.join(vault_folder, dll)))
-    
-    total = len(all_files)
-    if total == 0:
-        return json.dumps({"success": False, "error": "Nenhum arquivo encontrado."})
-    
-    print(f"[SteamVault] Backing up {total} files...")
-    
-    errors = 0
-    completed = 0
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(_copy_file_task, src, dst): (src, dst) 
-                  for src, dst in all_files}
-        
-        for future in as_completed(futures):
-            success, result = future.result()
-            completed += 1
-            if not success:
-                errors += 1
-    
-    print(f"[SteamVault] Backup completed: {completed} files, {errors} errors")
-    
-    return json.dumps({
-        "success": errors == 0,
-        "files_copied": completed,
-        "errors": errors,
-        "path": vault_folder
-    })
-
-
-def RunRestore(backupPath: str) -> str:
-    """Executa restore."""
-    print(f"[SteamVault] RunRestore called with path: {backupPath}")
+    index = VaultEngine(EngineLog()).build_index(steam)
+    found = steam_info(steam, os.path.join(get_plugin_dir(), CACHE_FILE))
+    return json.dumps({"success": True, **index, "users": found["accounts"], "libraries": found["libraries"],
+                       "app_libraries": app_libraries(found)})
+
+
+class Job:
+    """Operação em segundo plano consultada pelo frontend via GetJobStatus."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.state = "queued"  # queued -> running -> done | error | cancelled
+        self.result = None
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.log = EngineLog()
+        self.engine = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def status(self) -> dict:
+        """Estado do job + telemetria da fase atual (bytes, vazão, ETA)."""
+        end = self.finished or time.monotonic()
+        status = {
+            "success": True,
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "phase": self.log.phase,
+            "errors": len(self.log.errors),
+            "result": self.result,
+        }
+        if self.engine is not None:
+            status.update(self.engine.telemetry.snapshot())
+            if self.state != "running":
+                status["eta"] = None
+        status["elapsed"] = round(end - self.started, 2) if self.started else 0.0
+        return status
+
+
+# Um job por vez (backup e restore simultâneos disputariam os mesmos arquivos);
+# a cópia em si continua paralela dentro do engine.
+JOB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="steamvault-job")
+JOBS = {}
+JOBS_KEPT = 20
+_jobs_lock = threading.Lock()
+# Limites de E/S compartilhados por todos os engines: SetIoLimits vale também para o job em andamento
+LIMITS = IoLimits() if ENGINE_ERROR is None else None
+
+
+def _run(kind: str, backupPath: str, selection=None, job=None) -> dict:
+    """Executa backup/restore no VaultEngine e resume o resultado para o frontend."""
+    log = job.log if job is not None else EngineLog()
+    engine = VaultEngine(log, cancel_callback=job.cancel_event.is_set if job is not None else None, limits=LIMITS)
+    if job is not None:
+        job.engine = engine
     steam = Millennium.steam_path()
-    vault_folder = os.path.join(backupPath, "SteamVault_Backup")
-    
-    if not os.path.exists(vault_folder):
-        return json.dumps({"success": False, "error": "Pasta de backup não encontrada."})
-    
-    if not os.path.exists(os.path.join(vault_folder, "userdata")):
-        return json.dumps({"success": False, "error": "Backup inválido (userdata missing)."})
-    
-    modules = [
-        (os.path.join(vault_folder, "userdata"), os.path.join(steam, "userdata")),
-        (os.path.join(vault_folder, "config", "stplug-in"), os.path.join(steam, "config", "stplug-in")),
-        (os.path.join(vault_folder, "config", "depotcache"), os.path.join(steam, "config", "depotcache")),
-        (os.path.join(vault_folder, "appcache", "stats"), os.path.join(steam, "appcache", "stats")),
-    ]
-    
-    all_files = []
-    for src, dst in modules:
-        all_files.extend(_collect_files(src, dst))
-    
-    if os.name == 'nt':
-        for dll in ["version.dll", "winmm.dll"]:
-            src = os.path.join(vault_folder, dll)
-            if os.path.exists(src):
-                all_files.append((src, os.path.join(steam, dll)))
-    
-    total = len(all_files)
-    print(f"[SteamVault] Restoring {total} files...")
-    
-    errors = 0
-    completed = 0
-    
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        futures = {executor.submit(_copy_file_task, src, dst): (src, dst) 
-                  for src, dst in all_files}
-        
-        for future in as_completed(futures):
-            success, result = future.result()
-            completed += 1
-            if not success:
-                errors += 1
-    
-    print(f"[SteamVault] Restore completed: {completed} files, {errors} errors")
-    
-    return json.dumps({
-        "success": errors == 0,
-        "files_restored": completed,
-        "errors": errors
-    })
+    if kind == "backup":
+        engine.run_backup(steam, backupPath, selection=selection)
+    else:
+        engine.run_restore(steam, backupPath, selection=selection)
+
+    files, _ = engine.copy_stats.totals()
+    result = {
+        "success": log.success and not log.errors,
+        "errors": len(log.errors),
+        "copy_methods": {method: list(counts) for method, counts in engine.copy_stats.by_method.items()},
+        "stats": engine.telemetry.summary(),
+    }
+    if kind == "backup":
+        result["files_copied"] = files
+        result["path"] = os.path.join(backupPath, "SteamVault_Backup")
+    else:
+        result["files_restored"] = files
+    if job is not None and job.cancelled:
+        result["success"] = False
+        result["error"] = "Backup cancelado." if kind == "backup" else "Restauração cancelada."
+    elif not result["success"]:
+        result["error"] = log.error_message()
+    return result
+
+
+def _selection(apps: str, accounts: str, excludeApps: str, excludeAccounts: str):
+    return Selection(apps, accounts, excludeApps, excludeAccounts)
+
+
+def _start_job(kind: str, backupPath: str, selection) -> str:
+    job = Job(kind)
+
+    def run():
+        if job.cancelled:
+            job.state = "cancelled"
+            job.finished = time.monotonic()
+            return
+        job.state = "running"
+        job.started = time.monotonic()
+        try:
+            job.result = _run(kind, backupPath, selection, job)
+            job.state = "cancelled" if job.cancelled else ("done" if job.result.get("success") else "error")
+        except Exception as e:
+            job.result = {"success": False, "error": str(e)}
+            job.state = "error"
+            print(f"[SteamVault ERROR] Job {job.id}: {e}")
+        job.finished = time.monotonic()
+
+    with _jobs_lock:
+        JOBS[job.id] = job
+        # Descarta os jobs finalizados mais antigos
+        finished = [j for j in JOBS.values() if j.finished is not None]
+        for old in finished[:max(0, len(JOBS) - JOBS_KEPT)]:
+            del JOBS[old.id]
+    JOB_EXECUTOR.submit(run)
+    print(f"[SteamVault] Job {job.id} ({kind}) queued")
+    return json.dumps({"success": True, "job_id": job.id})
+
+
+def RunBackup(backupPath: str, apps: str = "", accounts: str = "", excludeApps: str = "",
+              excludeAccounts: str = "") -> str:
+    """Executa backup (filtros: listas de AppIDs/contas separadas por vírgula)."""
+    if ENGINE_ERROR:
+        return _engine_missing()
+    print(f"[SteamVault] RunBackup called with path: {backupPath}")
+    return json.dumps(_run("backup", backupPath, _selection(apps, accounts, excludeApps, excludeAccounts)))
+
+
+def RunRestore(backupPath: str, apps: str = "", accounts: str = "", excludeApps: str = "",
+               excludeAccounts: str = "") -> str:
+    """Executa restore (filtros: listas de AppIDs/contas separadas por vírgula)."""
+    if ENGINE_ERROR:
+        return _engine_missing()
+    print(f"[SteamVault] RunRestore called with path: {backupPath}")
+    return json.dumps(_run("restore", backupPath, _selection(apps, accounts, excludeApps, excludeAccounts)))
+
+
+def StartBackup(backupPath: str, apps: str = "", accounts: str = "", excludeApps: str = "",
+                excludeAccounts: str = "") -> str:
+    """Inicia o backup em segundo plano e retorna o job_id na hora."""
+    if ENGINE_ERROR:
+        return _engine_missing()
+    print(f"[SteamVault] StartBackup called with path: {backupPath}")
+    return _start_job("backup", backupPath, _selection(apps, accounts, excludeApps, excludeAccounts))
+
+
+def StartRestore(backupPath: str, apps: str = "", accounts: str = "", excludeApps: str = "",
+                 excludeAccounts: str = "") -> str:
+    """Inicia a restauração em segundo plano e retorna o job_id na hora."""
+    if ENGINE_ERROR:
+        return _engine_missing()
+    print(f"[SteamVault] StartRestore called with path: {backupPath}")
+    return _start_job("restore", backupPath, _selection(apps, accounts, excludeApps, excludeAccounts))
+
+
+def GetJobStatus(jobId: str) -> str:
+    """Progresso do job: fase, arquivos feitos, bytes/s, ETA e resultado."""
+    job = JOBS.get(jobId)
+    if job is None:
+        return json.dumps({"success": False, "error": "Job não encontrado."})
+    return json.dumps(job.status())
+
+
+def CancelJob(jobId: str) -> str:
+    """Pede o cancelamento; o engine para no próximo arquivo."""
+    job = JOBS.get(jobId)
+    if job is None:
+        return json.dumps({"success": False, "error": "Job não encontrado."})
+    job.cancel_event.set()
+    return json.dumps(job.status())
+
+
+def GetIoLimits() -> str:
+    if ENGINE_ERROR:
+        return _engine_missing()
+    return json.dumps({"success": True, **LIMITS.to_dict()})
+
+
+def SetIoLimits(maxMbps: float = 0, maxOps: int = 0, idleIo: bool = False) -> str:
+    """Limite de banda (MB/s), de arquivos/s e prioridade ociosa; 0 = sem limite."""
+    if ENGINE_ERROR:
+        return _engine_missing()
+    LIMITS.configure(int(float(maxMbps) * 1024 * 1024), int(maxOps), bool(idleIo))
+    print(f"[SteamVault] Limites de E/S: {LIMITS.describe()}")
+    return json.dumps({"success": True, **LIMITS.to_dict()})
 
 
 class Plugin:
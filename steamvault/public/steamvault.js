@@ -19,6 +19,7 @@
     // Estado
     let isOperationRunning = false;
     let currentBackupPath = '';
+    let currentJobId = null;
 
     // Injetar estilos
     function ensureStyles() {
@@ -99,6 +100,20 @@
                     margin-bottom: 12px;
                     box-sizing: border-box;
                 }
+                .steamvault-progress {
+                    height: 8px;
+                    border-radius: 4px;
+                    background: #111827;
+                    border: 1px solid #374151;
+                    margin-top: 12px;
+                    overflow: hidden;
+                }
+                .steamvault-progress-bar {
+                    height: 100%;
+                    width: 0%;
+                    background: #3b82f6;
+                    transition: width 0.2s ease;
+                }
                 .steamvault-result {
                     padding: 10px;
                     border-radius: 6px;
@@ -130,32 +145,51 @@
         return '';
     }
 
-    // Executar backup
-    async function runBackup(path) {
+    // Chamar um método do backend e decodificar o JSON
+    async function callBackend(method, params) {
         try {
             if (typeof Millennium !== 'undefined' && typeof Millennium.callServerMethod === 'function') {
-                const res = await Millennium.callServerMethod('steamvault', 'RunBackup', { backupPath: path });
+                const res = await Millennium.callServerMethod('steamvault', method, params);
                 return typeof res === 'string' ? JSON.parse(res) : res;
             }
         } catch (err) {
-            backendLog('RunBackup failed: ' + err);
+            backendLog(method + ' failed: ' + err);
             return { success: false, error: String(err) };
         }
         return { success: false, error: 'Millennium not available' };
     }
 
-    // Executar restore
-    async function runRestore(path) {
-        try {
-            if (typeof Millennium !== 'undefined' && typeof Millennium.callServerMethod === 'function') {
-                const res = await Millennium.callServerMethod('steamvault', 'RunRestore', { backupPath: path });
-                return typeof res === 'string' ? JSON.parse(res) : res;
+    const POLL_INTERVAL = 500;
+
+    function formatBytes(bytes) {
+        return (bytes / (1024 * 1024)).toFixed(1) + ' MB';
+    }
+
+    function formatEta(seconds) {
+        if (seconds === null || seconds === undefined) return '--';
+        const s = Math.round(seconds);
+        return s >= 60 ? `${Math.floor(s / 60)}m ${s % 60}s` : `${s}s`;
+    }
+
+    // Iniciar um job (StartBackup/StartRestore) e acompanhar até terminar
+    async function runJob(method, path, onStatus) {
+        const start = await callBackend(method, { backupPath: path });
+        if (!start.success) return start;
+
+        currentJobId = start.job_id;
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL));
+            const status = await callBackend('GetJobStatus', { jobId: start.job_id });
+            if (!status.success) {
+                currentJobId = null;
+                return status;
+            }
+            onStatus(status);
+            if (status.state !== 'queued' && status.state !== 'running') {
+                currentJobId = null;
+                return status.result || { success: false, error: status.state };
             }
-        } catch (err) {
-            backendLog('RunRestore failed: ' + err);
-            return { success: false, error: String(err) };
         }
-        return { success: false, error: 'Millennium not available' };
     }
 
     // Mostrar modal principal
@@ -185,6 +219,17 @@
                 CAMINHO DO BACKUP:
             </label>
             <input type="text" class="steamvault-input" id="sv-backup-path" value="${currentBackupPath}" />
+
+            <label style="display: block; margin-bottom: 4px; color: #3b82f6; font-size: 11px; font-weight: 600;">
+                LIMITE DE E/S (0 = LIVRE):
+            </label>
+            <div style="display: flex; gap: 10px; align-items: center; margin-bottom: 16px;">
+                <input type="number" min="0" step="1" class="steamvault-input" id="sv-max-mbps" value="0"
+                       style="width: 90px; margin-bottom: 0;" /> <span style="color: #9ca3af; font-size: 12px;">MB/s</span>
+                <label style="color: #9ca3af; font-size: 12px;">
+                    <input type="checkbox" id="sv-idle-io" /> Segundo plano
+                </label>
+            </div>
             
             <div style="display: flex; gap: 10px;">
                 <button class="steamvault-btn primary" id="sv-btn-backup" style="flex: 1;">
@@ -195,9 +240,13 @@
                 </button>
             </div>
             
+            <div class="steamvault-progress" id="sv-progress" style="display: none;">
+                <div class="steamvault-progress-bar" id="sv-progress-bar"></div>
+            </div>
             <div class="steamvault-result" id="sv-result" style="display: none;"></div>
             
-            <div style="margin-top: 16px; text-align: right;">
+            <div style="margin-top: 16px; display: flex; justify-content: flex-end; gap: 10px;">
+                <button class="steamvault-btn" id="sv-btn-cancel" style="display: none;">Cancelar</button>
                 <button class="steamvault-btn" id="sv-btn-close">Fechar</button>
             </div>
         `;
@@ -211,6 +260,63 @@
         const btnRestore = modal.querySelector('#sv-btn-restore');
         const btnClose = modal.querySelector('#sv-btn-close');
         const resultDiv = modal.querySelector('#sv-result');
+        const btnCancel = modal.querySelector('#sv-btn-cancel');
+        const progressDiv = modal.querySelector('#sv-progress');
+        const progressBar = modal.querySelector('#sv-progress-bar');
+        const maxMbpsInput = modal.querySelector('#sv-max-mbps');
+        const idleIoInput = modal.querySelector('#sv-idle-io');
+
+        // Limites de E/S: valem na hora, inclusive para o job em andamento
+        const limits = await callBackend('GetIoLimits', {});
+        if (limits.success) {
+            maxMbpsInput.value = limits.max_mb_per_sec || 0;
+            idleIoInput.checked = !!limits.idle_io;
+        }
+        async function updateLimits() {
+            await callBackend('SetIoLimits', {
+                maxMbps: Math.max(0, parseFloat(maxMbpsInput.value) || 0),
+                idleIo: idleIoInput.checked,
+            });
+        }
+        maxMbpsInput.addEventListener('change', updateLimits);
+        idleIoInput.addEventListener('change', updateLimits);
+
+        btnCancel.addEventListener('click', async () => {
+            if (!currentJobId) return;
+            btnCancel.disabled = true;
+            await callBackend('CancelJob', { jobId: currentJobId });
+        });
+
+        // Atualiza barra e texto a cada consulta do GetJobStatus
+        function showStatus(label, status) {
+            const total = status.bytes_total || 0;
+            const percent = total > 0 ? Math.min(100, (status.bytes_done / total) * 100) : 0;
+            progressBar.style.width = percent.toFixed(1) + '%';
+            resultDiv.textContent = `⏳ ${status.phase || label} ${status.files_done || 0}/${status.files_total || 0} arquivos · ` +
+                `${formatBytes(status.bytes_done || 0)} de ${formatBytes(total)} · ` +
+                `${formatBytes(status.bytes_per_sec || 0)}/s · ETA ${formatEta(status.eta)}`;
+        }
+
+        // Executa o job com a UI em modo "ocupado" e devolve o resultado
+        async function runWithProgress(method, label, path) {
+            isOperationRunning = true;
+            btnBackup.disabled = true;
+            btnRestore.disabled = true;
+            btnCancel.disabled = false;
+            btnCancel.style.display = 'block';
+            progressBar.style.width = '0%';
+            progressDiv.style.display = 'block';
+            resultDiv.textContent = `⏳ ${label}`;
+            resultDiv.style.display = 'block';
+
+            const result = await runJob(method, path, status => showStatus(label, status));
+
+            isOperationRunning = false;
+            btnBackup.disabled = false;
+            btnRestore.disabled = false;
+            btnCancel.style.display = 'none';
+            return result;
+        }
 
         pathInput.addEventListener('change', (e) => {
             currentBackupPath = e.target.value;
@@ -236,23 +342,13 @@
                 return;
             }
 
-            isOperationRunning = true;
-            btnBackup.disabled = true;
-            btnRestore.disabled = true;
-            resultDiv.textContent = '⏳ Fazendo backup...';
-            resultDiv.style.display = 'block';
-
-            const result = await runBackup(path);
+            const result = await runWithProgress('StartBackup', 'Fazendo backup...', path);
 
             if (result.success) {
                 resultDiv.textContent = `✅ Backup concluído! ${result.files_copied || 0} arquivos copiados.`;
             } else {
                 resultDiv.textContent = `❌ Erro: ${result.error || 'Falha desconhecida'}`;
             }
-
-            isOperationRunning = false;
-            btnBackup.disabled = false;
-            btnRestore.disabled = false;
         });
 
         btnRestore.addEventListener('click', async () => {
@@ -265,23 +361,13 @@
                 return;
             }
 
-            isOperationRunning = true;
-            btnBackup.disabled = true;
-            btnRestore.disabled = true;
-            resultDiv.textContent = '⏳ Restaurando...';
-            resultDiv.style.display = 'block';
-
-            const result = await runRestore(path);
+            const result = await runWithProgress('StartRestore', 'Restaurando...', path);
 
             if (result.success) {
                 resultDiv.textContent = `✅ Restauração concluída! ${result.files_restored || 0} arquivos restaurados.`;
             } else {
                 resultDiv.textContent = `❌ Erro: ${result.error || 'Falha desconhecida'}`;
             }
-
-            isOperationRunning = false;
-            btnBackup.disabled = false;
-            btnRestore.disabled = false;
         });
     }
 
@@ -0,0 +1,79 @@
+"""Empacota o engine (src/core, src/utils) dentro do plugin Millennium.
+
+O backend do plugin roda no interpretador compartilhado do Millennium, então
+o engine não pode entrar no sys.path como um pacote genérico "src": ele é
+copiado para steamvault/lib/steamvault_engine com os imports reescritos
+(`from src.core...` -> `from steamvault_engine.core...`). Com --zip, gera
+também o .zip da release com a pasta steamvault/ pronta para instalar:
+
+    python tools/package_plugin.py --zip steamvault.zip
+"""
+import argparse
+import os
+import re
+import shutil
+import sys
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PLUGIN_DIR = os.path.join(ROOT, "steamvault")
+ENGINE_PACKAGE = "steamvault_engine"  # mesmo nome procurado por steamvault/backend/main.py
+ENGINE_PARTS = ("core", "utils")  # a GUI e a CLI ficam de fora
+
+_IMPORT = re.compile(r"^(\s*)(from|import) src\.", re.MULTILINE)
+_SKIP = ("__pycache__",)
+
+
+def rewrite_imports(text):
+    return _IMPORT.sub(rf"\1\2 {ENGINE_PACKAGE}.", text)
+
+
+def package_engine(lib_dir=None):
+    """Copia o engine para `lib_dir`/steamvault_engine. Retorna o número de módulos."""
+    target = os.path.join(lib_dir or os.path.join(PLUGIN_DIR, "lib"), ENGINE_PACKAGE)
+    shutil.rmtree(target, ignore_errors=True)
+    os.makedirs(target)
+    with open(os.path.join(target, "__init__.py"), 'w', encoding='utf-8') as f:
+        f.write('"""Engine do Steam Vault empacotado para o plugin (gerado por tools/package_plugin.py)."""\n')
+    count = 0
+    for part in ENGINE_PARTS:
+        src_dir = os.path.join(ROOT, "src", part)
+        for root, dirs, files in os.walk(src_dir):
+            dirs[:] = [d for d in dirs if d not in _SKIP]
+            dst_dir = os.path.join(target, part, os.path.relpath(root, src_dir))
+            os.makedirs(dst_dir, exist_ok=True)
+            for name in files:
+                if not name.endswith(".py"):
+                    continue
+                with open(os.path.join(root, name), 'r', encoding='utf-8') as f:
+                    text = f.read()
+                with open(os.path.join(dst_dir, name), 'w', encoding='utf-8') as f:
+                    f.write(rewrite_imports(text))
+                count += 1
+    return count
+
+
+def build_zip(path):
+    """Zip da release: a pasta steamvault/ (com lib/) sem caches."""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for root, dirs, files in os.walk(PLUGIN_DIR):
+            dirs[:] = [d for d in dirs if d not in _SKIP + ("node_modules",)]
+            for name in files:
+                full = os.path.join(root, name)
+                zf.write(full, os.path.relpath(full, ROOT))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Empacota o engine no plugin Millennium")
+    parser.add_argument("--zip", metavar="ARQUIVO", help="Gera também o .zip da release")
+    args = parser.parse_args()
+
+    count = package_engine()
+    print(f"[SUCESSO] Engine copiado: {count} módulos em steamvault/lib/{ENGINE_PACKAGE}", file=sys.stderr)
+    if args.zip:
+        build_zip(args.zip)
+        print(f"[SUCESSO] Release em {args.zip}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()